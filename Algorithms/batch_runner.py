@@ -0,0 +1,205 @@
+"""
+Offline batch solving for `manage.py solve_batch` and `manage.py compare_batch`.
+
+Queries are JSON lines naming node IDs of one graph:
+
+    {"id": "q1", "source": "1", "destination": "42", "algorithm": "dijkstra", "options": {}}
+
+Only source and destination are required (algorithm defaults to bfs, id to the
+line number). Each worker process holds one copy of the graph: with the fork
+start method it is inherited from the parent, otherwise every worker loads it
+once in its initializer. Stored graphs are shared graph files that every
+worker maps instead of copying. Queries are handed out a few at a time and results
+come back in query order, so a run's output lines are stable and two runs can
+be compared line by line (see compare_records).
+"""
+
+import json
+import multiprocessing
+import os
+import statistics
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from graph_loaders import load_graph_file
+from search_algorithms import solve_graph
+from shared_graph import SharedGraph
+
+# Queries handed to each worker ahead of time; bounds memory for very long query files
+QUERIES_IN_FLIGHT_PER_WORKER = 8
+
+# Costs closer than this are equal when comparing runs
+COST_TOLERANCE = 1e-9
+
+# Graph of the current process (the parent's, or a worker's own copy)
+_graph = None
+
+
+def read_queries(path: str) -> Iterator[Tuple[int, Dict]]:
+    """Yield (line number, query) for every non-blank line; raises ValueError for bad lines"""
+    with open(path, 'r', encoding='utf-8') as handle:
+        for line_number, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                query = json.loads(line)
+            except ValueError:
+                raise ValueError(f'{path}:{line_number}: not valid JSON')
+            if not isinstance(query, dict) or 'source' not in query or 'destination' not in query:
+                raise ValueError(f'{path}:{line_number}: queries need a source and a destination')
+            yield line_number, query
+
+
+def load_graph_source(graph_source: Tuple):
+    """
+    Load a graph from ('file', path, format, directed) or map ('shared', path)
+
+    Stored graphs (Search.graph_store) are shared graph files.
+    """
+    kind, path = graph_source[0], graph_source[1]
+    if kind == 'shared':
+        return SharedGraph(path)
+    return load_graph_file(path, graph_source[2], graph_source[3])
+
+
+def _initialize_worker(graph_source: Tuple):
+    global _graph
+    if _graph is None:
+        _graph = load_graph_source(graph_source)
+
+
+def _resolve(labels: Dict, node_id):
+    if isinstance(node_id, list):
+        resolved = [labels.get(str(item)) for item in node_id]
+        return resolved if resolved and all(resolved) else None
+    return labels.get(str(node_id))
+
+
+def solve_query(line_number: int, query: Dict, repeat: int = 1, include_path: bool = False) -> Dict:
+    """Run one query against this process's graph and describe the outcome as a flat record"""
+    record = {
+        'line': line_number,
+        'id': query.get('id', line_number),
+        'source': query['source'],
+        'destination': query['destination'],
+        'algorithm': query.get('algorithm') or 'bfs',
+    }
+    source = _resolve(_graph.labels, query['source'])
+    destination = _resolve(_graph.labels, query['destination'])
+    if source is None or destination is None:
+        record.update(success=False, error='Invalid source or destination node')
+        return record
+    options = query.get('options') or {}
+
+    timings = []
+    result = None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = solve_graph(_graph, source, destination, record['algorithm'], None, options)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    path = result.get('path') or []
+    record.update(
+        success=bool(result.get('success')),
+        cost=result.get('cost'),
+        path_length=len(path),
+        nodes_explored=result.get('nodes_explored'),
+        time_ms=round(min(timings), 3),
+        time_ms_median=round(statistics.median(timings), 3),
+        stats=result.get('stats'),
+    )
+    if include_path:
+        record['path'] = path
+    if not result.get('success'):
+        record['error'] = result.get('error')
+    return record
+
+
+def _solve_task(task: Tuple[int, Dict, int, bool]) -> Dict:
+    return solve_query(*task)
+
+
+def run_batch(graph_source: Tuple, queries: Iterable[Tuple[int, Dict]], workers: int = 1,
+              repeat: int = 1, include_path: bool = False, graph=None) -> Iterator[Dict]:
+    """
+    Solve every query and yield one record per query, in query order
+
+    `graph` may be passed when the caller already loaded it; it is then shared
+    with forked workers instead of being loaded again.
+    """
+    global _graph
+    _graph = graph if graph is not None else load_graph_source(graph_source)
+    tasks = ((line_number, query, repeat, include_path) for line_number, query in queries)
+
+    if workers <= 1:
+        for task in tasks:
+            yield _solve_task(task)
+        return
+
+    start_methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in start_methods else None)
+    window = workers * QUERIES_IN_FLIGHT_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_initialize_worker, initargs=(graph_source,)) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(_solve_task, task))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def summarize(times_ms: List[float], solved: int, total: int, elapsed: float) -> Dict:
+    """Totals and latency percentiles for one run (`times_ms` holds each query's best time)"""
+    times = sorted(times_ms)
+    summary = {
+        'queries': total,
+        'solved': solved,
+        'failed': total - solved,
+        'elapsed_seconds': round(elapsed, 3),
+        'queries_per_second': round(total / elapsed, 1) if elapsed > 0 else None,
+    }
+    if times:
+        summary['time_ms_p50'] = times[len(times) // 2]
+        summary['time_ms_p95'] = times[min(len(times) - 1, int(len(times) * 0.95))]
+        summary['time_ms_max'] = times[-1]
+    return summary
+
+
+def _same_cost(first, second) -> bool:
+    if first is None or second is None:
+        return first is second
+    return abs(first - second) <= COST_TOLERANCE * max(1.0, abs(first), abs(second))
+
+
+def compare_records(baseline: Dict[object, Dict], current: Dict[object, Dict],
+                    slowdown: Optional[float] = None) -> Dict[str, List]:
+    """
+    Differences between two runs of the same query file, keyed by query id
+
+    `changed` lists queries whose success or cost differs (regressions),
+    `effort` those that now expand a different number of nodes, and `slower`
+    those whose best time grew by more than the `slowdown` factor.
+    """
+    report = {'missing': [], 'added': [], 'changed': [], 'effort': [], 'slower': []}
+    for query_id, before in baseline.items():
+        after = current.get(query_id)
+        if after is None:
+            report['missing'].append(query_id)
+            continue
+        if before.get('success') != after.get('success') or not _same_cost(before.get('cost'), after.get('cost')):
+            report['changed'].append((query_id, before.get('cost'), after.get('cost')))
+        elif before.get('nodes_explored') != after.get('nodes_explored'):
+            report['effort'].append((query_id, before.get('nodes_explored'), after.get('nodes_explored')))
+        if slowdown and before.get('time_ms') and after.get('time_ms', 0) > before['time_ms'] * slowdown:
+            report['slower'].append((query_id, before['time_ms'], after['time_ms']))
+    report['added'] = [query_id for query_id in current if query_id not in baseline]
+    return report
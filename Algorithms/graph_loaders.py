@@ -0,0 +1,193 @@
+"""
+Loaders for graphs stored in files rather than drawn in the browser.
+
+Supported formats:
+- DIMACS shortest-path `.gr` files ("p sp <nodes> <arcs>" then "a <u> <v> <w>"
+  lines). Arcs are directed, as in the DIMACS road networks, which list both
+  directions of two-way roads.
+- Whitespace-separated edge lists ("<u> <v> [<weight>]" per line, lines
+  starting with # or % are comments). Undirected unless asked otherwise.
+- GraphML, honouring edgedefault / per-edge "directed" and a weight data key.
+
+Plain-text formats are read through mmap line by line and GraphML with
+iterparse, clearing each element after use, so the whole file is never held as
+text. Lines go straight into a CompiledGraph (no per-edge dicts); node IDs
+become the labels, and each distinct ID is decoded and interned once. The
+graph's fingerprint is the SHA-256 of the file.
+"""
+
+import hashlib
+import mmap
+import os
+import sys
+import xml.etree.ElementTree as ElementTree
+from typing import Iterator, Optional, Tuple
+
+from search_algorithms import CompiledGraph
+
+FORMAT_EXTENSIONS = {
+    '.gr': 'dimacs',
+    '.dimacs': 'dimacs',
+    '.graphml': 'graphml',
+    '.xml': 'graphml',
+}
+FORMATS = ('dimacs', 'edgelist', 'graphml')
+
+
+def detect_format(path: str) -> str:
+    """Format implied by the file extension; anything unknown is read as an edge list"""
+    return FORMAT_EXTENSIONS.get(os.path.splitext(path)[1].lower(), 'edgelist')
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _mapped_lines(path: str) -> Iterator[bytes]:
+    """Lines of a file read through a read-only memory map"""
+    with open(path, 'rb') as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from iter(mapped.readline, b'')
+
+
+def _dimacs_arcs(path: str, graph: CompiledGraph) -> Iterator[Tuple[str, str, float]]:
+    # Each distinct node ID is decoded and interned once (lookups inlined: this is the hot loop)
+    labels = {}
+    intern = sys.intern
+    for line_number, line in enumerate(_mapped_lines(path), 1):
+        kind = line[:1]
+        if kind == b'a':
+            parts = line.split()
+            if len(parts) != 4:
+                raise ValueError(f'{path}:{line_number}: expected "a <u> <v> <weight>"')
+            _, source, target, weight = parts
+            from_label = labels.get(source)
+            if from_label is None:
+                from_label = labels[source] = intern(source.decode('utf-8'))
+            to_label = labels.get(target)
+            if to_label is None:
+                to_label = labels[target] = intern(target.decode('utf-8'))
+            yield from_label, to_label, float(weight)
+        elif kind == b'p':
+            parts = line.split()
+            if len(parts) != 4:
+                raise ValueError(f'{path}:{line_number}: expected "p sp <nodes> <arcs>"')
+            # Declared nodes exist even when no arc touches them
+            for node_id in range(1, int(parts[2]) + 1):
+                token = str(node_id).encode()
+                labels[token] = intern(token.decode())
+                graph.add_node(labels[token])
+        elif kind not in (b'c', b'\n', b'\r', b''):
+            raise ValueError(f'{path}:{line_number}: unknown DIMACS line type {kind!r}')
+
+
+def load_dimacs(path: str) -> CompiledGraph:
+    graph = CompiledGraph()
+    graph.add_edges(_dimacs_arcs(path, graph), directed=True)
+    graph.fingerprint = _file_digest(path)
+    return graph
+
+
+def _edge_list_edges(path: str) -> Iterator[Tuple[str, str, float]]:
+    labels = {}
+    intern = sys.intern
+    for line_number, line in enumerate(_mapped_lines(path), 1):
+        parts = line.split()
+        if not parts or parts[0][:1] in (b'#', b'%'):
+            continue
+        if len(parts) == 2:
+            source, target = parts
+            weight = 1.0
+        elif len(parts) == 3:
+            source, target, weight = parts[0], parts[1], float(parts[2])
+        else:
+            raise ValueError(f'{path}:{line_number}: expected "<u> <v> [<weight>]"')
+        from_label = labels.get(source)
+        if from_label is None:
+            from_label = labels[source] = intern(source.decode('utf-8'))
+        to_label = labels.get(target)
+        if to_label is None:
+            to_label = labels[target] = intern(target.decode('utf-8'))
+        yield from_label, to_label, weight
+
+
+def load_edge_list(path: str, directed: bool = False) -> CompiledGraph:
+    graph = CompiledGraph()
+    graph.add_edges(_edge_list_edges(path), directed)
+    graph.fingerprint = _file_digest(path)
+    return graph
+
+
+def _local_name(tag: str) -> str:
+    return tag.rpartition('}')[2]
+
+
+def load_graphml(path: str, weight_key: Optional[str] = None) -> CompiledGraph:
+    """
+    Load a GraphML file; `weight_key` is the attr.name of the edge weight data
+    (default: the first edge key named weight, cost, length or label)
+    """
+    graph = CompiledGraph()
+    weight_names = (weight_key,) if weight_key else ('weight', 'cost', 'length', 'label')
+    weight_id = None
+    default_weight = 1.0
+    directed = False
+    parents = []
+
+    for event, element in ElementTree.iterparse(path, events=('start', 'end')):
+        tag = _local_name(element.tag)
+        if event == 'start':
+            if tag == 'graph':
+                directed = element.get('edgedefault', 'undirected') == 'directed'
+            parents.append(element)
+            continue
+
+        parents.pop()
+        if tag == 'key':
+            if weight_id is None and element.get('for') in ('edge', 'all') \
+                    and element.get('attr.name') in weight_names:
+                weight_id = element.get('id')
+                default_text = next((child.text for child in element
+                                     if _local_name(child.tag) == 'default'), None)
+                if default_text not in (None, ''):
+                    default_weight = float(default_text)
+        elif tag == 'node':
+            graph.add_node(sys.intern(element.get('id')))
+        elif tag == 'edge':
+            weight = default_weight
+            if weight_id is not None:
+                for child in element:
+                    if child.get('key') == weight_id and child.text not in (None, ''):
+                        weight = float(child.text)
+                        break
+            edge_directed = element.get('directed')
+            add_directed = directed if edge_directed is None else edge_directed == 'true'
+            graph.add_edge(sys.intern(element.get('source')), sys.intern(element.get('target')),
+                           weight, add_directed)
+        else:
+            continue
+        # Drop the finished element so memory stays flat however large the file is
+        element.clear()
+        if parents:
+            parents[-1].remove(element)
+
+    graph.fingerprint = _file_digest(path)
+    return graph
+
+
+def load_graph_file(path: str, file_format: str = None, directed: bool = False) -> CompiledGraph:
+    """Load a graph file in any supported format (detected from the extension by default)"""
+    file_format = file_format or detect_format(path)
+    if file_format == 'dimacs':
+        return load_dimacs(path)
+    if file_format == 'edgelist':
+        return load_edge_list(path, directed)
+    if file_format == 'graphml':
+        return load_graphml(path)
+    raise ValueError(f'Unknown graph format: {file_format} (expected one of {", ".join(FORMATS)})')
@@ -0,0 +1,383 @@
+"""
+Implicit grid and maze problems for the search algorithms.
+
+A grid is stored as one bit per cell (1 = wall) and neighbors are computed on
+demand in get_actions, so a 1000x1000 maze needs about 125 KB instead of
+millions of materialized edges. States are (row, column) tuples.
+
+Upload encodings accepted by PackedGrid.decode:
+    'bitmap': base64 of the row-major bit array, least significant bit first
+    'rle':    run lengths over the row-major cells, alternating open/wall and
+              starting with open cells (a leading 0 means the grid starts with a wall)
+    'rows':   list of strings, '#' for walls and any other character for open cells
+"""
+
+import base64
+import heapq
+import math
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from search_algorithms import Node, SearchProblem, SearchStats, emits, get_path
+
+# Largest grid accepted from a request (cells)
+MAX_GRID_CELLS = 4_000_000
+
+DIAGONAL_COST = math.sqrt(2)
+
+_ORTHOGONAL_MOVES = ((-1, 0), (1, 0), (0, -1), (0, 1))
+_DIAGONAL_MOVES = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+
+class PackedGrid:
+    """Row-major bit-packed occupancy grid (1 = wall, 0 = open)"""
+
+    def __init__(self, width: int, height: int, bits: bytearray = None):
+        if width <= 0 or height <= 0:
+            raise ValueError('Grid width and height must be positive')
+        if width * height > MAX_GRID_CELLS:
+            raise ValueError(f'Grid too large! Maximum allowed is {MAX_GRID_CELLS} cells.')
+        size = (width * height + 7) // 8
+        if bits is None:
+            bits = bytearray(size)
+        elif len(bits) != size:
+            raise ValueError(f'Bitmap must be {size} bytes for a {width}x{height} grid')
+        self.width = width
+        self.height = height
+        self.bits = bits
+
+    def is_blocked(self, row: int, col: int) -> bool:
+        index = row * self.width + col
+        return bool(self.bits[index >> 3] >> (index & 7) & 1)
+
+    def is_open(self, row: int, col: int) -> bool:
+        return 0 <= row < self.height and 0 <= col < self.width and not self.is_blocked(row, col)
+
+    def set_blocked(self, row: int, col: int, blocked: bool = True):
+        index = row * self.width + col
+        if blocked:
+            self.bits[index >> 3] |= 1 << (index & 7)
+        else:
+            self.bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.bits)
+
+    @classmethod
+    def from_bitmap(cls, width: int, height: int, data: str) -> 'PackedGrid':
+        return cls(width, height, bytearray(base64.b64decode(data, validate=True)))
+
+    @classmethod
+    def from_rle(cls, width: int, height: int, runs: Sequence[int]) -> 'PackedGrid':
+        grid = cls(width, height)
+        total = width * height
+        index = 0
+        blocked = False
+        for run in runs:
+            run = int(run)
+            if run < 0 or index + run > total:
+                raise ValueError('Run lengths must be non-negative and fit inside the grid')
+            if blocked:
+                for cell in range(index, index + run):
+                    grid.bits[cell >> 3] |= 1 << (cell & 7)
+            index += run
+            blocked = not blocked
+        if index != total:
+            raise ValueError(f'Run lengths cover {index} cells, expected {total}')
+        return grid
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[str]) -> 'PackedGrid':
+        if not rows:
+            raise ValueError('Grid must have at least one row')
+        width = len(rows[0])
+        grid = cls(width, len(rows))
+        for row, line in enumerate(rows):
+            if len(line) != width:
+                raise ValueError('All grid rows must have the same length')
+            for col, char in enumerate(line):
+                if char == '#':
+                    grid.set_blocked(row, col)
+        return grid
+
+    @classmethod
+    def decode(cls, encoding: str, cells, width: int = None, height: int = None) -> 'PackedGrid':
+        """Build a grid from one of the upload encodings described in the module docstring"""
+        if encoding == 'bitmap':
+            return cls.from_bitmap(int(width), int(height), cells)
+        if encoding == 'rle':
+            return cls.from_rle(int(width), int(height), cells)
+        if encoding == 'rows':
+            return cls.from_rows(cells)
+        raise ValueError(f'Unknown grid encoding: {encoding}')
+
+
+class GridProblem(SearchProblem):
+    """Path finding on a PackedGrid with 4- or 8-connected moves, neighbors computed on the fly"""
+
+    def __init__(self, grid: PackedGrid, start: Tuple[int, int], end: Tuple[int, int],
+                 diagonal: bool = False):
+        self.grid = grid
+        self.start = tuple(start)
+        self.end = tuple(end)
+        self.diagonal = diagonal
+
+    def get_actions(self, state: Tuple[int, int]) -> List[Tuple[Tuple[int, int], float]]:
+        row, col = state
+        width, height, bits = self.grid.width, self.grid.height, self.grid.bits
+        actions = []
+        for d_row, d_col in _ORTHOGONAL_MOVES:
+            r, c = row + d_row, col + d_col
+            if 0 <= r < height and 0 <= c < width:
+                index = r * width + c
+                if not bits[index >> 3] >> (index & 7) & 1:
+                    actions.append(((r, c), 1.0))
+        if self.diagonal:
+            is_open = self.grid.is_open
+            for d_row, d_col in _DIAGONAL_MOVES:
+                r, c = row + d_row, col + d_col
+                # No corner cutting: both orthogonal cells next to the move must be open
+                if is_open(r, c) and is_open(row, c) and is_open(r, col):
+                    actions.append(((r, c), DIAGONAL_COST))
+        return actions
+
+    def heuristic_cost(self, state: Tuple[int, int]) -> float:
+        """Manhattan distance on 4-connected grids, octile distance on 8-connected ones"""
+        d_row = abs(state[0] - self.end[0])
+        d_col = abs(state[1] - self.end[1])
+        if self.diagonal:
+            return max(d_row, d_col) + (DIAGONAL_COST - 1) * min(d_row, d_col)
+        return d_row + d_col
+
+    def is_reachable(self) -> bool:
+        # Labelling components would touch every cell, so only blocked endpoints are ruled out
+        return self.grid.is_open(*self.start) and self.grid.is_open(*self.end)
+
+
+# Open-cell bytes (1 = open) for every possible packed byte, least significant bit first
+_OPEN_CELLS = [bytes(1 - (value >> bit & 1) for bit in range(8)) for value in range(256)]
+
+
+class _JumpGrid:
+    """
+    Byte-per-cell copy of a PackedGrid with a one-cell wall border for jump scans
+
+    Jumps walk long straight and diagonal runs, so cells are addressed by a flat
+    index (no bounds checks or bit twiddling per step) and states are only turned
+    back into (row, col) tuples at jump points.
+    """
+
+    def __init__(self, grid: PackedGrid, end: Tuple[int, int], diagonal: bool):
+        width, height = grid.width, grid.height
+        unpacked = b''.join(_OPEN_CELLS[value] for value in grid.bits)
+        border = b'\x00' * (width + 2)
+        rows = [b'\x00' + unpacked[row * width:(row + 1) * width] + b'\x00' for row in range(height)]
+        self.cells = border + b''.join(rows) + border
+        self.stride = width + 2
+        self.goal = self.index(end)
+        self.diagonal = diagonal
+
+    def index(self, state: Tuple[int, int]) -> int:
+        return (state[0] + 1) * self.stride + state[1] + 1
+
+    def state(self, index: int) -> Tuple[int, int]:
+        row, col = divmod(index, self.stride)
+        return row - 1, col - 1
+
+    def jump_straight(self, index: int, delta: int) -> Optional[int]:
+        """
+        Walk from `index` by `delta` until a jump point, the goal or a wall
+
+        A cell is a jump point when a wall beside it ends, so a neighbor there can
+        only be reached optimally through it (a forced neighbor). On 4-connected
+        grids a vertical walk also stops where a horizontal branch finds a jump point.
+        """
+        cells, goal = self.cells, self.goal
+        side = self.stride if delta in (1, -1) else 1
+        vertical = side == 1
+        while True:
+            if not cells[index]:
+                return None
+            if index == goal:
+                return index
+            if ((cells[index + side] and not cells[index + side - delta]) or
+                    (cells[index - side] and not cells[index - side - delta])):
+                return index
+            if vertical and not self.diagonal:
+                if self.jump_straight(index + 1, 1) is not None or self.jump_straight(index - 1, -1) is not None:
+                    return index
+            index += delta
+
+    def jump(self, index: int, d_row: int, d_col: int) -> Optional[int]:
+        """Jump from `index` in direction (d_row, d_col); diagonal jumps probe both straight components"""
+        row_delta = d_row * self.stride
+        if d_row == 0 or d_col == 0:
+            return self.jump_straight(index, row_delta + d_col)
+        cells, goal = self.cells, self.goal
+        while True:
+            if not cells[index]:
+                return None
+            if index == goal:
+                return index
+            if (self.jump_straight(index + d_col, d_col) is not None or
+                    self.jump_straight(index + row_delta, row_delta) is not None):
+                return index
+            # Diagonal moves never cut corners
+            if not (cells[index + d_col] and cells[index + row_delta]):
+                return None
+            index += row_delta + d_col
+
+    def directions(self, index: int, d_row: int, d_col: int) -> List[Tuple[int, int]]:
+        """Directions worth exploring from a jump point reached by moving in (d_row, d_col)"""
+        cells, stride = self.cells, self.stride
+        if not self.diagonal:
+            if d_col != 0:
+                candidates = [(-1, 0), (1, 0), (0, d_col)]
+            else:
+                candidates = [(0, -1), (0, 1), (d_row, 0)]
+            return [(dr, dc) for dr, dc in candidates if cells[index + dr * stride + dc]]
+
+        directions = []
+        if d_row != 0 and d_col != 0:
+            vertical = cells[index + d_row * stride]
+            horizontal = cells[index + d_col]
+            if vertical:
+                directions.append((d_row, 0))
+            if horizontal:
+                directions.append((0, d_col))
+            if vertical and horizontal:
+                directions.append((d_row, d_col))
+            return directions
+
+        # Straight arrival: continue ahead, and turn (or cut diagonally) where the sides are open
+        if d_col != 0:
+            ahead = cells[index + d_col]
+            sides = [(-1, 0), (1, 0)]
+        else:
+            ahead = cells[index + d_row * stride]
+            sides = [(0, -1), (0, 1)]
+        for dr, dc in sides:
+            if cells[index + dr * stride + dc]:
+                if ahead:
+                    directions.append((d_row + dr, d_col + dc))
+                directions.append((dr, dc))
+        if ahead:
+            directions.insert(0, (d_row, d_col))
+        return directions
+
+
+def _expand_jump_path(node: Node) -> Node:
+    """Rebuild a cell-by-cell Node chain from a chain of jump points"""
+    jump_points = get_path(node)
+    current = Node(jump_points[0], path_cost=0)
+    for (row, col), (next_row, next_col) in zip(jump_points, jump_points[1:]):
+        d_row = (next_row > row) - (next_row < row)
+        d_col = (next_col > col) - (next_col < col)
+        step_cost = DIAGONAL_COST if d_row and d_col else 1.0
+        while (row, col) != (next_row, next_col):
+            row += d_row
+            col += d_col
+            current = Node((row, col), parent=current, action=((row, col), step_cost),
+                           path_cost=current.path_cost + step_cost)
+    return current
+
+
+def jump_point_search(problem: GridProblem, step_callback: Callable = None,
+                      stats: SearchStats = None) -> Optional[Node]:
+    """
+    Jump Point Search with step-by-step visualization
+
+    A* over jump points on a uniform-cost grid: symmetric neighbors are pruned and
+    straight or diagonal runs are crossed in one jump, so paths cost the same as
+    A* while far fewer nodes are expanded. Follows the grid's connectivity (4 or
+    8, no corner cutting). The returned Node chain lists every cell of the path.
+    """
+    if not isinstance(problem, GridProblem):
+        raise ValueError('Jump Point Search needs a grid problem (use /search_grid/)')
+    stats = stats if stats is not None else SearchStats()
+    jump_grid = _JumpGrid(problem.grid, problem.end, problem.diagonal)
+
+    node = Node(problem.start, path_cost=0)
+    f_cost = problem.heuristic_cost(problem.start)
+    frontier = [(f_cost, 0, node)]
+    reached = {problem.start: 0}
+    stats.record_push(1)
+    stats.record_reached(1)
+    # Tie-breaker so equal f-costs never compare Node objects
+    counter = 1
+
+    step_count = 0
+
+    while frontier:
+        f_cost, _, node = heapq.heappop(frontier)
+        stats.frontier_pops += 1
+        if node.path_cost > reached[node.state]:
+            stats.stale_pops += 1
+            continue
+        stats.expansions += 1
+        step_count += 1
+
+        # Send exploration step
+        if emits(step_callback, 'exploring'):
+            step_callback({
+                'type': 'exploring',
+                'node': node.state,
+                'step': step_count,
+                'g_cost': node.path_cost,
+                'f_cost': f_cost,
+                'algorithm': 'JPS',
+                'frontier_size': len(frontier)
+            })
+
+        if node.state == problem.end:
+            if emits(step_callback, 'found'):
+                step_callback({
+                    'type': 'found',
+                    'node': node.state,
+                    'step': step_count,
+                    'g_cost': node.path_cost,
+                    'algorithm': 'JPS'
+                })
+            return _expand_jump_path(node)
+
+        row, col = node.state
+        index = jump_grid.index(node.state)
+        if node.parent is None:
+            directions = [(r - row, c - col) for (r, c), _ in problem.get_actions(node.state)]
+        else:
+            parent_row, parent_col = node.parent.state
+            directions = jump_grid.directions(index, (row > parent_row) - (row < parent_row),
+                                              (col > parent_col) - (col < parent_col))
+
+        for d_row, d_col in directions:
+            jump_index = jump_grid.jump(index + d_row * jump_grid.stride + d_col, d_row, d_col)
+            if jump_index is None:
+                continue
+            jump_point = jump_grid.state(jump_index)
+            distance = max(abs(jump_point[0] - row), abs(jump_point[1] - col))
+            step_cost = distance * (DIAGONAL_COST if d_row and d_col else 1.0)
+            child_g_cost = node.path_cost + step_cost
+
+            if jump_point not in reached or child_g_cost < reached[jump_point]:
+                reached[jump_point] = child_g_cost
+                child = Node(jump_point, parent=node, action=(jump_point, step_cost),
+                             path_cost=child_g_cost)
+                child_f_cost = child_g_cost + problem.heuristic_cost(jump_point)
+                heapq.heappush(frontier, (child_f_cost, counter, child))
+                counter += 1
+                stats.record_push(len(frontier))
+                stats.record_reached(len(reached))
+
+                # Send jump point step
+                if emits(step_callback, 'jump_point'):
+                    step_callback({
+                        'type': 'jump_point',
+                        'node': jump_point,
+                        'step': step_count,
+                        'parent': node.state,
+                        'g_cost': child_g_cost,
+                        'f_cost': child_f_cost,
+                        'algorithm': 'JPS'
+                    })
+
+    return None
@@ -5,10 +5,44 @@ and provides step-by-step visualization support.
 """
 
 from queue import Queue
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import bisect
 import heapq
-from typing import Dict, List, Tuple, Optional, Any, Callable
+import json
+import multiprocessing
+import os
+import pickle
+import random
+import sys
+import threading
+from typing import Dict, Iterable, List, Tuple, Optional, Any, Callable
 import time
 
+from shared_graph import SharedGraph
+
+
+# Hill climbing limits (requests may lower these but never raise them)
+DEFAULT_MAX_STEPS = 100
+MAX_HILL_CLIMBING_STEPS = 10000
+DEFAULT_RESTARTS = 8
+MAX_RESTARTS = 64
+# Processes in the pool shared by every parallel random-restart search
+RESTART_POOL_WORKERS = os.cpu_count() or 1
+# Anytime A*: time budget for improving solutions and the weight schedule
+DEFAULT_DEADLINE_MS = 50
+MAX_DEADLINE_MS = 60000
+DEFAULT_INITIAL_WEIGHT = 3.0
+DEFAULT_WEIGHT_STEP = 0.5
+# Beam search width and bounded best-first frontier cap
+DEFAULT_BEAM_WIDTH = 3
+DEFAULT_MAX_FRONTIER = 10
+MAX_FRONTIER_CAP = 1000000
+# Yen's k-shortest paths
+DEFAULT_K_PATHS = 3
+MAX_K_PATHS = 100
+
 
 class Node:
     """Node class for search algorithms"""
@@ -22,16 +56,389 @@ class Node:
         return self.path_cost < other.path_cost
 
 
-class GraphProblem:
-    """Problem class that adapts web interface graph data for search algorithms"""
+class SearchStats:
+    """Performance counters collected while a search algorithm runs"""
     
-    def __init__(self, graph_data: Dict, start: str, end: str, heuristic: Dict = None):
+    def __init__(self):
+        self.expansions = 0
+        self.frontier_pushes = 0
+        self.frontier_pops = 0
+        self.stale_pops = 0
+        self.peak_frontier_size = 0
+        self.peak_reached_size = 0
+        self.callback_time = 0.0
+        self.search_time = 0.0
+        
+    def record_push(self, frontier_size: int):
+        """Count a frontier push and track the largest frontier seen"""
+        self.frontier_pushes += 1
+        if frontier_size > self.peak_frontier_size:
+            self.peak_frontier_size = frontier_size
+            
+    def record_reached(self, reached_size: int):
+        """Track the largest reached/visited set seen"""
+        if reached_size > self.peak_reached_size:
+            self.peak_reached_size = reached_size
+            
+    def timed_callback(self, step_callback: Optional[Callable]) -> Optional[Callable]:
+        """Wrap a step callback so the time spent inside it is accumulated separately"""
+        if step_callback is None:
+            return None
+        
+        def timed(step_data):
+            callback_start = time.perf_counter()
+            try:
+                step_callback(step_data)
+            finally:
+                self.callback_time += time.perf_counter() - callback_start
+        return timed
+        
+    def as_dict(self) -> Dict:
+        return {
+            'expansions': self.expansions,
+            'frontier_pushes': self.frontier_pushes,
+            'frontier_pops': self.frontier_pops,
+            'stale_pops': self.stale_pops,
+            'peak_frontier_size': self.peak_frontier_size,
+            'peak_reached_size': self.peak_reached_size,
+            'callback_time': self.callback_time,
+            'search_time': self.search_time,
+        }
+
+
+class StepFilter:
+    """
+    Step callback wrapper that thins out the events of large searches
+    
+    Events can be limited to a set of types, 'exploring' events decimated to
+    every Nth one, and the 'added_to_frontier' events of one expansion merged
+    into a single 'frontier_batch' event. Algorithms ask emits() before building
+    an event, so events this filter drops are never constructed.
+    """
+    
+    def __init__(self, step_callback: Callable, event_types: List[str] = None, explore_every: int = 1,
+                 batch_frontier: bool = False):
+        self.step_callback = step_callback
+        self.event_types = frozenset(event_types) if event_types is not None else None
+        self.explore_every = max(1, explore_every)
+        self.batch_frontier = batch_frontier
+        self.skipped = 0
+        self._explorations = 0
+        self._batch = None
+        
+    @classmethod
+    def from_options(cls, step_callback: Optional[Callable], options: Dict) -> Optional[Callable]:
+        """Wrap step_callback according to the events/explore_every/batch_frontier options, if any"""
+        event_types = options.get('events')
+        explore_every = _int_option(options, 'explore_every', 1, 1, MAX_FRONTIER_CAP)
+        batch_frontier = bool(options.get('batch_frontier', False))
+        if step_callback is None or (event_types is None and explore_every == 1 and not batch_frontier):
+            return step_callback
+        if event_types is not None and not isinstance(event_types, list):
+            raise ValueError('events must be a list of step types')
+        return cls(step_callback, event_types, explore_every, batch_frontier)
+        
+    def wants(self, event_type: str) -> bool:
+        if self.event_types is not None and event_type not in self.event_types and not (
+                self.batch_frontier and event_type == 'added_to_frontier'
+                and 'frontier_batch' in self.event_types):
+            self.skipped += 1
+            return False
+        if event_type == 'exploring' and self.explore_every > 1:
+            self._explorations += 1
+            if (self._explorations - 1) % self.explore_every:
+                self.skipped += 1
+                return False
+        return True
+        
+    def __call__(self, step_data: Dict):
+        if self.batch_frontier and step_data.get('type') == 'added_to_frontier':
+            parent = step_data.get('parent')
+            if self._batch is not None and self._batch['parent'] != parent:
+                self.flush()
+            if self._batch is None:
+                self._batch = {
+                    'type': 'frontier_batch',
+                    'step': step_data.get('step'),
+                    'parent': parent,
+                    'algorithm': step_data.get('algorithm'),
+                    'nodes': []
+                }
+            self._batch['nodes'].append({key: value for key, value in step_data.items()
+                                         if key not in ('type', 'step', 'parent', 'algorithm')})
+            return
+        self.flush()
+        self.step_callback(step_data)
+        
+    def flush(self):
+        """Send the pending frontier batch, if any"""
+        if self._batch is not None:
+            batch, self._batch = self._batch, None
+            self.step_callback(batch)
+
+
+def emits(step_callback: Optional[Callable], event_type: str) -> bool:
+    """Whether an event of this type should be built and sent to step_callback"""
+    if step_callback is None:
+        return False
+    wants = getattr(step_callback, 'wants', None)
+    return wants(event_type) if wants is not None else True
+
+
+class ComponentIndex:
+    """Union-find over node labels answering "same connected component?" in near O(1)"""
+    
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+        
+    def add(self, node: str):
+        if node not in self.parent:
+            self.parent[node] = node
+            self.size[node] = 1
+            
+    def find(self, node: str) -> str:
+        """Return the representative of node's component (with path halving)"""
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+        
+    def union(self, a: str, b: str):
+        """Merge the components of a and b (union by size)"""
+        self.add(a)
+        self.add(b)
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        
+    def connected(self, a: str, b: str) -> bool:
+        if a == b:
+            return True
+        if a not in self.parent or b not in self.parent:
+            return False
+        return self.find(a) == self.find(b)
+        
+    def component_size(self, node: str) -> int:
+        if node not in self.parent:
+            return 0
+        return self.size[self.find(node)]
+
+
+class CompiledGraph:
+    """
+    Web interface graph compiled in one pass over its nodes and edges
+    
+    Holds the node ID to label map, the undirected adjacency list, the connected
+    components and the canonical fingerprint, so request validation, coalescing
+    and GraphProblem share one copy instead of each walking the raw lists again.
+    Labels are interned. Raises ValueError for malformed nodes or edges.
+    
+    File loaders (graph_loaders.py) start from an empty graph and call add_node
+    and add_edge instead; their node IDs are the labels.
+    """
+    
+    def __init__(self, nodes: List[Dict] = (), edges: List[Dict] = ()):
+        self.labels = {}
+        self.adjacency = {}
+        self.components = ComponentIndex()
+        # Set once any one-way arc is added
+        self.directed = False
+        self.node_count = len(nodes)
+        self.edge_count = len(edges)
+        intern = sys.intern
+        node_keys = []
+        for node in nodes:
+            try:
+                node_id, label = str(node['id']), intern(str(node['label']))
+            except (KeyError, TypeError):
+                raise ValueError('Every node needs an id and a label')
+            self.labels[node_id] = label
+            self.adjacency[label] = []
+            self.components.add(label)
+            node_keys.append((node_id, label))
+        
+        edge_keys = []
+        for edge in edges:
+            try:
+                from_id, to_id = str(edge['from']), str(edge['to'])
+                weight = float(edge['label']) if edge.get('label') else 1.0
+            except (KeyError, TypeError):
+                raise ValueError('Every edge needs from and to node IDs')
+            except ValueError:
+                raise ValueError(f'Edge weight must be a number, got {edge.get("label")!r}')
+            from_label, to_label = self.labels.get(from_id), self.labels.get(to_id)
+            if from_label is None or to_label is None:
+                raise ValueError(f'Edge {from_id} -> {to_id} refers to an unknown node')
+            self.adjacency[from_label].append((to_label, weight))
+            self.adjacency[to_label].append((from_label, weight))
+            self.components.union(from_label, to_label)
+            edge_keys.append((from_id, to_id, weight) if from_id <= to_id else (to_id, from_id, weight))
+        
+        self._canonical = (node_keys, edge_keys)
+        self._fingerprint = None
+        
+    def add_node(self, label: str):
+        if label not in self.adjacency:
+            self.labels[label] = label
+            self.adjacency[label] = []
+            self.components.add(label)
+            self.node_count += 1
+            
+    def add_edge(self, from_label: str, to_label: str, weight: float = 1.0, directed: bool = False):
+        """Add an edge (or a single arc when directed) between labels, adding unseen nodes"""
+        if from_label not in self.adjacency:
+            self.add_node(from_label)
+        if to_label not in self.adjacency:
+            self.add_node(to_label)
+        self.adjacency[from_label].append((to_label, weight))
+        if directed:
+            self.directed = True
+        else:
+            self.adjacency[to_label].append((from_label, weight))
+        # Components ignore direction: they only rule out paths that cannot exist
+        self.components.union(from_label, to_label)
+        self.edge_count += 1
+        
+    def add_edges(self, edges: Iterable[Tuple[str, str, float]], directed: bool = False):
+        """
+        add_edge for every (from, to, weight) in `edges`
+        
+        Loaders feed millions of edges through here, so the node insertion and the
+        union-find steps are inlined rather than called per edge.
+        """
+        adjacency, labels = self.adjacency, self.labels
+        parent, size = self.components.parent, self.components.size
+        nodes = edges_added = 0
+        for from_label, to_label, weight in edges:
+            from_actions = adjacency.get(from_label)
+            if from_actions is None:
+                from_actions = adjacency[from_label] = []
+                labels[from_label] = parent[from_label] = from_label
+                size[from_label] = 1
+                nodes += 1
+            to_actions = adjacency.get(to_label)
+            if to_actions is None:
+                to_actions = adjacency[to_label] = []
+                labels[to_label] = parent[to_label] = to_label
+                size[to_label] = 1
+                nodes += 1
+            from_actions.append((to_label, weight))
+            if not directed:
+                to_actions.append((from_label, weight))
+            edges_added += 1
+            
+            # ComponentIndex.union with path halving
+            root_a = from_label
+            while parent[root_a] != root_a:
+                parent[root_a] = root_a = parent[parent[root_a]]
+            root_b = to_label
+            while parent[root_b] != root_b:
+                parent[root_b] = root_b = parent[parent[root_b]]
+            if root_a != root_b:
+                if size[root_a] < size[root_b]:
+                    root_a, root_b = root_b, root_a
+                parent[root_b] = root_a
+                size[root_a] += size[root_b]
+        
+        self.node_count += nodes
+        self.edge_count += edges_added
+        if directed and edges_added:
+            self.directed = True
+        
+    @property
+    def fingerprint(self) -> str:
+        """
+        Canonical SHA-256 of the nodes and edges the graph was built from, computed on first use
+        
+        Node order, edge order and edge direction do not change the hash, so the same
+        drawing submitted by different clients maps to the same fingerprint.
+        """
+        if self._fingerprint is None:
+            node_keys, edge_keys = self._canonical
+            self._fingerprint = _canonical_fingerprint(node_keys, edge_keys)
+        return self._fingerprint
+        
+    @fingerprint.setter
+    def fingerprint(self, value: str):
+        # Loaders use a digest of the source file rather than sorting millions of edges
+        self._fingerprint = value
+
+
+class SearchProblem:
+    """
+    Interface the search algorithms rely on
+    
+    GraphProblem materializes an adjacency list from web interface data; implicit
+    problems (see grid_problem.py) compute get_actions on the fly instead.
+    """
+    start = None
+    end = None
+    
+    def is_goal(self, state) -> bool:
+        return state == self.end
+        
+    def goal_states(self) -> List:
+        """Every goal state; problems with several goals override this"""
+        return [self.end]
+        
+    def get_neighbors(self, state) -> List:
+        """Get neighbors for simple algorithms (BFS, DFS)"""
+        return [action[0] for action in self.get_actions(state)]
+        
+    def get_actions(self, state) -> List[Tuple[Any, float]]:
+        """Get (neighbor, cost) actions available from a state"""
+        raise NotImplementedError
+        
+    def action_cost(self, state, action: Tuple[Any, float]) -> float:
+        """Get the cost of an action"""
+        return action[1]
+        
+    def heuristic_cost(self, state) -> float:
+        """Get heuristic cost (for informed search)"""
+        return 0
+        
+    def is_reachable(self) -> bool:
+        """Whether a path may exist; False only when the problem can prove there is none"""
+        return True
+
+
+class GraphProblem(SearchProblem):
+    """
+    Problem class that adapts web interface graph data for search algorithms
+    
+    `graph_data` is the raw {'nodes', 'edges'} dict, a CompiledGraph or a
+    SharedGraph, whose mapped arrays are searched in place. `end` is
+    one goal label or a collection of them; with several goals the search stops
+    at whichever is reached first. `heuristic` maps labels to estimates, or goal
+    labels to such maps, in which case each label's estimate is the minimum over
+    the goals.
+    """
+    
+    # True for imported graphs with one-way arcs; browser graphs are undirected
+    directed = False
+    
+    def __init__(self, graph_data, start: str, end, heuristic: Dict = None):
         self.start = start
         self.end = end
-        self.heuristic = heuristic if heuristic else {}
+        self.goals = frozenset(end) if isinstance(end, (list, tuple, set, frozenset)) else frozenset([end])
+        self.heuristic = self._combine_heuristics(heuristic) if heuristic else {}
         
-        # Convert web interface graph data to algorithm-compatible format
-        self.graph = self._convert_graph_data(graph_data)
+        if isinstance(graph_data, (CompiledGraph, SharedGraph)):
+            # Already converted while the request was validated or imported (add_edge
+            # updates a CompiledGraph in place; a SharedGraph is read-only)
+            self.components = graph_data.components
+            self.graph = graph_data.adjacency
+            self.directed = graph_data.directed
+        else:
+            # Convert web interface graph data to algorithm-compatible format
+            self.components = ComponentIndex()
+            self.graph = self._convert_graph_data(graph_data)
         
     def _convert_graph_data(self, graph_data: Dict) -> Dict:
         """Convert graph data from web interface to algorithm format"""
@@ -43,6 +450,8 @@ class GraphProblem:
         
         # Build adjacency list
         graph = {node['label']: [] for node in nodes}
+        for label in graph:
+            self.components.add(label)
         
         for edge in edges:
             from_label = node_map[edge['from']]
@@ -52,11 +461,37 @@ class GraphProblem:
             # Add edge in both directions (undirected graph)
             graph[from_label].append((to_label, weight))
             graph[to_label].append((from_label, weight))
+            self.components.union(from_label, to_label)
             
         return graph
         
+    def add_edge(self, from_label: str, to_label: str, weight: float = 1.0):
+        """Insert an undirected edge after construction, keeping the component index current"""
+        self.graph.setdefault(from_label, []).append((to_label, weight))
+        self.graph.setdefault(to_label, []).append((from_label, weight))
+        self.components.union(from_label, to_label)
+        
+    def _combine_heuristics(self, heuristic: Dict) -> Dict:
+        """Collapse per-goal heuristic tables into one table of minimums, once per problem"""
+        tables = list(heuristic.values())
+        if not all(isinstance(table, dict) for table in tables):
+            return heuristic
+        combined = {}
+        for table in tables:
+            for state, estimate in table.items():
+                if state not in combined or estimate < combined[state]:
+                    combined[state] = estimate
+        return combined
+        
+    def is_reachable(self) -> bool:
+        """Whether start shares a connected component with any goal"""
+        return any(self.components.connected(self.start, goal) for goal in self.goals)
+        
     def is_goal(self, state: str) -> bool:
-        return state == self.end
+        return state in self.goals
+        
+    def goal_states(self) -> List[str]:
+        return list(self.goals)
         
     def get_neighbors(self, state: str) -> List[str]:
         """Get neighbors for simple algorithms (BFS, DFS)"""
@@ -75,8 +510,76 @@ class GraphProblem:
         return self.heuristic.get(state, 0)
 
 
-def breadth_first_search(problem: GraphProblem, step_callback: Callable = None) -> Optional[Node]:
+class ContractedGraphProblem(GraphProblem):
+    """
+    GraphProblem with maximal chains of degree-2 nodes contracted into single edges
+    
+    Road-like graphs spend most of a search walking chains between junctions one
+    node at a time. Here every chain between two kept nodes (junctions, dead ends,
+    start and end) becomes one action (neighbor, summed weight, via), where via
+    lists the contracted nodes in travel order; get_path puts them back. Parallel
+    edges keep only the cheapest, so shortest path costs are unchanged.
+    """
+    
+    def __init__(self, problem: GraphProblem):
+        self.start = problem.start
+        self.end = problem.end
+        self.goals = problem.goals
+        self.heuristic = problem.heuristic
+        # Contraction never changes which kept nodes are connected
+        self.components = problem.components
+        self.original_nodes = len(problem.graph)
+        self.original_edges = sum(len(actions) for actions in problem.graph.values()) // 2
+        self.graph = self._contract(problem.graph)
+        
+    def _is_kept(self, graph: Dict, state: str) -> bool:
+        return len(graph[state]) != 2 or state == self.start or state in self.goals
+        
+    def _contract(self, graph: Dict) -> Dict:
+        contracted = {}
+        for state, actions in graph.items():
+            if not self._is_kept(graph, state):
+                continue
+            best = {}
+            for neighbor, weight in actions:
+                previous, via = state, []
+                # Walk the chain until it reaches a kept node
+                while not self._is_kept(graph, neighbor):
+                    first, second = graph[neighbor]
+                    (following, step_weight) = second if first[0] == previous else first
+                    via.append(neighbor)
+                    previous, neighbor = neighbor, following
+                    weight += step_weight
+                if neighbor == state:
+                    # A loop back to where it started never shortens a path
+                    continue
+                if neighbor not in best or weight < best[neighbor][1]:
+                    best[neighbor] = (neighbor, weight, tuple(via))
+            contracted[state] = list(best.values())
+        return contracted
+        
+    def reduction(self) -> Dict:
+        """Size of the graph before and after contraction"""
+        nodes = len(self.graph)
+        edges = sum(len(actions) for actions in self.graph.values()) // 2
+        return {
+            'original_nodes': self.original_nodes,
+            'original_edges': self.original_edges,
+            'contracted_nodes': nodes,
+            'contracted_edges': edges,
+            'reduction_ratio': 1 - nodes / self.original_nodes if self.original_nodes else 0.0
+        }
+
+
+def _canonical_fingerprint(nodes: List[Tuple], edges: List[Tuple]) -> str:
+    canonical = json.dumps([sorted(nodes), sorted(edges)], separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def breadth_first_search(problem: SearchProblem, step_callback: Callable = None,
+                         stats: SearchStats = None) -> Optional[Node]:
     """Breadth-First Search algorithm with step-by-step visualization"""
+    stats = stats if stats is not None else SearchStats()
     node = Node(state=problem.start)
     if problem.is_goal(node.state):
         return node
@@ -84,15 +587,19 @@ def breadth_first_search(problem: GraphProblem, step_callback: Callable = None)
     frontier = Queue()
     reached = {problem.start}
     frontier.put(node)
+    stats.record_push(1)
+    stats.record_reached(1)
     
     step_count = 0
     
     while not frontier.empty():
         node = frontier.get()
+        stats.frontier_pops += 1
+        stats.expansions += 1
         step_count += 1
         
         # Send exploration step
-        if step_callback:
+        if emits(step_callback, 'exploring'):
             step_callback({
                 'type': 'exploring',
                 'node': node.state,
@@ -109,7 +616,7 @@ def breadth_first_search(problem: GraphProblem, step_callback: Callable = None)
                 
                 if problem.is_goal(child.state):
                     # Send success step
-                    if step_callback:
+                    if emits(step_callback, 'found'):
                         step_callback({
                             'type': 'found',
                             'node': child.state,
@@ -120,9 +627,11 @@ def breadth_first_search(problem: GraphProblem, step_callback: Callable = None)
                     
                 reached.add(neighbor)
                 frontier.put(child)
+                stats.record_push(frontier.qsize())
+                stats.record_reached(len(reached))
                 
                 # Send added to frontier step
-                if step_callback:
+                if emits(step_callback, 'added_to_frontier'):
                     step_callback({
                         'type': 'added_to_frontier',
                         'node': neighbor,
@@ -135,8 +644,10 @@ def breadth_first_search(problem: GraphProblem, step_callback: Callable = None)
     return None
 
 
-def depth_first_search(problem: GraphProblem, step_callback: Callable = None) -> Optional[Node]:
+def depth_first_search(problem: SearchProblem, step_callback: Callable = None,
+                       stats: SearchStats = None) -> Optional[Node]:
     """Depth-First Search algorithm with step-by-step visualization"""
+    stats = stats if stats is not None else SearchStats()
     node = Node(state=problem.start)
     if problem.is_goal(node.state):
         return node
@@ -144,15 +655,19 @@ def depth_first_search(problem: GraphProblem, step_callback: Callable = None) ->
     frontier = []
     reached = {problem.start}
     frontier.append(node)
+    stats.record_push(1)
+    stats.record_reached(1)
     
     step_count = 0
     
     while frontier:
         node = frontier.pop()
+        stats.frontier_pops += 1
+        stats.expansions += 1
         step_count += 1
         
         # Send exploration step
-        if step_callback:
+        if emits(step_callback, 'exploring'):
             step_callback({
                 'type': 'exploring',
                 'node': node.state,
@@ -169,7 +684,7 @@ def depth_first_search(problem: GraphProblem, step_callback: Callable = None) ->
                 
                 if problem.is_goal(child.state):
                     # Send success step
-                    if step_callback:
+                    if emits(step_callback, 'found'):
                         step_callback({
                             'type': 'found',
                             'node': child.state,
@@ -180,9 +695,11 @@ def depth_first_search(problem: GraphProblem, step_callback: Callable = None) ->
                     
                 reached.add(neighbor)
                 frontier.append(child)
+                stats.record_push(len(frontier))
+                stats.record_reached(len(reached))
                 
                 # Send added to frontier step
-                if step_callback:
+                if emits(step_callback, 'added_to_frontier'):
                     step_callback({
                         'type': 'added_to_frontier',
                         'node': neighbor,
@@ -195,21 +712,31 @@ def depth_first_search(problem: GraphProblem, step_callback: Callable = None) ->
     return None
 
 
-def dijkstra_search(problem: GraphProblem, step_callback: Callable = None) -> Optional[Node]:
+def dijkstra_search(problem: SearchProblem, step_callback: Callable = None,
+                    stats: SearchStats = None) -> Optional[Node]:
     """Dijkstra's algorithm for shortest path with step-by-step visualization"""
+    stats = stats if stats is not None else SearchStats()
     node = Node(problem.start, path_cost=0)
     frontier = []
     heapq.heappush(frontier, node)
     reached = {problem.start: 0}
+    stats.record_push(1)
+    stats.record_reached(1)
     
     step_count = 0
     
     while frontier:
         node = heapq.heappop(frontier)
+        stats.frontier_pops += 1
+        if node.path_cost > reached[node.state]:
+            # A cheaper entry for this state was pushed later (lazy deletion)
+            stats.stale_pops += 1
+            continue
+        stats.expansions += 1
         step_count += 1
         
         # Send exploration step
-        if step_callback:
+        if emits(step_callback, 'exploring'):
             step_callback({
                 'type': 'exploring',
                 'node': node.state,
@@ -221,7 +748,7 @@ def dijkstra_search(problem: GraphProblem, step_callback: Callable = None) -> Op
         
         if problem.is_goal(node.state):
             # Send success step
-            if step_callback:
+            if emits(step_callback, 'found'):
                 step_callback({
                     'type': 'found',
                     'node': node.state,
@@ -239,9 +766,11 @@ def dijkstra_search(problem: GraphProblem, step_callback: Callable = None) -> Op
                 reached[child_state] = child_cost
                 child = Node(state=child_state, parent=node, action=action, path_cost=child_cost)
                 heapq.heappush(frontier, child)
+                stats.record_push(len(frontier))
+                stats.record_reached(len(reached))
                 
                 # Send added to frontier step
-                if step_callback:
+                if emits(step_callback, 'added_to_frontier'):
                     step_callback({
                         'type': 'added_to_frontier',
                         'node': child_state,
@@ -254,21 +783,31 @@ def dijkstra_search(problem: GraphProblem, step_callback: Callable = None) -> Op
     return None
 
 
-def best_first_search(problem: GraphProblem, step_callback: Callable = None) -> Optional[Node]:
+def best_first_search(problem: SearchProblem, step_callback: Callable = None,
+                      stats: SearchStats = None) -> Optional[Node]:
     """Best-First Search algorithm with step-by-step visualization"""
+    stats = stats if stats is not None else SearchStats()
     node = Node(problem.start, path_cost=problem.heuristic_cost(problem.start))
     frontier = []
     heapq.heappush(frontier, node)
     reached = {problem.start: node.path_cost}
+    stats.record_push(1)
+    stats.record_reached(1)
     
     step_count = 0
     
     while frontier:
         node = heapq.heappop(frontier)
+        stats.frontier_pops += 1
+        if node.path_cost > reached[node.state]:
+            # A cheaper entry for this state was pushed later (lazy deletion)
+            stats.stale_pops += 1
+            continue
+        stats.expansions += 1
         step_count += 1
         
         # Send exploration step
-        if step_callback:
+        if emits(step_callback, 'exploring'):
             step_callback({
                 'type': 'exploring',
                 'node': node.state,
@@ -280,7 +819,7 @@ def best_first_search(problem: GraphProblem, step_callback: Callable = None) ->
         
         if problem.is_goal(node.state):
             # Send success step
-            if step_callback:
+            if emits(step_callback, 'found'):
                 step_callback({
                     'type': 'found',
                     'node': node.state,
@@ -300,9 +839,11 @@ def best_first_search(problem: GraphProblem, step_callback: Callable = None) ->
                 reached[child_state] = child_cost
                 child = Node(state=child_state, parent=node, action=action, path_cost=child_cost)
                 heapq.heappush(frontier, child)
+                stats.record_push(len(frontier))
+                stats.record_reached(len(reached))
                 
                 # Send added to frontier step
-                if step_callback:
+                if emits(step_callback, 'added_to_frontier'):
                     step_callback({
                         'type': 'added_to_frontier',
                         'node': child_state,
@@ -315,23 +856,263 @@ def best_first_search(problem: GraphProblem, step_callback: Callable = None) ->
     return None
 
 
-def a_star_search(problem: GraphProblem, step_callback: Callable = None) -> Optional[Node]:
+def beam_search(problem: SearchProblem, step_callback: Callable = None,
+                beam_width: int = DEFAULT_BEAM_WIDTH, pruning_stats: Dict = None,
+                stats: SearchStats = None) -> Optional[Node]:
+    """
+    Beam Search with step-by-step visualization
+    
+    Expands the search one layer at a time and keeps only the beam_width children
+    with the lowest heuristic, so the frontier never holds more than beam_width
+    nodes. Pruned children are sent as 'pruned' steps and may come back later
+    through a cheaper path. Fast and memory-bounded, but neither complete nor
+    optimal. pruning_stats, when given, is filled with the cap, the peak frontier
+    size and the number of pruned nodes.
+    """
+    stats = stats if stats is not None else SearchStats()
+    pruning_stats = pruning_stats if pruning_stats is not None else {}
+    beam_width = max(1, beam_width)
+    beam = [Node(problem.start, path_cost=0)]
+    reached = {problem.start: 0}
+    stats.record_push(1)
+    stats.record_reached(1)
+    pruned_count = 0
+    
+    step_count = 0
+    solution = None
+    
+    while beam and solution is None:
+        candidates = {}
+        for node in beam:
+            stats.frontier_pops += 1
+            stats.expansions += 1
+            step_count += 1
+            
+            # Send exploration step
+            if emits(step_callback, 'exploring'):
+                step_callback({
+                    'type': 'exploring',
+                    'node': node.state,
+                    'step': step_count,
+                    'cost': node.path_cost,
+                    'algorithm': 'Beam',
+                    'frontier_size': len(beam)
+                })
+            
+            if problem.is_goal(node.state):
+                # Send success step
+                if emits(step_callback, 'found'):
+                    step_callback({
+                        'type': 'found',
+                        'node': node.state,
+                        'step': step_count,
+                        'cost': node.path_cost,
+                        'algorithm': 'Beam'
+                    })
+                solution = node
+                break
+            
+            for action in problem.get_actions(node.state):
+                child_state = action[0]
+                child_cost = node.path_cost + problem.action_cost(node.state, action)
+                if child_state in reached and reached[child_state] <= child_cost:
+                    continue
+                if child_state not in candidates or child_cost < candidates[child_state].path_cost:
+                    candidates[child_state] = Node(state=child_state, parent=node, action=action,
+                                                   path_cost=child_cost)
+        if solution is not None:
+            break
+        
+        # Keep the beam_width most promising children
+        ranked = sorted(candidates.values(),
+                        key=lambda child: (problem.heuristic_cost(child.state), child.path_cost))
+        beam = ranked[:beam_width]
+        for child in beam:
+            reached[child.state] = child.path_cost
+            stats.record_push(len(beam))
+            stats.record_reached(len(reached))
+            
+            # Send added to frontier step
+            if emits(step_callback, 'added_to_frontier'):
+                step_callback({
+                    'type': 'added_to_frontier',
+                    'node': child.state,
+                    'step': step_count,
+                    'parent': child.parent.state,
+                    'cost': child.path_cost,
+                    'algorithm': 'Beam'
+                })
+        for child in ranked[beam_width:]:
+            pruned_count += 1
+            
+            # Send pruned step
+            if emits(step_callback, 'pruned'):
+                step_callback({
+                    'type': 'pruned',
+                    'node': child.state,
+                    'step': step_count,
+                    'parent': child.parent.state,
+                    'heuristic': problem.heuristic_cost(child.state),
+                    'reason': f'outside the beam (width {beam_width})',
+                    'algorithm': 'Beam'
+                })
+    
+    pruning_stats.update({
+        'frontier_cap': beam_width,
+        'peak_frontier_size': stats.peak_frontier_size,
+        'pruned': pruned_count
+    })
+    return solution
+
+
+def bounded_best_first_search(problem: SearchProblem, step_callback: Callable = None,
+                              max_frontier: int = DEFAULT_MAX_FRONTIER, pruning_stats: Dict = None,
+                              stats: SearchStats = None) -> Optional[Node]:
+    """
+    Best-First Search with a bounded frontier and step-by-step visualization
+    
+    Same ordering as best_first_search, but the frontier is a sorted list capped
+    at max_frontier entries, kept worst first so expanding the best entry pops
+    it from the end: once full, a new child either evicts the worst entry or is
+    dropped itself. Evicted states are forgotten, so they can be reached
+    again later. Each eviction is sent as a 'pruned' step; pruning_stats, when
+    given, is filled with the cap, the peak frontier size and the number of
+    pruned nodes.
+    """
+    stats = stats if stats is not None else SearchStats()
+    pruning_stats = pruning_stats if pruning_stats is not None else {}
+    max_frontier = max(1, max_frontier)
+    node = Node(problem.start, path_cost=problem.heuristic_cost(problem.start))
+    # Entries are (-priority, -counter, node) in ascending order: worst first, best last,
+    # and among equal priorities the earliest added last, as in best_first_search
+    frontier = [(-node.path_cost, 0, node)]
+    counter = 1
+    reached = {problem.start: node.path_cost}
+    stats.record_push(1)
+    stats.record_reached(1)
+    pruned_count = 0
+    
+    step_count = 0
+    solution = None
+    
+    def prune(entry, reason):
+        nonlocal pruned_count
+        pruned_count += 1
+        evicted = entry[2]
+        if reached.get(evicted.state) == evicted.path_cost:
+            del reached[evicted.state]
+        if emits(step_callback, 'pruned'):
+            step_callback({
+                'type': 'pruned',
+                'node': evicted.state,
+                'step': step_count,
+                'parent': evicted.parent.state if evicted.parent else None,
+                'cost': evicted.path_cost,
+                'reason': reason,
+                'algorithm': 'Bounded Best-First'
+            })
+    
+    while frontier:
+        _, _, node = frontier.pop()
+        stats.frontier_pops += 1
+        if reached.get(node.state) != node.path_cost:
+            # A cheaper entry for this state was added later (lazy deletion)
+            stats.stale_pops += 1
+            continue
+        stats.expansions += 1
+        step_count += 1
+        
+        # Send exploration step
+        if emits(step_callback, 'exploring'):
+            step_callback({
+                'type': 'exploring',
+                'node': node.state,
+                'step': step_count,
+                'cost': node.path_cost,
+                'algorithm': 'Bounded Best-First',
+                'frontier_size': len(frontier)
+            })
+        
+        if problem.is_goal(node.state):
+            # Send success step
+            if emits(step_callback, 'found'):
+                step_callback({
+                    'type': 'found',
+                    'node': node.state,
+                    'step': step_count,
+                    'cost': node.path_cost,
+                    'algorithm': 'Bounded Best-First'
+                })
+            solution = node
+            break
+            
+        for action in problem.get_actions(node.state):
+            child_state = action[0]
+            child_cost = (node.path_cost - problem.heuristic_cost(node.state) + 
+                         problem.action_cost(node.state, action) + 
+                         problem.heuristic_cost(child_state))
+            
+            if child_state not in reached or child_cost < reached[child_state]:
+                child = Node(state=child_state, parent=node, action=action, path_cost=child_cost)
+                entry = (-child_cost, -counter, child)
+                counter += 1
+                if len(frontier) >= max_frontier:
+                    if entry <= frontier[0]:
+                        # No better than anything kept, so the child itself is dropped
+                        prune(entry, f'frontier full (cap {max_frontier})')
+                        continue
+                    prune(frontier.pop(0), f'evicted from full frontier (cap {max_frontier})')
+                reached[child_state] = child_cost
+                bisect.insort(frontier, entry)
+                stats.record_push(len(frontier))
+                stats.record_reached(len(reached))
+                
+                # Send added to frontier step
+                if emits(step_callback, 'added_to_frontier'):
+                    step_callback({
+                        'type': 'added_to_frontier',
+                        'node': child_state,
+                        'step': step_count,
+                        'parent': node.state,
+                        'cost': child_cost,
+                        'algorithm': 'Bounded Best-First'
+                    })
+    
+    pruning_stats.update({
+        'frontier_cap': max_frontier,
+        'peak_frontier_size': stats.peak_frontier_size,
+        'pruned': pruned_count
+    })
+    return solution
+
+
+def a_star_search(problem: SearchProblem, step_callback: Callable = None,
+                  stats: SearchStats = None) -> Optional[Node]:
     """A* Search algorithm with step-by-step visualization"""
+    stats = stats if stats is not None else SearchStats()
     node = Node(problem.start, path_cost=0)
     # For A*, the priority is f(n) = g(n) + h(n)
     node.f_cost = node.path_cost + problem.heuristic_cost(problem.start)
     frontier = []
     heapq.heappush(frontier, (node.f_cost, node))
     reached = {problem.start: node.path_cost}
+    stats.record_push(1)
+    stats.record_reached(1)
     
     step_count = 0
     
     while frontier:
         f_cost, node = heapq.heappop(frontier)
+        stats.frontier_pops += 1
+        if node.path_cost > reached[node.state]:
+            # A cheaper entry for this state was pushed later (lazy deletion)
+            stats.stale_pops += 1
+            continue
+        stats.expansions += 1
         step_count += 1
         
         # Send exploration step
-        if step_callback:
+        if emits(step_callback, 'exploring'):
             step_callback({
                 'type': 'exploring',
                 'node': node.state,
@@ -345,7 +1126,7 @@ def a_star_search(problem: GraphProblem, step_callback: Callable = None) -> Opti
         
         if problem.is_goal(node.state):
             # Send success step
-            if step_callback:
+            if emits(step_callback, 'found'):
                 step_callback({
                     'type': 'found',
                     'node': node.state,
@@ -367,9 +1148,11 @@ def a_star_search(problem: GraphProblem, step_callback: Callable = None) -> Opti
                 child = Node(state=child_state, parent=node, action=action, path_cost=child_g_cost)
                 child.f_cost = child_f_cost
                 heapq.heappush(frontier, (child_f_cost, child))
+                stats.record_push(len(frontier))
+                stats.record_reached(len(reached))
                 
                 # Send added to frontier step
-                if step_callback:
+                if emits(step_callback, 'added_to_frontier'):
                     step_callback({
                         'type': 'added_to_frontier',
                         'node': child_state,
@@ -384,19 +1167,424 @@ def a_star_search(problem: GraphProblem, step_callback: Callable = None) -> Opti
     return None
 
 
-def hill_climbing_search(problem: GraphProblem, step_callback: Callable = None) -> Optional[Node]:
+def anytime_a_star_search(problem: SearchProblem, step_callback: Callable = None,
+                          deadline: float = DEFAULT_DEADLINE_MS / 1000,
+                          weight: float = DEFAULT_INITIAL_WEIGHT, weight_step: float = DEFAULT_WEIGHT_STEP,
+                          anytime_stats: Dict = None, stats: SearchStats = None) -> Optional[Node]:
+    """
+    Anytime Repairing A* (ARA*) with step-by-step visualization
+    
+    Runs weighted A* (f = g + weight * h) to find a path quickly, then lowers the
+    weight by weight_step and repairs the search, reusing its g-values, until the
+    weight reaches 1 or `deadline` seconds have passed. The first solution is
+    always searched for in full; only the improvement phase is cut off. Each
+    improved solution is sent as an 'improved_solution' step together with its
+    suboptimality bound: cost <= bound * optimal cost, valid when the heuristic
+    is admissible. anytime_stats, when given, is filled with the weights used,
+    the number of solutions, the final bound and whether the deadline cut the
+    search short.
+    """
+    stats = stats if stats is not None else SearchStats()
+    anytime_stats = anytime_stats if anytime_stats is not None else {}
+    deadline_at = time.perf_counter() + deadline
+    weight = initial_weight = max(1.0, weight)
+    weight_step = max(weight_step, 1e-3)
+    
+    start_node = Node(problem.start, path_cost=0)
+    nodes = {problem.start: start_node}
+    open_set = {problem.start}
+    closed = set()
+    inconsistent = set()
+    # Heap entries are (f, tie-breaker, state, g); entries whose g is out of date are skipped
+    frontier = [(weight * problem.heuristic_cost(problem.start), 0, problem.start, 0)]
+    counter = 1
+    stats.record_push(1)
+    stats.record_reached(1)
+    
+    goal_node = None
+    best = None
+    bound = float('inf')
+    solutions = 0
+    deadline_reached = False
+    step_count = 0
+    
+    def f_value(state):
+        return nodes[state].path_cost + weight * problem.heuristic_cost(state)
+    
+    def goal_cost():
+        return goal_node.path_cost if goal_node is not None else float('inf')
+    
+    while True:
+        # Improve the path for the current weight
+        while frontier:
+            f_cost, _, state, g_cost = frontier[0]
+            if state not in open_set or g_cost != nodes[state].path_cost:
+                heapq.heappop(frontier)
+                stats.frontier_pops += 1
+                stats.stale_pops += 1
+                continue
+            if goal_cost() <= f_cost:
+                break
+            if best is not None and time.perf_counter() >= deadline_at:
+                deadline_reached = True
+                break
+            
+            heapq.heappop(frontier)
+            stats.frontier_pops += 1
+            open_set.discard(state)
+            closed.add(state)
+            node = nodes[state]
+            stats.expansions += 1
+            step_count += 1
+            
+            # Send exploration step
+            if emits(step_callback, 'exploring'):
+                step_callback({
+                    'type': 'exploring',
+                    'node': state,
+                    'step': step_count,
+                    'g_cost': node.path_cost,
+                    'f_cost': f_cost,
+                    'weight': weight,
+                    'algorithm': 'ARA*',
+                    'frontier_size': len(open_set)
+                })
+            
+            if problem.is_goal(state):
+                goal_node = node
+                continue
+            
+            for action in problem.get_actions(state):
+                child_state = action[0]
+                child_g_cost = node.path_cost + problem.action_cost(state, action)
+                if child_state in nodes and child_g_cost >= nodes[child_state].path_cost:
+                    continue
+                child = Node(state=child_state, parent=node, action=action, path_cost=child_g_cost)
+                nodes[child_state] = child
+                stats.record_reached(len(nodes))
+                if problem.is_goal(child_state):
+                    goal_node = child
+                if child_state in closed:
+                    # Already expanded at this weight: revisit it in the next iteration
+                    inconsistent.add(child_state)
+                    continue
+                open_set.add(child_state)
+                child_f_cost = f_value(child_state)
+                heapq.heappush(frontier, (child_f_cost, counter, child_state, child_g_cost))
+                counter += 1
+                stats.record_push(len(frontier))
+                
+                # Send added to frontier step
+                if emits(step_callback, 'added_to_frontier'):
+                    step_callback({
+                        'type': 'added_to_frontier',
+                        'node': child_state,
+                        'step': step_count,
+                        'parent': state,
+                        'g_cost': child_g_cost,
+                        'f_cost': child_f_cost,
+                        'weight': weight,
+                        'algorithm': 'ARA*'
+                    })
+        
+        if goal_node is None:
+            break
+        if best is None or goal_node.path_cost < best.path_cost:
+            if not deadline_reached:
+                # No unexplored state can beat the lowest g + h still pending
+                pending = [nodes[state].path_cost + problem.heuristic_cost(state)
+                           for state in open_set | inconsistent]
+                lower_bound = min(pending) if pending else goal_node.path_cost
+                bound = weight if lower_bound <= 0 else min(weight, goal_node.path_cost / lower_bound)
+                bound = max(1.0, bound)
+            # An interrupted iteration keeps the previous bound, which still holds for a cheaper path
+            best = goal_node
+            solutions += 1
+            if emits(step_callback, 'improved_solution'):
+                step_callback({
+                    'type': 'improved_solution',
+                    'path': get_path(best),
+                    'cost': best.path_cost,
+                    'weight': weight,
+                    'bound': bound,
+                    'step': step_count,
+                    'algorithm': 'ARA*'
+                })
+        
+        if deadline_reached or weight <= 1.0 or time.perf_counter() >= deadline_at:
+            deadline_reached = deadline_reached or weight > 1.0
+            break
+        
+        # Lower the weight and repair: inconsistent states rejoin the frontier, reordered
+        weight = max(1.0, weight - weight_step)
+        open_set |= inconsistent
+        inconsistent = set()
+        closed = set()
+        frontier = [(f_value(state), index, state, nodes[state].path_cost)
+                    for index, state in enumerate(open_set, start=counter)]
+        counter += len(frontier)
+        heapq.heapify(frontier)
+    
+    anytime_stats.update({
+        'initial_weight': initial_weight,
+        'final_weight': weight,
+        'solutions': solutions,
+        'suboptimality_bound': bound if best is not None else None,
+        'deadline_reached': deadline_reached
+    })
+    return best
+
+
+class _PathTrie:
+    """Prefix trie of accepted paths; each node caches the spur path last found below its prefix"""
+    
+    __slots__ = ('children', 'spur')
+    
+    def __init__(self):
+        self.children = {}
+        self.spur = None
+        
+    def insert(self, path: List):
+        node = self
+        for state in path:
+            node = node.children.setdefault(state, _PathTrie())
+            
+    def find(self, prefix: List) -> '_PathTrie':
+        node = self
+        for state in prefix:
+            node = node.children[state]
+        return node
+
+
+def _reverse_shortest_path_tree(problem: SearchProblem, stats: SearchStats) -> Tuple[Dict, Dict]:
+    """Dijkstra from the goals: distance to the nearest goal and next hop toward it for every reachable state"""
+    goals = problem.goal_states()
+    distance = {goal: 0.0 for goal in goals}
+    next_hop = {goal: None for goal in goals}
+    frontier = [(0.0, index, goal) for index, goal in enumerate(goals)]
+    counter = len(frontier)
+    while frontier:
+        cost, _, state = heapq.heappop(frontier)
+        stats.frontier_pops += 1
+        if cost > distance[state]:
+            stats.stale_pops += 1
+            continue
+        stats.expansions += 1
+        # Undirected graphs: the cost from a neighbor to state equals the cost back
+        for action in problem.get_actions(state):
+            neighbor = action[0]
+            neighbor_cost = cost + problem.action_cost(state, action)
+            if neighbor not in distance or neighbor_cost < distance[neighbor]:
+                distance[neighbor] = neighbor_cost
+                next_hop[neighbor] = state
+                heapq.heappush(frontier, (neighbor_cost, counter, neighbor))
+                counter += 1
+                stats.record_push(len(frontier))
+                stats.record_reached(len(distance))
+    return distance, next_hop
+
+
+def _edge_cost(problem: SearchProblem, state, neighbor) -> float:
+    return min(problem.action_cost(state, action) for action in problem.get_actions(state)
+               if action[0] == neighbor)
+
+
+def _spur_search(problem: SearchProblem, spur, blocked: set, removed: set, distance: Dict,
+                 stats: SearchStats) -> Optional[List]:
+    """
+    Cheapest path from spur to the goal avoiding blocked states and the removed first edges
+    
+    A* guided by the unrestricted distances to the goal, which stay a consistent
+    lower bound when states and edges are taken away.
+    """
+    frontier = [(distance.get(spur, 0.0), 0, spur, 0.0)]
+    counter = 1
+    g_costs = {spur: 0.0}
+    parents = {spur: None}
+    while frontier:
+        _, _, state, cost = heapq.heappop(frontier)
+        stats.frontier_pops += 1
+        if cost > g_costs[state]:
+            stats.stale_pops += 1
+            continue
+        if problem.is_goal(state):
+            path = []
+            while state is not None:
+                path.append(state)
+                state = parents[state]
+            return path[::-1]
+        stats.expansions += 1
+        for action in problem.get_actions(state):
+            neighbor = action[0]
+            if neighbor in blocked or (state == spur and neighbor in removed) or neighbor not in distance:
+                continue
+            neighbor_cost = cost + problem.action_cost(state, action)
+            if neighbor not in g_costs or neighbor_cost < g_costs[neighbor]:
+                g_costs[neighbor] = neighbor_cost
+                parents[neighbor] = state
+                heapq.heappush(frontier, (neighbor_cost + distance[neighbor], counter, neighbor, neighbor_cost))
+                counter += 1
+                stats.record_push(len(frontier))
+                stats.record_reached(len(g_costs))
+    return None
+
+
+def k_shortest_paths_search(problem: SearchProblem, step_callback: Callable = None,
+                            k: int = DEFAULT_K_PATHS, k_shortest: Dict = None,
+                            stats: SearchStats = None) -> Optional[Node]:
+    """
+    Yen's k-shortest loopless paths with step-by-step visualization
+    
+    Each new path is the cheapest candidate made of a root (a prefix of an earlier
+    path) and a spur path from the root's last state that avoids the root and the
+    edges earlier paths took from that prefix. One Dijkstra from the goal gives
+    every spur search an exact heuristic, and its tree path is used as is when it
+    avoids the restrictions. Accepted paths are kept in a prefix trie so the edges
+    to remove are found by walking the trie, and a prefix whose cached spur path
+    is still allowed is not searched again. Assumes an undirected graph.
+    
+    Returns the cheapest path; k_shortest, when given, is filled with every path
+    found ('paths', cheapest first) and the spur search counters. Candidates and
+    accepted paths are sent as 'candidate_path' and 'path_found' steps.
+    """
+    if getattr(problem, 'directed', False):
+        # The reverse shortest path tree walks arcs backwards from the goals
+        raise ValueError('K-shortest paths needs an undirected graph')
+    stats = stats if stats is not None else SearchStats()
+    k_shortest = k_shortest if k_shortest is not None else {}
+    k = max(1, k)
+    counts = {'spur_searches': 0, 'spur_tree_hits': 0, 'spur_cache_hits': 0}
+    
+    distance, next_hop = _reverse_shortest_path_tree(problem, stats)
+    
+    def tree_path(state) -> List:
+        path = [state]
+        while next_hop[state] is not None:
+            state = next_hop[state]
+            path.append(state)
+        return path
+    
+    def path_costs(path: List) -> List[float]:
+        costs = [0.0]
+        for state, neighbor in zip(path, path[1:]):
+            costs.append(costs[-1] + _edge_cost(problem, state, neighbor))
+        return costs
+    
+    accepted = []
+    if problem.start in distance:
+        first = tree_path(problem.start)
+        accepted.append((first, path_costs(first)))
+    trie = _PathTrie()
+    candidates = []
+    seen = set()
+    counter = 0
+    step_count = 0
+    
+    def accept(path, costs):
+        trie.insert(path)
+        seen.add(tuple(path))
+        if emits(step_callback, 'path_found'):
+            step_callback({
+                'type': 'path_found',
+                'path': path,
+                'cost': costs[-1],
+                'rank': len(accepted),
+                'step': step_count,
+                'algorithm': 'Yen'
+            })
+    
+    if accepted:
+        accept(*accepted[0])
+    
+    while accepted and len(accepted) < k:
+        previous, previous_costs = accepted[-1]
+        for index in range(len(previous) - 1):
+            spur = previous[index]
+            root = previous[:index + 1]
+            prefix = trie.find(root)
+            # Edges earlier paths took from this prefix may not be reused
+            removed = set(prefix.children)
+            blocked = set(root[:-1])
+            step_count += 1
+            
+            spur_path = prefix.spur
+            if spur_path is not None and (not spur_path or spur_path[1] not in removed):
+                # Restrictions only grow, so a cached spur path that is still allowed is
+                # still the cheapest, and a prefix with no spur path never gets one
+                counts['spur_cache_hits'] += 1
+            else:
+                spur_path = tree_path(spur)
+                if spur_path[1] not in removed and blocked.isdisjoint(spur_path):
+                    counts['spur_tree_hits'] += 1
+                else:
+                    counts['spur_searches'] += 1
+                    spur_path = _spur_search(problem, spur, blocked, removed, distance, stats) or []
+                prefix.spur = spur_path
+            if not spur_path:
+                continue
+            
+            path = root + spur_path[1:]
+            if tuple(path) in seen:
+                continue
+            seen.add(tuple(path))
+            costs = previous_costs[:index + 1]
+            for state, neighbor in zip(spur_path, spur_path[1:]):
+                costs.append(costs[-1] + _edge_cost(problem, state, neighbor))
+            heapq.heappush(candidates, (costs[-1], counter, path, costs))
+            counter += 1
+            stats.record_push(len(candidates))
+            
+            # Send candidate step
+            if emits(step_callback, 'candidate_path'):
+                step_callback({
+                    'type': 'candidate_path',
+                    'path': path,
+                    'cost': costs[-1],
+                    'spur_node': spur,
+                    'step': step_count,
+                    'algorithm': 'Yen'
+                })
+        
+        if not candidates:
+            break
+        _, _, path, costs = heapq.heappop(candidates)
+        stats.frontier_pops += 1
+        accepted.append((path, costs))
+        accept(path, costs)
+    
+    k_shortest.update({
+        'k_requested': k,
+        'k_found': len(accepted),
+        'paths': [{'path': path, 'cost': costs[-1]} for path, costs in accepted],
+        **counts
+    })
+    if not accepted:
+        return None
+    
+    # Rebuild the cheapest path as a Node chain for get_path
+    path, costs = accepted[0]
+    node = Node(path[0], path_cost=0)
+    for state, cost in zip(path[1:], costs[1:]):
+        node = Node(state, parent=node, action=(state, cost - node.path_cost), path_cost=cost)
+    return node
+
+
+def hill_climbing_search(problem: SearchProblem, step_callback: Callable = None,
+                         max_steps: int = DEFAULT_MAX_STEPS, stats: SearchStats = None) -> Optional[Node]:
     """Hill Climbing Search algorithm with step-by-step visualization"""
+    stats = stats if stats is not None else SearchStats()
     current = Node(problem.start, path_cost=0)
     step_count = 0
     visited = set()  # Track visited nodes to prevent infinite loops
-    max_steps = 100  # Safety limit to prevent infinite loops
     
     while step_count < max_steps:
         step_count += 1
+        stats.expansions += 1
         visited.add(current.state)
+        stats.record_reached(len(visited))
         
         # Send exploration step
-        if step_callback:
+        if emits(step_callback, 'exploring'):
             heuristic_value = problem.heuristic_cost(current.state)
             step_callback({
                 'type': 'exploring',
@@ -408,7 +1596,7 @@ def hill_climbing_search(problem: GraphProblem, step_callback: Callable = None)
         
         if problem.is_goal(current.state):
             # Send success step
-            if step_callback:
+            if emits(step_callback, 'found'):
                 heuristic_value = problem.heuristic_cost(current.state)
                 step_callback({
                     'type': 'found',
@@ -430,7 +1618,7 @@ def hill_climbing_search(problem: GraphProblem, step_callback: Callable = None)
         
         if not neighbors:
             # No unvisited neighbors available
-            if step_callback:
+            if emits(step_callback, 'no_path'):
                 step_callback({
                     'type': 'no_path',
                     'node': current.state,
@@ -446,7 +1634,7 @@ def hill_climbing_search(problem: GraphProblem, step_callback: Callable = None)
         
         # If no neighbor is better than current, we're stuck (local optimum)
         if best_heuristic >= problem.heuristic_cost(current.state):
-            if step_callback:
+            if emits(step_callback, 'local_optimum'):
                 current_heuristic = problem.heuristic_cost(current.state)
                 step_callback({
                     'type': 'local_optimum',
@@ -461,7 +1649,7 @@ def hill_climbing_search(problem: GraphProblem, step_callback: Callable = None)
         # Move to the best neighbor
         current = Node(state=best_neighbor, parent=current, action=best_action, path_cost=best_cost)
         
-        if step_callback:
+        if emits(step_callback, 'move_to_neighbor'):
             step_callback({
                 'type': 'move_to_neighbor',
                 'node': best_neighbor,
@@ -472,7 +1660,7 @@ def hill_climbing_search(problem: GraphProblem, step_callback: Callable = None)
             })
     
     # If we reach here, we've exceeded max steps
-    if step_callback:
+    if emits(step_callback, 'no_path'):
         step_callback({
             'type': 'no_path',
             'node': current.state,
@@ -483,8 +1671,263 @@ def hill_climbing_search(problem: GraphProblem, step_callback: Callable = None)
     return None
 
 
+def stochastic_hill_climbing_search(problem: SearchProblem, step_callback: Callable = None,
+                                    max_steps: int = DEFAULT_MAX_STEPS, seed: int = None,
+                                    first_choice: bool = False, stats: SearchStats = None) -> Optional[Node]:
+    """
+    Stochastic Hill Climbing with step-by-step visualization
+
+    Instead of always taking the steepest neighbor, picks randomly among the
+    improving neighbors, weighted by how much each one lowers the heuristic.
+    With first_choice=True, neighbors are tried in random order and the first
+    improving one is taken (First-Choice Hill Climbing).
+    """
+    stats = stats if stats is not None else SearchStats()
+    rng = random.Random(seed)
+    algorithm_name = 'First-Choice Hill Climbing' if first_choice else 'Stochastic Hill Climbing'
+    current = Node(problem.start, path_cost=0)
+    step_count = 0
+    visited = set()
+    
+    while step_count < max_steps:
+        step_count += 1
+        stats.expansions += 1
+        visited.add(current.state)
+        stats.record_reached(len(visited))
+        current_heuristic = problem.heuristic_cost(current.state)
+        
+        # Send exploration step
+        if emits(step_callback, 'exploring'):
+            step_callback({
+                'type': 'exploring',
+                'node': current.state,
+                'step': step_count,
+                'heuristic': float(current_heuristic),
+                'algorithm': algorithm_name
+            })
+        
+        if problem.is_goal(current.state):
+            # Send success step
+            if emits(step_callback, 'found'):
+                step_callback({
+                    'type': 'found',
+                    'node': current.state,
+                    'step': step_count,
+                    'heuristic': float(current_heuristic),
+                    'algorithm': algorithm_name
+                })
+            return current
+        
+        actions = [action for action in problem.get_actions(current.state) if action[0] not in visited]
+        if not actions:
+            if emits(step_callback, 'no_path'):
+                step_callback({
+                    'type': 'no_path',
+                    'node': current.state,
+                    'step': step_count,
+                    'algorithm': algorithm_name,
+                    'reason': 'No unvisited neighbors available'
+                })
+            return None
+        
+        chosen = None
+        if first_choice:
+            # Evaluate neighbors lazily in random order, take the first uphill move
+            rng.shuffle(actions)
+            for action in actions:
+                neighbor_heuristic = problem.heuristic_cost(action[0])
+                if neighbor_heuristic < current_heuristic:
+                    chosen = (neighbor_heuristic, action)
+                    break
+        else:
+            uphill = []
+            for action in actions:
+                neighbor_heuristic = problem.heuristic_cost(action[0])
+                if neighbor_heuristic < current_heuristic:
+                    uphill.append((neighbor_heuristic, action))
+            if uphill:
+                weights = [current_heuristic - h for h, _ in uphill]
+                chosen = rng.choices(uphill, weights=weights)[0]
+        
+        if chosen is None:
+            if emits(step_callback, 'local_optimum'):
+                step_callback({
+                    'type': 'local_optimum',
+                    'node': current.state,
+                    'step': step_count,
+                    'heuristic': float(current_heuristic),
+                    'algorithm': algorithm_name,
+                    'reason': 'Local optimum reached - no better neighbors'
+                })
+            return None
+        
+        # Move to the chosen neighbor
+        neighbor_heuristic, action = chosen
+        child_cost = current.path_cost + problem.action_cost(current.state, action)
+        current = Node(state=action[0], parent=current, action=action, path_cost=child_cost)
+        
+        if emits(step_callback, 'move_to_neighbor'):
+            step_callback({
+                'type': 'move_to_neighbor',
+                'node': current.state,
+                'step': step_count,
+                'parent': current.parent.state,
+                'heuristic': float(neighbor_heuristic),
+                'algorithm': algorithm_name
+            })
+    
+    if emits(step_callback, 'no_path'):
+        step_callback({
+            'type': 'no_path',
+            'node': current.state,
+            'step': step_count,
+            'algorithm': algorithm_name,
+            'reason': 'Maximum steps reached'
+        })
+    return None
+
+
+def _hill_climbing_restart(problem: SearchProblem, seed: int, max_steps: int,
+                           first_choice: bool) -> Tuple[int, bool, float, int, int]:
+    """Run one silent climb for random restarts (module level so it pickles into worker processes)"""
+    stats = SearchStats()
+    solution = stochastic_hill_climbing_search(problem, None, max_steps, seed, first_choice, stats)
+    cost = solution.path_cost if solution else float('inf')
+    return seed, solution is not None, cost, stats.expansions, stats.peak_reached_size
+
+
+_restart_pool = None
+_restart_pool_lock = threading.Lock()
+
+
+def _get_restart_pool() -> ProcessPoolExecutor:
+    """The process pool shared by parallel random restarts, created on first use"""
+    global _restart_pool
+    with _restart_pool_lock:
+        if _restart_pool is None:
+            _restart_pool = ProcessPoolExecutor(max_workers=RESTART_POOL_WORKERS)
+        return _restart_pool
+
+
+def _discard_restart_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool so the next parallel search starts a fresh one"""
+    global _restart_pool
+    with _restart_pool_lock:
+        if _restart_pool is pool:
+            _restart_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _parallel_restarts(problem: SearchProblem, seeds: List[int], max_steps: int, first_choice: bool,
+                       workers: int) -> List[Tuple[int, bool, float, int, int]]:
+    """Climbs from `seeds` on the shared pool, at most `workers` at a time, until one reaches the goal"""
+    pool = _get_restart_pool()
+    outcomes = []
+    queued = iter(seeds)
+    pending = set()
+    try:
+        for s in queued:
+            pending.add(pool.submit(_hill_climbing_restart, problem, s, max_steps, first_choice))
+            if len(pending) >= workers:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            outcomes.extend(future.result() for future in done)
+            if any(outcome[1] for outcome in outcomes):
+                break
+            for s in queued:
+                pending.add(pool.submit(_hill_climbing_restart, problem, s, max_steps, first_choice))
+                if len(pending) >= workers:
+                    break
+    except BrokenProcessPool:
+        _discard_restart_pool(pool)
+        raise
+    finally:
+        # Climbs not started yet are dropped; a running one finishes on its own worker,
+        # so leftover work never exceeds one climb per pool process
+        for future in pending:
+            future.cancel()
+    return outcomes
+
+
+def random_restart_hill_climbing(problem: SearchProblem, step_callback: Callable = None,
+                                 restarts: int = DEFAULT_RESTARTS, max_steps: int = DEFAULT_MAX_STEPS,
+                                 workers: int = None, seed: int = None, first_choice: bool = False,
+                                 restart_stats: Dict = None, stats: SearchStats = None) -> Optional[Node]:
+    """
+    Random-Restart Hill Climbing, optionally across a process pool
+
+    Runs independent stochastic climbs from the source, each with its own seed,
+    and stops as soon as one climb reaches the goal. Climbs run in this process
+    unless `workers` asks for more than one, in which case up to `workers` of
+    them at a time run on the pool shared by all searches (RESTART_POOL_WORKERS
+    processes). Climbs always run inline in processes started by multiprocessing,
+    such as pool workers. The best climb is then replayed locally so that step_callback
+    sees a single coherent trace. Restart statistics are written into
+    `restart_stats` when a dict is supplied.
+    """
+    restarts = max(1, restarts)
+    workers = min(restarts, RESTART_POOL_WORKERS, workers or 1)
+    if multiprocessing.current_process().daemon or multiprocessing.parent_process() is not None:
+        # Daemonic processes may not start children, and a pool left in any other worker process
+        # (e.g. `solve_batch --workers N`) keeps that worker from exiting
+        workers = 1
+    base_seed = seed if seed is not None else random.randrange(2 ** 32)
+    seeds = [base_seed + i for i in range(restarts)]
+    
+    outcomes = []
+    if workers > 1:
+        try:
+            outcomes = _parallel_restarts(problem, seeds, max_steps, first_choice, workers)
+        except (OSError, NotImplementedError, BrokenProcessPool,
+                pickle.PicklingError, TypeError, AttributeError):
+            # Process pools are unavailable in some sandboxes (e.g. serverless), and problems
+            # holding unpicklable state cannot be sent to one (pickle raises TypeError or
+            # AttributeError for those); run inline instead, where a real error surfaces again
+            outcomes = []
+            workers = 1
+    
+    if workers <= 1:
+        for s in seeds:
+            outcomes.append(_hill_climbing_restart(problem, s, max_steps, first_choice))
+            if outcomes[-1][1]:
+                break
+    
+    successes = [outcome for outcome in outcomes if outcome[1]]
+    best = min(successes, key=lambda outcome: outcome[2]) if successes else None
+    
+    if stats is not None:
+        # Counters cover the work of every restart, not just the replayed winner
+        stats.expansions += sum(outcome[3] for outcome in outcomes)
+        stats.record_reached(max((outcome[4] for outcome in outcomes), default=0))
+    
+    if restart_stats is not None:
+        restart_stats.update({
+            'restarts_requested': restarts,
+            'restarts_run': len(outcomes),
+            'restarts_succeeded': len(successes),
+            'workers': workers,
+            'best_seed': best[0] if best else None,
+            'total_expansions': sum(outcome[3] for outcome in outcomes),
+        })
+    
+    if best is None:
+        if emits(step_callback, 'no_path'):
+            step_callback({
+                'type': 'no_path',
+                'node': problem.start,
+                'step': 0,
+                'algorithm': 'Random-Restart Hill Climbing',
+                'reason': f'No climb reached the goal after {len(outcomes)} restarts'
+            })
+        return None
+    
+    # Replay the winning climb (deterministic for its seed) to build the path and trace
+    return stochastic_hill_climbing_search(problem, step_callback, max_steps, best[0], first_choice)
+
+
 def get_path(node: Optional[Node]) -> List[str]:
-    """Extract path from solution node"""
+    """Extract path from solution node, expanding contracted chains (see ContractedGraphProblem)"""
     if not node:
         return []
     
@@ -492,6 +1935,8 @@ def get_path(node: Optional[Node]) -> List[str]:
     current = node
     while current:
         path.append(current.state)
+        if current.action is not None and len(current.action) > 2:
+            path.extend(reversed(current.action[2]))
         current = current.parent
     
     return path[::-1]
@@ -508,33 +1953,130 @@ def get_path_with_costs(node: Optional[Node]) -> Tuple[List[str], float]:
     return path, total_cost
 
 
+# Display names of the algorithms solve_graph_with_steps can run
+ALGORITHM_NAMES = {
+    'bfs': "Breadth-First Search",
+    'dfs': "Depth-First Search",
+    'best_first': "Best-First Search",
+    'beam': "Beam Search",
+    'bounded_best_first': "Bounded Best-First Search",
+    'dijkstra': "Dijkstra's Algorithm",
+    'a_star': "A* Search",
+    'hill_climbing': "Hill Climbing Search",
+    'stochastic_hill_climbing': "Stochastic Hill Climbing",
+    'first_choice_hill_climbing': "First-Choice Hill Climbing",
+    'random_restart_hill_climbing': "Random-Restart Hill Climbing",
+    'jps': "Jump Point Search",
+    'anytime_a_star': "Anytime A* (ARA*)",
+    'k_shortest': "K-Shortest Paths (Yen)",
+}
+
+# Algorithms that need a grid's geometry and cannot run on a plain graph
+GRID_ONLY_ALGORITHMS = {'jps'}
+
+# Algorithms whose results are unchanged by chain contraction (shortest path cost)
+CONTRACTIBLE_ALGORITHMS = {'dijkstra', 'a_star'}
+
+
+def _int_option(options: Dict, key: str, default: int, minimum: int, maximum: int) -> int:
+    """Read an integer option from a request, clamped to [minimum, maximum]"""
+    value = options.get(key)
+    if value is None:
+        return default
+    return max(minimum, min(int(value), maximum))
+
+
+def _float_option(options: Dict, key: str, default: float, minimum: float, maximum: float) -> float:
+    """Read a numeric option from a request, clamped to [minimum, maximum]"""
+    value = options.get(key)
+    if value is None:
+        return default
+    return max(minimum, min(float(value), maximum))
+
+
+def _error_result(algorithm: str, error: Exception) -> Dict:
+    return {
+        'success': False,
+        'error': str(error),
+        'path': [],
+        'cost': float('inf'),
+        'algorithm': algorithm,
+        'message': f"Error during search: {str(error)}"
+    }
+
+
 def solve_graph_with_steps(graph_data: Dict, source: str, destination: str, algorithm: str = 'bfs', 
-                          heuristic: Dict = None, step_callback: Callable = None) -> Dict:
+                          heuristic: Dict = None, step_callback: Callable = None,
+                          options: Dict = None) -> Dict:
     """
     Solve graph problems using different algorithms with step-by-step visualization
     
     Args:
-        graph_data: Graph data from web interface
+        graph_data: Graph data from web interface, or a CompiledGraph of it
         source: Starting node label
         destination: Goal node label
-        algorithm: Algorithm to use ('bfs', 'dfs', 'best_first', 'dijkstra')
+        algorithm: Algorithm to use ('bfs', 'dfs', 'best_first', 'dijkstra', 'a_star',
+                   'hill_climbing', 'stochastic_hill_climbing', 'first_choice_hill_climbing',
+                   'random_restart_hill_climbing')
         heuristic: Heuristic values for informed search (optional)
         step_callback: Function to call for each step of the algorithm
+        options: Algorithm tuning options (optional), e.g. max_steps, restarts,
+                 workers and seed for the hill climbing family
     
     Returns:
         Dictionary with solution path, cost, and algorithm info
     """
-    import time
-    
     try:
         # Start timing
         start_time = time.time()
         
         # Create problem instance
         problem = GraphProblem(graph_data, source, destination, heuristic)
+    except Exception as e:
+        return _error_result(algorithm, e)
+    
+    return solve_problem(problem, algorithm, step_callback, options, start_time)
+
+
+def solve_problem(problem: SearchProblem, algorithm: str = 'bfs', step_callback: Callable = None,
+                  options: Dict = None, start_time: float = None) -> Dict:
+    """
+    Run an algorithm on an already built problem (a GraphProblem or an implicit problem)
+    
+    Takes the same algorithm names and options as solve_graph_with_steps and returns
+    the same result dictionary. start_time lets callers include problem construction
+    in the reported execution time.
+    """
+    source, destination = problem.start, problem.end
+    options = options or {}
+    restart_stats = None
+    anytime_stats = None
+    pruning_stats = None
+    k_shortest = None
+    contraction = None
+    unreachable = False
+    stats = SearchStats()
+    # Route every step through a timer so callback cost is reported apart from search cost
+    step_callback = stats.timed_callback(step_callback)
+    
+    try:
+        max_steps = _int_option(options, 'max_steps', DEFAULT_MAX_STEPS, 1, MAX_HILL_CLIMBING_STEPS)
+        seed = options.get('seed')
+        seed = int(seed) if seed is not None else None
+        step_callback = StepFilter.from_options(step_callback, options)
+        
+        # Start timing
+        if start_time is None:
+            start_time = time.time()
+        
+        # Chains are contracted both ways, so one-way arcs rule it out
+        if (options.get('contract') and isinstance(problem, GraphProblem) and not problem.directed
+                and algorithm.lower() in CONTRACTIBLE_ALGORITHMS):
+            problem = ContractedGraphProblem(problem)
+            contraction = problem.reduction()
         
         # Send start step
-        if step_callback:
+        if emits(step_callback, 'start'):
             step_callback({
                 'type': 'start',
                 'source': source,
@@ -543,34 +2085,101 @@ def solve_graph_with_steps(graph_data: Dict, source: str, destination: str, algo
                 'step': 0
             })
         
+        search_start = time.perf_counter()
+        callback_time_before = stats.callback_time
+        
         # Select and run algorithm
-        if algorithm.lower() == 'bfs':
-            solution = breadth_first_search(problem, step_callback)
-            algorithm_name = "Breadth-First Search"
-        elif algorithm.lower() == 'dfs':
-            solution = depth_first_search(problem, step_callback)
-            algorithm_name = "Depth-First Search"
-        elif algorithm.lower() == 'best_first':
-            solution = best_first_search(problem, step_callback)
-            algorithm_name = "Best-First Search"
-        elif algorithm.lower() == 'dijkstra':
-            solution = dijkstra_search(problem, step_callback)
-            algorithm_name = "Dijkstra's Algorithm"
-        elif algorithm.lower() == 'a_star':
-            solution = a_star_search(problem, step_callback)
-            algorithm_name = "A* Search"
-        elif algorithm.lower() == 'hill_climbing':
-            solution = hill_climbing_search(problem, step_callback)
-            algorithm_name = "Hill Climbing Search"
+        algorithm_key = algorithm.lower()
+        if algorithm_key in ALGORITHM_NAMES and not problem.is_reachable():
+            # Source and destination are in different components, so the component
+            # index answers at once instead of exhausting the source's component
+            solution = None
+            unreachable = True
+        elif algorithm_key == 'bfs':
+            solution = breadth_first_search(problem, step_callback, stats)
+        elif algorithm_key == 'dfs':
+            solution = depth_first_search(problem, step_callback, stats)
+        elif algorithm_key == 'best_first':
+            solution = best_first_search(problem, step_callback, stats)
+        elif algorithm_key == 'beam':
+            pruning_stats = {}
+            solution = beam_search(
+                problem, step_callback,
+                beam_width=_int_option(options, 'beam_width', DEFAULT_BEAM_WIDTH, 1, MAX_FRONTIER_CAP),
+                pruning_stats=pruning_stats,
+                stats=stats
+            )
+        elif algorithm_key == 'bounded_best_first':
+            pruning_stats = {}
+            solution = bounded_best_first_search(
+                problem, step_callback,
+                max_frontier=_int_option(options, 'max_frontier', DEFAULT_MAX_FRONTIER, 1, MAX_FRONTIER_CAP),
+                pruning_stats=pruning_stats,
+                stats=stats
+            )
+        elif algorithm_key == 'dijkstra':
+            solution = dijkstra_search(problem, step_callback, stats)
+        elif algorithm_key == 'a_star':
+            solution = a_star_search(problem, step_callback, stats)
+        elif algorithm_key == 'hill_climbing':
+            solution = hill_climbing_search(problem, step_callback, max_steps, stats=stats)
+        elif algorithm_key == 'stochastic_hill_climbing':
+            solution = stochastic_hill_climbing_search(problem, step_callback, max_steps, seed,
+                                                       stats=stats)
+        elif algorithm_key == 'first_choice_hill_climbing':
+            solution = stochastic_hill_climbing_search(problem, step_callback, max_steps, seed,
+                                                       first_choice=True, stats=stats)
+        elif algorithm_key == 'random_restart_hill_climbing':
+            restart_stats = {}
+            solution = random_restart_hill_climbing(
+                problem, step_callback,
+                restarts=_int_option(options, 'restarts', DEFAULT_RESTARTS, 1, MAX_RESTARTS),
+                max_steps=max_steps,
+                workers=_int_option(options, 'workers', 1, 1, RESTART_POOL_WORKERS),
+                seed=seed,
+                first_choice=bool(options.get('first_choice', False)),
+                restart_stats=restart_stats,
+                stats=stats
+            )
+        elif algorithm_key == 'anytime_a_star':
+            anytime_stats = {}
+            solution = anytime_a_star_search(
+                problem, step_callback,
+                deadline=_float_option(options, 'deadline_ms', DEFAULT_DEADLINE_MS, 0, MAX_DEADLINE_MS) / 1000,
+                weight=_float_option(options, 'weight', DEFAULT_INITIAL_WEIGHT, 1.0, 100.0),
+                weight_step=_float_option(options, 'weight_step', DEFAULT_WEIGHT_STEP, 0.01, 100.0),
+                anytime_stats=anytime_stats,
+                stats=stats
+            )
+        elif algorithm_key == 'k_shortest':
+            k_shortest = {}
+            solution = k_shortest_paths_search(
+                problem, step_callback,
+                k=_int_option(options, 'k', DEFAULT_K_PATHS, 1, MAX_K_PATHS),
+                k_shortest=k_shortest,
+                stats=stats
+            )
+        elif algorithm_key == 'jps':
+            # Imported here because grid_problem builds on this module
+            from grid_problem import jump_point_search
+            solution = jump_point_search(problem, step_callback, stats)
         else:
             return {
                 'success': False,
                 'error': f"Unknown algorithm: {algorithm}",
                 'path': [],
                 'cost': float('inf'),
-                'algorithm': algorithm
+                'algorithm': algorithm,
+                'message': f"Unknown algorithm: {algorithm}"
             }
         
+        algorithm_name = ALGORITHM_NAMES[algorithm_key]
+        if isinstance(step_callback, StepFilter):
+            step_callback.flush()
+        
+        stats.search_time = (time.perf_counter() - search_start
+                             - (stats.callback_time - callback_time_before))
+        
         # Extract results
         if solution:
             path, cost = get_path_with_costs(solution)
@@ -578,7 +2187,7 @@ def solve_graph_with_steps(graph_data: Dict, source: str, destination: str, algo
             execution_time = end_time - start_time
             
             # Send final path step
-            if step_callback:
+            if emits(step_callback, 'final_path'):
                 step_callback({
                     'type': 'final_path',
                     'path': path,
@@ -587,49 +2196,75 @@ def solve_graph_with_steps(graph_data: Dict, source: str, destination: str, algo
                     'execution_time': execution_time
                 })
             
-            return {
+            result = {
                 'success': True,
                 'path': path,
                 'cost': cost,
                 'algorithm': algorithm_name,
-                'nodes_explored': len(path),
+                'nodes_explored': stats.expansions,
                 'execution_time': execution_time,
+                'stats': stats.as_dict(),
+                'goal_reached': path[-1],
                 'message': f"Path found using {algorithm_name}"
             }
+            if restart_stats is not None:
+                result['restart_stats'] = restart_stats
+            if anytime_stats is not None:
+                result['anytime_stats'] = anytime_stats
+            if pruning_stats is not None:
+                result['pruning_stats'] = pruning_stats
+            if k_shortest is not None:
+                result['k_shortest'] = k_shortest
+            if contraction is not None:
+                result['contraction'] = contraction
+            return result
         else:
             end_time = time.time()
             execution_time = end_time - start_time
             
             # Send no path found step
-            if step_callback:
-                step_callback({
+            if emits(step_callback, 'no_path'):
+                no_path_step = {
                     'type': 'no_path',
                     'algorithm': algorithm_name,
                     'execution_time': execution_time
-                })
+                }
+                if unreachable:
+                    no_path_step['reason'] = 'Source and destination are in different components'
+                step_callback(no_path_step)
             
-            return {
+            result = {
                 'success': False,
                 'error': "No path found",
                 'path': [],
                 'cost': float('inf'),
                 'algorithm': algorithm_name,
+                'nodes_explored': stats.expansions,
+                'execution_time': execution_time,
+                'stats': stats.as_dict(),
                 'message': f"No path exists between {source} and {destination}"
             }
+            if unreachable:
+                result['unreachable'] = True
+            if restart_stats is not None:
+                result['restart_stats'] = restart_stats
+            if anytime_stats is not None:
+                result['anytime_stats'] = anytime_stats
+            if pruning_stats is not None:
+                result['pruning_stats'] = pruning_stats
+            if k_shortest is not None:
+                result['k_shortest'] = k_shortest
+            if contraction is not None:
+                result['contraction'] = contraction
+            return result
             
     except Exception as e:
-        return {
-            'success': False,
-            'error': str(e),
-            'path': [],
-            'cost': float('inf'),
-            'algorithm': algorithm,
-            'message': f"Error during search: {str(e)}"
-        }
+        return _error_result(algorithm, e)
 
 
-def solve_graph(graph_data: Dict, source: str, destination: str, algorithm: str = 'bfs', heuristic: Dict = None) -> Dict:
+def solve_graph(graph_data: Dict, source: str, destination: str, algorithm: str = 'bfs', heuristic: Dict = None,
+                options: Dict = None) -> Dict:
     """
     Main function to solve graph problems using different algorithms (legacy version without steps)
     """
-    return solve_graph_with_steps(graph_data, source, destination, algorithm, heuristic, None)
+    return solve_graph_with_steps(graph_data, source, destination, algorithm, heuristic, None, options)
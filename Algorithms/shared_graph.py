@@ -0,0 +1,240 @@
+"""
+Read-only graphs in one memory-mapped file, shared by every process that opens it.
+
+A CompiledGraph is written once in compressed sparse row form:
+
+    header | label offsets | adjacency offsets | arc targets | arc weights |
+    component ids | component sizes | label bytes
+
+Readers map the file read-only and cast typed memoryviews over the sections,
+so nothing is copied or unpickled: every worker process attaching to the same
+file shares the same page cache pages for the arcs and components. Labels are
+decoded once per attach into a tuple and a label to position dict, so reading
+a node's neighbors only indexes that tuple; as a Mapping of label to
+[(neighbor, weight), ...] it is used by GraphProblem exactly like the
+adjacency dict of a CompiledGraph. Node IDs are the labels, as for every
+graph the file loaders build.
+
+The file never changes once written; new versions are new files (see
+Search.graph_store), so a mapping stays valid for as long as a search holds it.
+"""
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Tuple
+
+MAGIC = b'SGR2'
+FLAG_DIRECTED = 1
+# magic, flags, nodes, edges, arcs, label bytes, fingerprint
+HEADER = struct.Struct('<4sIQQQQ64s')
+HEADER_SIZE = 128
+
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _layout(node_count: int, arc_count: int) -> Dict[str, Tuple[int, int]]:
+    """(offset, length in bytes) of every section after the header"""
+    sections = {}
+    offset = HEADER_SIZE
+    for name, length in (
+        ('label_offsets', 8 * (node_count + 1)),
+        ('adjacency_offsets', 8 * (node_count + 1)),
+        ('targets', 4 * arc_count),
+        ('weights', 8 * arc_count),
+        ('components', 4 * node_count),
+        ('component_sizes', 4 * node_count),
+    ):
+        sections[name] = (offset, length)
+        offset = _aligned(offset + length)
+    sections['labels'] = (offset, None)
+    return sections
+
+
+def write_shared_graph(graph, path: str):
+    """
+    Write a CompiledGraph to `path` in the shared layout
+
+    The file is written next to `path` and renamed into place, so readers never
+    map a partial file.
+    """
+    labels = list(graph.adjacency)
+    index = {label: position for position, label in enumerate(labels)}
+    node_count = len(labels)
+
+    encoded = [label.encode('utf-8') for label in labels]
+    label_offsets = array('Q', [0])
+    for data in encoded:
+        label_offsets.append(label_offsets[-1] + len(data))
+
+    adjacency_offsets = array('Q', [0])
+    targets = array('I')
+    weights = array('d')
+    for label in labels:
+        for neighbor, weight in graph.adjacency[label]:
+            targets.append(index[neighbor])
+            weights.append(weight)
+        adjacency_offsets.append(len(targets))
+
+    components = array('I', (index[graph.components.find(label)] for label in labels))
+    component_sizes = array('I', bytes(4 * node_count))
+    for root in components:
+        component_sizes[root] += 1
+
+    flags = FLAG_DIRECTED if graph.directed else 0
+    fingerprint = (graph.fingerprint or '').encode('ascii')
+    header = HEADER.pack(MAGIC, flags, node_count, graph.edge_count, len(targets),
+                         label_offsets[-1], fingerprint)
+    layout = _layout(node_count, len(targets))
+
+    directory = os.path.dirname(path) or '.'
+    handle, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as output:
+            output.write(header.ljust(HEADER_SIZE, b'\0'))
+            for name, section in (('label_offsets', label_offsets), ('adjacency_offsets', adjacency_offsets),
+                                  ('targets', targets), ('weights', weights), ('components', components),
+                                  ('component_sizes', component_sizes)):
+                output.seek(layout[name][0])
+                section.tofile(output)
+            output.seek(layout['labels'][0])
+            for data in encoded:
+                output.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+class _SharedLabels:
+    """Node ID to label lookups for request validation (IDs are the labels)"""
+
+    def __init__(self, graph: 'SharedGraph'):
+        self._graph = graph
+
+    def get(self, node_id, default=None):
+        return node_id if self._graph.index_of(node_id) >= 0 else default
+
+    def __contains__(self, node_id) -> bool:
+        return self._graph.index_of(node_id) >= 0
+
+    def values(self) -> Iterator[str]:
+        return iter(self._graph)
+
+
+class _SharedComponents:
+    """The ComponentIndex queries searches make, answered from the stored component ids"""
+
+    def __init__(self, graph: 'SharedGraph'):
+        self._graph = graph
+
+    def connected(self, a: str, b: str) -> bool:
+        if a == b:
+            return True
+        graph = self._graph
+        index_a, index_b = graph.index_of(a), graph.index_of(b)
+        if index_a < 0 or index_b < 0:
+            return False
+        return graph._components[index_a] == graph._components[index_b]
+
+    def component_size(self, node: str) -> int:
+        index = self._graph.index_of(node)
+        if index < 0:
+            return 0
+        return self._graph._component_sizes[self._graph._components[index]]
+
+
+class SharedGraph(Mapping):
+    """
+    A graph file mapped read-only; a Mapping of label to [(neighbor, weight), ...]
+
+    Offers the attributes searches and request validation use on a
+    CompiledGraph: labels, adjacency (itself), components, node_count,
+    edge_count, directed and fingerprint. Pickling reattaches to the same file,
+    so process pools share the mapping instead of copying the graph.
+    """
+
+    def __init__(self, path: str, version: int = None):
+        self.path = path
+        self.version = version
+        with open(path, 'rb') as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, flags, node_count, edge_count, arc_count, label_bytes, fingerprint = \
+            HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a shared graph file')
+        self.node_count = node_count
+        self.edge_count = edge_count
+        self.directed = bool(flags & FLAG_DIRECTED)
+        self.fingerprint = fingerprint.rstrip(b'\0').decode('ascii') or None
+
+        view = memoryview(self._mmap)
+        layout = _layout(node_count, arc_count)
+
+        def section(name: str, typecode: str) -> memoryview:
+            offset, length = layout[name]
+            return view[offset:offset + length].cast(typecode)
+
+        label_offsets = section('label_offsets', 'Q')
+        self._adjacency_offsets = section('adjacency_offsets', 'Q')
+        self._targets = section('targets', 'I')
+        self._weights = section('weights', 'd')
+        self._components = section('components', 'I')
+        self._component_sizes = section('component_sizes', 'I')
+
+        # Labels are decoded once per attach, so reading neighbors only indexes this tuple
+        start = layout['labels'][0]
+        text = bytes(self._mmap[start:start + label_bytes])
+        self._labels = tuple(sys.intern(text[label_offsets[position]:label_offsets[position + 1]].decode('utf-8'))
+                             for position in range(node_count))
+        self._positions = {label: position for position, label in enumerate(self._labels)}
+
+        self.adjacency = self
+        self.labels = _SharedLabels(self)
+        self.components = _SharedComponents(self)
+
+    def __reduce__(self):
+        return SharedGraph, (self.path, self.version)
+
+    def index_of(self, label) -> int:
+        """Position of `label` in the file, or -1"""
+        return self._positions.get(label, -1) if isinstance(label, str) else -1
+
+    def label_at(self, position: int) -> str:
+        return self._labels[position]
+
+    def actions_at(self, position: int) -> List[Tuple[str, float]]:
+        """(neighbor, weight) pairs of the node at `position`, read from the arc arrays"""
+        first, last = self._adjacency_offsets[position], self._adjacency_offsets[position + 1]
+        labels = self._labels
+        return [(labels[target], weight)
+                for target, weight in zip(self._targets[first:last], self._weights[first:last])]
+
+    def __getitem__(self, label) -> List[Tuple[str, float]]:
+        position = self.index_of(label)
+        if position < 0:
+            raise KeyError(label)
+        return self.actions_at(position)
+
+    def get(self, label, default=None):
+        position = self.index_of(label)
+        return self.actions_at(position) if position >= 0 else default
+
+    def __contains__(self, label) -> bool:
+        return self.index_of(label) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._labels)
+
+    def __len__(self) -> int:
+        return self.node_count
+
+    # Mapping defines __eq__ by content; identity is what callers mean for a file view
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The algorithm modules in the top-level Algorithms directory are imported by
+# name (search_algorithms, grid_problem) from several modules of this app
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'Algorithms'))
@@ -0,0 +1,252 @@
+"""
+Cost-aware admission control for search requests.
+
+Each request is given an estimated cost from its graph size and algorithm.
+Clients pay that cost out of a per-client token bucket (429 when empty), and
+the process caps the total cost of searches running at once, parking extra
+requests in a short bounded queue (503 when full or when the wait times out).
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict
+
+from django.conf import settings
+
+# Graph element visits that make up one cost unit
+COST_UNIT = 100
+
+# Algorithms driven by a binary heap pay an extra log(V) per visit
+HEAP_ALGORITHMS = {'dijkstra', 'a_star', 'astar', 'best_first', 'jps', 'anytime_a_star',
+                   'beam', 'bounded_best_first', 'k_shortest'}
+
+# Buckets tracked before idle (full) ones are dropped
+MAX_TRACKED_CLIENTS = 10000
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries the HTTP status and Retry-After seconds"""
+
+    def __init__(self, status: int, retry_after: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.message = message
+
+
+def estimate_cost(algorithm: str, node_count: int, edge_count: int, options: Dict = None) -> float:
+    """Estimate the work of one search in cost units (never less than 1)"""
+    options = options or {}
+    algorithm = algorithm.lower()
+    # Every undirected edge is stored and scanned in both directions
+    work = node_count + 2 * edge_count
+    if algorithm in HEAP_ALGORITHMS:
+        work *= math.log2(node_count + 1)
+    if algorithm == 'random_restart_hill_climbing':
+        try:
+            work *= max(1, int(options.get('restarts') or 8))
+        except (TypeError, ValueError):
+            work *= 8
+    if algorithm == 'k_shortest':
+        # Yen runs a spur search per node of every accepted path
+        try:
+            work *= max(1, int(options.get('k') or 3))
+        except (TypeError, ValueError):
+            work *= 3
+    return max(1.0, work / COST_UNIT)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `refill_rate` tokens per second"""
+
+    def __init__(self, capacity: float, refill_rate: float):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+        self.updated = now
+
+    def try_consume(self, amount: float) -> float:
+        """Take `amount` tokens; returns 0 on success or the seconds until they would be available"""
+        self._refill(time.monotonic())
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+        return (amount - self.tokens) / self.refill_rate
+
+    def refund(self, amount: float):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def is_full(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+class AdmissionController:
+    """Per-process admission control: client token buckets plus an in-flight cost cap"""
+
+    def __init__(self, max_inflight_cost: float, max_queue: int, queue_timeout: float,
+                 bucket_capacity: float, refill_rate: float,
+                 large_bucket_capacity: float = None, large_refill_rate: float = None):
+        self.max_inflight_cost = max_inflight_cost
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        # (capacity, refill rate) of each client's buckets, keyed by `large`
+        self.bucket_sizes = {
+            False: (bucket_capacity, refill_rate),
+            True: (large_bucket_capacity or bucket_capacity, large_refill_rate or refill_rate),
+        }
+
+        self._condition = threading.Condition()
+        self._inflight_cost = 0.0
+        self._waiting = deque()
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        self.counts = {'admitted': 0, 'queued': 0, 'rejected_client': 0,
+                       'rejected_queue_full': 0, 'rejected_timeout': 0}
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            max_inflight_cost=settings.ADMISSION_MAX_INFLIGHT_COST,
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+            bucket_capacity=settings.ADMISSION_CLIENT_BURST,
+            refill_rate=settings.ADMISSION_CLIENT_REFILL_RATE,
+            large_bucket_capacity=settings.ADMISSION_LARGE_BURST,
+            large_refill_rate=settings.ADMISSION_LARGE_REFILL_RATE,
+        )
+
+    def _bucket(self, client: str, large: bool) -> TokenBucket:
+        key = (client, large)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= MAX_TRACKED_CLIENTS:
+                # Full buckets carry no state worth keeping
+                for key in [key for key, value in self._buckets.items() if value.is_full()]:
+                    del self._buckets[key]
+            bucket = self._buckets[key] = TokenBucket(*self.bucket_sizes[large])
+        return bucket
+
+    def charge_client(self, client: str, cost: float, large: bool = False):
+        """
+        Spend `cost` from the client's bucket; raises a 429 AdmissionRejected when it cannot pay
+
+        Searches whose size the request limits do not bound (stored graphs, grids)
+        pass `large` and pay from a bucket of their own, so one of them cannot
+        lock the client out of the small searches the page makes.
+        """
+        with self._buckets_lock:
+            wait_seconds = self._bucket(client, large).try_consume(cost)
+            if wait_seconds:
+                self.counts['rejected_client'] += 1
+                raise AdmissionRejected(429, math.ceil(wait_seconds),
+                                        'Rate limit exceeded. Please wait before making more requests.')
+
+    def refund_client(self, client: str, cost: float, large: bool = False):
+        with self._buckets_lock:
+            bucket = self._bucket(client, large)
+            bucket.refund(min(cost, bucket.capacity))
+
+    def acquire(self, cost: float):
+        """Take process capacity for one search, queueing for it; raises a 503 AdmissionRejected when saturated"""
+        # A single request larger than the whole budget may still run, but only alone
+        cost = min(cost, self.max_inflight_cost)
+        with self._condition:
+            if not self._waiting and self._inflight_cost + cost <= self.max_inflight_cost:
+                self._inflight_cost += cost
+                self.counts['admitted'] += 1
+                return
+            if len(self._waiting) >= self.max_queue:
+                self.counts['rejected_queue_full'] += 1
+                raise AdmissionRejected(503, math.ceil(self.queue_timeout) or 1,
+                                        'Server is busy. Please try again shortly.')
+
+            ticket = object()
+            self._waiting.append(ticket)
+            self.counts['queued'] += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                # First come, first served: only the head of the queue may take capacity
+                while not (self._waiting[0] is ticket
+                           and self._inflight_cost + cost <= self.max_inflight_cost):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.counts['rejected_timeout'] += 1
+                        raise AdmissionRejected(503, math.ceil(self.queue_timeout) or 1,
+                                                'Server is busy. Please try again shortly.')
+                    self._condition.wait(remaining)
+                self._inflight_cost += cost
+                self.counts['admitted'] += 1
+            finally:
+                self._waiting.remove(ticket)
+                self._condition.notify_all()
+
+    def release(self, cost: float):
+        """Give back capacity taken by acquire()"""
+        with self._condition:
+            self._inflight_cost -= min(cost, self.max_inflight_cost)
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserve(self, cost: float):
+        """Hold process capacity for one search; raises a 503 AdmissionRejected when saturated"""
+        self.acquire(cost)
+        try:
+            yield
+        finally:
+            self.release(cost)
+
+    @contextmanager
+    def charge(self, client: str, cost: float, large: bool = False):
+        """
+        Charge the client for one request; raises a 429 AdmissionRejected when it cannot pay
+
+        An AdmissionRejected raised inside the block is the server turning the
+        request away, so the charge is refunded before it propagates.
+        """
+        self.charge_client(client, cost, large)
+        try:
+            yield
+        except AdmissionRejected:
+            # The client did nothing wrong, so the server-side rejection is free
+            self.refund_client(client, cost, large)
+            raise
+
+    def render_metrics(self) -> str:
+        """Admission counters and gauges in the Prometheus text format"""
+        with self._condition:
+            inflight_cost = self._inflight_cost
+            waiting = len(self._waiting)
+            counts = dict(self.counts)
+        lines = [
+            '# HELP search_admission_total Admission decisions by result',
+            '# TYPE search_admission_total counter',
+        ]
+        for result, count in counts.items():
+            lines.append(f'search_admission_total{{result="{result}"}} {count}')
+        lines += [
+            '# HELP search_inflight_cost Estimated cost of searches currently running',
+            '# TYPE search_inflight_cost gauge',
+            f'search_inflight_cost {inflight_cost}',
+            '# HELP search_admission_queue_length Requests waiting for capacity',
+            '# TYPE search_admission_queue_length gauge',
+            f'search_admission_queue_length {waiting}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+def client_key(request) -> str:
+    """Identify the client the same way the IP rate limiter did"""
+    return request.META.get('REMOTE_ADDR', '')
+
+
+# Process-wide controller used by the views
+admission_controller = AdmissionController.from_settings()
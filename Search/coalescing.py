@@ -0,0 +1,97 @@
+"""
+Single-flight coalescing of identical concurrent searches.
+
+When several clients submit the same graph and query at the same moment, the
+first request (the leader) runs the search and the others wait for its
+outcome instead of repeating the work. Waiters receive the leader's result,
+including its step trace, or re-raise the leader's error; they give up after a
+timeout. Nothing is cached once the leader finishes.
+"""
+
+import json
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+
+class CoalescingTimeout(Exception):
+    """Raised in a waiter when the leader does not finish in time"""
+
+
+class _Call:
+    """One in-flight search shared by its leader and waiters"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its outcome"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.counts = {'leaders': 0, 'coalesced': 0, 'timeouts': 0, 'shared_errors': 0}
+
+    def run(self, key: str, fn: Callable[[], Any], timeout: float) -> Tuple[Any, bool]:
+        """Return (result, shared) where shared is True when another request did the work"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.counts['leaders'] += 1
+            else:
+                self.counts['coalesced'] += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except Exception as error:
+                call.error = error
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result, False
+
+        if not call.done.wait(timeout):
+            with self._lock:
+                self.counts['timeouts'] += 1
+            raise CoalescingTimeout(f'Identical search did not finish within {timeout} seconds')
+        if call.error is not None:
+            with self._lock:
+                self.counts['shared_errors'] += 1
+            raise call.error
+        return call.result, True
+
+    def render_metrics(self) -> str:
+        """Coalescing counters and in-flight keys in the Prometheus text format"""
+        with self._lock:
+            counts = dict(self.counts)
+            inflight = len(self._calls)
+        lines = [
+            '# HELP search_coalescing_total Search requests by coalescing role',
+            '# TYPE search_coalescing_total counter',
+        ]
+        for role, count in counts.items():
+            lines.append(f'search_coalescing_total{{role="{role}"}} {count}')
+        lines += [
+            '# HELP search_coalescing_inflight Distinct searches currently being coalesced',
+            '# TYPE search_coalescing_inflight gauge',
+            f'search_coalescing_inflight {inflight}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+def search_key(mode: str, fingerprint: str, source: str, destination: str,
+               algorithm: str, options: Dict) -> str:
+    """Coalescing key for one endpoint (mode), graph fingerprint and query"""
+    query = json.dumps([source, destination, algorithm.lower(), options], sort_keys=True, default=str)
+    return f'{mode}:{fingerprint}:{query}'
+
+
+# Process-wide coalescer used by the views
+search_coalescer = SingleFlight()
@@ -0,0 +1,129 @@
+"""
+Named graphs imported from files (see `manage.py import_graph`).
+
+Each import writes a new version of the graph as a shared graph file
+(Algorithms/shared_graph.py), GRAPH_STORE_DIR/<name>.<version>.graph, then
+points GRAPH_STORE_DIR/<name>.current at it by renaming a new pointer file
+into place. Worker processes map the current version read-only, so however
+many workers serve a graph it sits in memory once, in the page cache.
+
+Re-importing hot-swaps the graph: workers notice the replaced pointer on their
+next search and map the new version, while searches already running keep the
+old mapping, which stays valid even after its file is removed. The version
+before the current one is kept so a worker that has just read the old pointer
+can still open it; older ones are deleted.
+"""
+
+import os
+import re
+import tempfile
+import threading
+
+from django.conf import settings
+
+from shared_graph import SharedGraph, write_shared_graph
+
+GRAPH_NAME_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]{0,99}$')
+GRAPH_FILE_SUFFIX = '.graph'
+POINTER_SUFFIX = '.current'
+
+
+class GraphNotFound(Exception):
+    """Raised when no graph has been imported under a name"""
+
+
+def validate_graph_name(name: str) -> str:
+    if not isinstance(name, str) or not GRAPH_NAME_PATTERN.match(name):
+        raise ValueError('Graph names use letters, digits, "_", "." and "-" (at most 100 characters)')
+    return name
+
+
+def pointer_path(name: str) -> str:
+    return os.path.join(settings.GRAPH_STORE_DIR, validate_graph_name(name) + POINTER_SUFFIX)
+
+
+def version_path(name: str, version: int) -> str:
+    return os.path.join(settings.GRAPH_STORE_DIR, f'{validate_graph_name(name)}.{version}{GRAPH_FILE_SUFFIX}')
+
+
+def _stored_versions(name: str):
+    """Versions of `name` that have a file, oldest first"""
+    prefix = name + '.'
+    versions = []
+    for entry in os.listdir(settings.GRAPH_STORE_DIR):
+        if entry.startswith(prefix) and entry.endswith(GRAPH_FILE_SUFFIX):
+            version = entry[len(prefix):-len(GRAPH_FILE_SUFFIX)]
+            if version.isdigit():
+                versions.append(int(version))
+    return sorted(versions)
+
+
+class GraphStore:
+    """Maps the current version of each stored graph once per process and follows hot swaps"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # name -> ((pointer inode, pointer mtime), SharedGraph)
+        self._graphs = {}
+
+    def current_version(self, name: str) -> int:
+        try:
+            with open(pointer_path(name), 'r', encoding='ascii') as handle:
+                return int(handle.read().strip())
+        except FileNotFoundError:
+            raise GraphNotFound(f'Graph "{name}" has not been imported')
+
+    def current_path(self, name: str) -> str:
+        return version_path(name, self.current_version(name))
+
+    def save(self, name: str, graph) -> str:
+        """Write `graph` as the next version of `name` and make it current; returns its path"""
+        validate_graph_name(name)
+        os.makedirs(settings.GRAPH_STORE_DIR, exist_ok=True)
+        versions = _stored_versions(name)
+        version = versions[-1] + 1 if versions else 1
+        path = version_path(name, version)
+        write_shared_graph(graph, path)
+
+        handle, temporary = tempfile.mkstemp(dir=settings.GRAPH_STORE_DIR, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'w', encoding='ascii') as output:
+                output.write(f'{version}\n')
+            os.replace(temporary, pointer_path(name))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+        for old_version in versions[:-1]:
+            try:
+                os.unlink(version_path(name, old_version))
+            except OSError:
+                # Still mapped on platforms that refuse to remove open files; retried next import
+                pass
+        return path
+
+    def get(self, name: str) -> SharedGraph:
+        pointer = pointer_path(name)
+        try:
+            status = os.stat(pointer)
+        except FileNotFoundError:
+            raise GraphNotFound(f'Graph "{name}" has not been imported')
+        # The pointer is replaced, never rewritten, so a new inode means a new version
+        stamp = (status.st_ino, status.st_mtime_ns)
+        with self._lock:
+            cached = self._graphs.get(name)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+            version = self.current_version(name)
+            graph = SharedGraph(version_path(name, version), version)
+            self._graphs[name] = (stamp, graph)
+            return graph
+
+    def names(self):
+        if not os.path.isdir(settings.GRAPH_STORE_DIR):
+            return []
+        return sorted(entry[:-len(POINTER_SUFFIX)] for entry in os.listdir(settings.GRAPH_STORE_DIR)
+                      if entry.endswith(POINTER_SUFFIX))
+
+
+graph_store = GraphStore()
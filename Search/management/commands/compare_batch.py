@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from batch_runner import compare_records
+
+from Search.serialization import loads
+
+
+def _read_results(path):
+    results = {}
+    try:
+        with open(path, 'rb') as handle:
+            for line_number, line in enumerate(handle, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = loads(line)
+                except ValueError:
+                    raise CommandError(f'{path}:{line_number}: not valid JSON')
+                results[record.get('id', line_number)] = record
+    except OSError as e:
+        raise CommandError(f'Cannot read {path}: {e}')
+    return results
+
+
+class Command(BaseCommand):
+    help = ('Compare two solve_batch outputs for the same queries; fails when any '
+            'query changes its success or cost')
+
+    def add_arguments(self, parser):
+        parser.add_argument('baseline', help='Results from the previous release')
+        parser.add_argument('current', help='Results from the release under test')
+        parser.add_argument('--slowdown', type=float, default=None,
+                            help='Also report queries whose best time grew by more than this factor (e.g. 1.5)')
+        parser.add_argument('--fail-on-slowdown', action='store_true',
+                            help='Fail when --slowdown finds slower queries')
+        parser.add_argument('--limit', type=int, default=20, help='Queries listed per category')
+
+    def handle(self, *args, **options):
+        report = compare_records(_read_results(options['baseline']), _read_results(options['current']),
+                                 options['slowdown'])
+        limit = options['limit']
+        titles = {
+            'changed': 'success or cost changed (baseline -> current cost)',
+            'effort': 'nodes explored changed',
+            'slower': 'slower (baseline -> current ms)',
+            'missing': 'missing from current',
+            'added': 'not in baseline',
+        }
+        for key, title in titles.items():
+            entries = report[key]
+            if not entries:
+                continue
+            self.stdout.write(f'{len(entries)} {title}:')
+            for entry in entries[:limit]:
+                self.stdout.write(f'  {entry}')
+            if len(entries) > limit:
+                self.stdout.write(f'  ... {len(entries) - limit} more')
+
+        failed = report['changed'] or report['missing']
+        if options['fail_on_slowdown'] and report['slower']:
+            failed = True
+        if failed:
+            raise CommandError('Results differ from the baseline')
+        self.stdout.write(self.style.SUCCESS('Results match the baseline'))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from graph_loaders import FORMATS, load_graph_file
+
+from Search.graph_store import graph_store, validate_graph_name
+
+
+class Command(BaseCommand):
+    help = 'Import a DIMACS .gr, edge list or GraphML file as a named graph that searches can use'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', help='Name searches use to refer to the graph')
+        parser.add_argument('path', help='Graph file to import')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='File format (default: from the extension; unknown extensions are edge lists)')
+        parser.add_argument('--directed', action='store_true',
+                            help='Read edge list lines as one-way arcs (DIMACS arcs always are)')
+
+    def handle(self, *args, **options):
+        try:
+            name = validate_graph_name(options['name'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        started = time.perf_counter()
+        try:
+            graph = load_graph_file(options['path'], options['format'], options['directed'])
+        except OSError as e:
+            raise CommandError(f'Cannot read {options["path"]}: {e}')
+        except (ValueError, SyntaxError) as e:
+            # ElementTree reports malformed XML as a SyntaxError subclass
+            raise CommandError(f'Cannot parse {options["path"]}: {e}')
+        loaded = time.perf_counter()
+
+        path = graph_store.save(name, graph)
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported "{name}": {graph.node_count} nodes, {graph.edge_count} edges '
+            f'(parsed in {loaded - started:.2f}s, stored in {time.perf_counter() - loaded:.2f}s at {path})'
+        ))
@@ -0,0 +1,88 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from batch_runner import default_workers, load_graph_source, read_queries, run_batch, summarize
+from graph_loaders import FORMATS
+
+from Search.graph_store import GraphNotFound, graph_store
+from Search.serialization import dumps
+
+
+class Command(BaseCommand):
+    help = ('Solve a JSONL file of queries against one graph across worker processes, '
+            'writing one JSON result line per query in query order')
+
+    def add_arguments(self, parser):
+        parser.add_argument('graph', help='Graph file, or with --stored the name of an imported graph')
+        parser.add_argument('queries', help='JSONL file of {"source", "destination", "algorithm", "options", "id"}')
+        parser.add_argument('--stored', action='store_true', help='Treat graph as a name given to import_graph')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Graph file format (default: from the extension)')
+        parser.add_argument('--directed', action='store_true', help='Read edge list lines as one-way arcs')
+        parser.add_argument('--workers', type=int, default=default_workers(),
+                            help='Worker processes (default: one per CPU; 1 solves in this process)')
+        parser.add_argument('--repeat', type=int, default=1,
+                            help='Solve each query this many times and report the best and median time')
+        parser.add_argument('--include-path', action='store_true', help='Add the found path to each result')
+        parser.add_argument('--output', '-o', help='Write results here instead of standard output')
+        parser.add_argument('--summary', help='Also write the run summary as JSON to this file')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['repeat'] < 1:
+            raise CommandError('--workers and --repeat must be at least 1')
+
+        if options['stored']:
+            try:
+                graph_source = ('shared', graph_store.current_path(options['graph']))
+            except (ValueError, GraphNotFound) as e:
+                raise CommandError(str(e))
+        else:
+            graph_source = ('file', options['graph'], options['format'], options['directed'])
+
+        started = time.perf_counter()
+        try:
+            graph = load_graph_source(graph_source)
+        except FileNotFoundError:
+            raise CommandError(f'Graph not found: {options["graph"]}')
+        except OSError as e:
+            raise CommandError(f'Cannot read {options["graph"]}: {e}')
+        except (ValueError, SyntaxError) as e:
+            raise CommandError(f'Cannot parse {options["graph"]}: {e}')
+        self.stderr.write(f'Loaded {graph.node_count} nodes, {graph.edge_count} edges '
+                          f'in {time.perf_counter() - started:.2f}s')
+
+        output = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        times_ms = []
+        solved = total = 0
+        started = time.perf_counter()
+        try:
+            records = run_batch(graph_source, read_queries(options['queries']), options['workers'],
+                                options['repeat'], options['include_path'], graph=graph)
+            for record in records:
+                output.write(dumps(record) + b'\n')
+                total += 1
+                solved += bool(record['success'])
+                if 'time_ms' in record:
+                    times_ms.append(record['time_ms'])
+            output.flush()
+        except OSError as e:
+            raise CommandError(f'Cannot read {options["queries"]}: {e}')
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            if options['output']:
+                output.close()
+
+        summary = summarize(times_ms, solved, total, time.perf_counter() - started)
+        summary.update(workers=options['workers'], repeat=options['repeat'],
+                       graph_fingerprint=graph.fingerprint)
+        if options['summary']:
+            with open(options['summary'], 'wb') as handle:
+                handle.write(dumps(summary) + b'\n')
+        self.stderr.write(self.style.SUCCESS(
+            f'{total} queries ({solved} solved) in {summary["elapsed_seconds"]}s, '
+            f'{summary["queries_per_second"]} queries/s'
+            + (f', p50 {summary["time_ms_p50"]} ms, p95 {summary["time_ms_p95"]} ms' if times_ms else '')
+        ))
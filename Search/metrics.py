@@ -0,0 +1,126 @@
+"""
+In-process search metrics exposed in the Prometheus text format.
+
+Counters are aggregated per algorithm for the lifetime of the worker process.
+When several workers serve the site, each one reports its own numbers and the
+scraper sums them.
+"""
+
+import threading
+from bisect import bisect_left
+
+# Histogram buckets for search latency, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Per-search counters summed from the result 'stats' dict: (stats key, metric name, help text)
+COUNTER_FIELDS = (
+    ('expansions', 'search_expansions_total', 'Nodes expanded'),
+    ('frontier_pushes', 'search_frontier_pushes_total', 'Frontier push operations'),
+    ('frontier_pops', 'search_frontier_pops_total', 'Frontier pop operations'),
+    ('stale_pops', 'search_stale_pops_total', 'Frontier pops discarded as superseded entries'),
+    ('callback_time', 'search_callback_seconds_total', 'Seconds spent in step callbacks'),
+    ('search_time', 'search_algorithm_seconds_total', 'Seconds spent searching, excluding step callbacks'),
+)
+
+# Per-search peaks, reported as the largest value seen: (stats key, metric name, help text)
+PEAK_FIELDS = (
+    ('peak_frontier_size', 'search_peak_frontier_size_max', 'Largest frontier size seen in a single search'),
+    ('peak_reached_size', 'search_peak_reached_size_max', 'Largest reached set seen in a single search'),
+)
+
+# Label used for requests that never reached an algorithm (validation or unknown algorithm errors)
+UNKNOWN_ALGORITHM = 'unknown'
+
+
+class _AlgorithmMetrics:
+    """Aggregated counters and latency histogram for one algorithm"""
+
+    def __init__(self):
+        self.searches = {'success': 0, 'no_path': 0, 'error': 0}
+        self.counters = {name: 0 for name, _, _ in COUNTER_FIELDS}
+        self.peaks = {name: 0 for name, _, _ in PEAK_FIELDS}
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+        self.latency_count = 0
+
+
+class SearchMetrics:
+    """Thread-safe registry of per-algorithm search metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._algorithms = {}
+
+    def record_search(self, algorithm: str, result: dict, duration: float):
+        """Record one finished search request and its wall-clock duration in seconds"""
+        stats = result.get('stats')
+        if stats is None:
+            algorithm = UNKNOWN_ALGORITHM
+            outcome = 'error'
+        elif result.get('success'):
+            outcome = 'success'
+        else:
+            outcome = 'no_path'
+
+        with self._lock:
+            metrics = self._algorithms.get(algorithm)
+            if metrics is None:
+                metrics = self._algorithms[algorithm] = _AlgorithmMetrics()
+
+            metrics.searches[outcome] += 1
+            if stats is not None:
+                for name, _, _ in COUNTER_FIELDS:
+                    metrics.counters[name] += stats.get(name, 0)
+                for name, _, _ in PEAK_FIELDS:
+                    metrics.peaks[name] = max(metrics.peaks[name], stats.get(name, 0))
+
+            bucket = bisect_left(LATENCY_BUCKETS, duration)
+            if bucket < len(LATENCY_BUCKETS):
+                metrics.bucket_counts[bucket] += 1
+            metrics.latency_sum += duration
+            metrics.latency_count += 1
+
+    def reset(self):
+        with self._lock:
+            self._algorithms.clear()
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            algorithms = sorted(self._algorithms.items())
+            lines = []
+
+            lines.append('# HELP search_requests_total Search requests by algorithm and outcome')
+            lines.append('# TYPE search_requests_total counter')
+            for algorithm, metrics in algorithms:
+                for outcome, count in metrics.searches.items():
+                    lines.append(f'search_requests_total{{algorithm="{algorithm}",outcome="{outcome}"}} {count}')
+
+            for name, metric, description in COUNTER_FIELDS:
+                lines.append(f'# HELP {metric} {description}')
+                lines.append(f'# TYPE {metric} counter')
+                for algorithm, metrics in algorithms:
+                    lines.append(f'{metric}{{algorithm="{algorithm}"}} {metrics.counters[name]}')
+
+            for name, metric, description in PEAK_FIELDS:
+                lines.append(f'# HELP {metric} {description}')
+                lines.append(f'# TYPE {metric} gauge')
+                for algorithm, metrics in algorithms:
+                    lines.append(f'{metric}{{algorithm="{algorithm}"}} {metrics.peaks[name]}')
+
+            lines.append('# HELP search_duration_seconds Search request latency')
+            lines.append('# TYPE search_duration_seconds histogram')
+            for algorithm, metrics in algorithms:
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, metrics.bucket_counts):
+                    cumulative += count
+                    lines.append(f'search_duration_seconds_bucket{{algorithm="{algorithm}",le="{bound}"}} {cumulative}')
+                lines.append(f'search_duration_seconds_bucket{{algorithm="{algorithm}",le="+Inf"}} {metrics.latency_count}')
+                lines.append(f'search_duration_seconds_sum{{algorithm="{algorithm}"}} {metrics.latency_sum}')
+                lines.append(f'search_duration_seconds_count{{algorithm="{algorithm}"}} {metrics.latency_count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry used by the views
+search_metrics = SearchMetrics()
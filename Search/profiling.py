@@ -0,0 +1,169 @@
+"""
+On-demand profiling of search requests with cProfile and tracemalloc.
+
+A request is profiled when an admin asks for it (``?profile=1`` or an
+``X-Search-Profile: 1`` header, from a staff session or with the configured
+profile token) or when it is picked by the background sampling rate. Explicit
+requests get the report back in the JSON body. Every report is also logged and
+kept in a small in-memory ring buffer that admins can read from /profiles/.
+"""
+
+import cProfile
+import hmac
+import logging
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from functools import wraps
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from .serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Reports kept for /profiles/
+RECENT_PROFILES_LIMIT = 50
+
+# Frames from these files are profiler overhead, not the search
+_IGNORED_ALLOCATION_FILES = (tracemalloc.__file__, __file__)
+
+# cProfile and tracemalloc are process-wide, so only one request is profiled at a time
+_profile_lock = threading.Lock()
+_recent_profiles = deque(maxlen=RECENT_PROFILES_LIMIT)
+
+
+def is_profile_admin(request) -> bool:
+    """Staff users and callers presenting SEARCH_PROFILE_TOKEN may profile requests"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and user.is_staff:
+        return True
+    token = settings.SEARCH_PROFILE_TOKEN
+    provided = request.headers.get('X-Search-Profile-Token', '')
+    return bool(token) and hmac.compare_digest(provided, token)
+
+
+def _profile_mode(request):
+    """Return 'requested', 'sampled' or None for this request"""
+    flag = request.GET.get('profile') or request.headers.get('X-Search-Profile')
+    if flag in ('1', 'true', 'yes') and is_profile_admin(request):
+        return 'requested'
+    sample_rate = settings.SEARCH_PROFILE_SAMPLE_RATE
+    if sample_rate > 0 and random.random() < sample_rate:
+        return 'sampled'
+    return None
+
+
+class SearchProfiler:
+    """Context manager running a block under cProfile and tracemalloc"""
+
+    def __init__(self, top_n: int = 20):
+        self.top_n = top_n
+        self.report = None
+        self._profiler = cProfile.Profile()
+        self._started_tracemalloc = False
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._profiler.disable()
+        wall_time = time.perf_counter() - self._start
+        snapshot = tracemalloc.take_snapshot()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        self.report = {
+            'wall_time': wall_time,
+            'peak_traced_memory': peak_memory,
+            'top_functions': self._top_functions(),
+            'top_allocations': self._top_allocations(snapshot),
+        }
+        return False
+
+    def _top_functions(self):
+        stats = pstats.Stats(self._profiler)
+        rows = []
+        for (filename, line, function), (_, calls, total_time, cumulative_time, _) in stats.stats.items():
+            rows.append({
+                'function': f'{filename}:{line}({function})',
+                'calls': calls,
+                'total_time': total_time,
+                'cumulative_time': cumulative_time,
+            })
+        rows.sort(key=lambda row: row['cumulative_time'], reverse=True)
+        return rows[:self.top_n]
+
+    def _top_allocations(self, snapshot):
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, filename) for filename in _IGNORED_ALLOCATION_FILES
+        ])
+        rows = []
+        for stat in snapshot.statistics('lineno')[:self.top_n]:
+            frame = stat.traceback[0]
+            rows.append({
+                'location': f'{frame.filename}:{frame.lineno}',
+                'size': stat.size,
+                'count': stat.count,
+            })
+        return rows
+
+
+def store_profile(request, mode: str, report: dict) -> str:
+    """Keep a report in the ring buffer and log it; returns its id"""
+    profile_id = uuid.uuid4().hex
+    entry = {
+        'id': profile_id,
+        'path': request.path,
+        'mode': mode,
+        'created': time.time(),
+        'report': report,
+    }
+    _recent_profiles.append(entry)
+    logger.info('Search profile %s (%s) for %s: %.3fs, top function %s',
+                profile_id, mode, request.path, report['wall_time'],
+                report['top_functions'][0]['function'] if report['top_functions'] else '-')
+    return profile_id
+
+
+def recent_profiles():
+    return list(_recent_profiles)
+
+
+def profile_request(view_func):
+    """Decorator that profiles a JSON search view when requested or sampled"""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        mode = _profile_mode(request)
+        if mode is None or not _profile_lock.acquire(blocking=False):
+            return view_func(request, *args, **kwargs)
+
+        try:
+            with SearchProfiler(settings.SEARCH_PROFILE_TOP_N) as profiler:
+                response = view_func(request, *args, **kwargs)
+        finally:
+            _profile_lock.release()
+
+        profile_id = store_profile(request, mode, profiler.report)
+        response['X-Search-Profile-Id'] = profile_id
+
+        if mode == 'requested' and isinstance(response, JsonResponse):
+            # Profiling is rare, so re-encoding the body here is acceptable
+            data = response.data if hasattr(response, 'data') else loads(response.content)
+            if isinstance(data, dict):
+                data['profile'] = dict(profiler.report, id=profile_id)
+                response.content = dumps(data)
+        return response
+    return wrapper
@@ -0,0 +1,278 @@
+"""
+Request parsing and validation shared by the search endpoints.
+
+The body is decoded once and checked against a schema compiled at import time,
+one dict lookup per field. Graph requests then turn their node and edge lists
+straight into a CompiledGraph, which answers the source/destination lookups,
+provides the coalescing fingerprint and becomes the GraphProblem's adjacency
+list, so no later step walks the raw lists again.
+"""
+
+from typing import Dict, List, Tuple
+from urllib.parse import urlencode
+
+from django.core.exceptions import RequestDataTooBig
+
+from search_algorithms import ALGORITHM_NAMES, GRID_ONLY_ALGORITHMS, CompiledGraph
+
+from .graph_store import GraphNotFound, graph_store
+from .serialization import dumps, loads
+
+_EMPTY = (None, '', [], {})
+
+
+class RequestError(Exception):
+    """Raised for requests that fail validation; views turn it into their usual error body"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class Field:
+    """
+    One request field: accepted types, default, and whether it may be missing or empty
+
+    `coerce` converts the value after the type check (e.g. bool for flags).
+    `message` replaces the generic error for a missing or mistyped value.
+    """
+
+    def __init__(self, types: Tuple = None, default=None, required: bool = False, coerce=None,
+                 message: str = None):
+        self.types = types
+        self.default = default
+        self.required = required
+        self.coerce = coerce
+        self.message = message
+
+
+class RequestSchema:
+    """Fields compiled into a flat tuple so parse() is a single pass over them"""
+
+    def __init__(self, **fields: Field):
+        self._fields = tuple(
+            (name, field.types, field.default, field.required, field.coerce, field.message)
+            for name, field in fields.items()
+        )
+
+    def parse(self, data) -> Dict:
+        if not isinstance(data, dict):
+            raise RequestError('Request body must be a JSON object')
+        values = {}
+        for name, types, default, required, coerce, message in self._fields:
+            value = data.get(name)
+            if value in _EMPTY:
+                if required:
+                    raise RequestError(message or f'{name} is required')
+                # Copy mutable defaults so requests never share them
+                value = default.copy() if isinstance(default, (dict, list)) else default
+            elif types is not None and not isinstance(value, types):
+                raise RequestError(message or f'{name} has the wrong type')
+            if coerce is not None:
+                value = coerce(value)
+            values[name] = value
+        return values
+
+
+def read_json_body(request):
+    """Decode the JSON body once; oversized bodies are refused before they are read"""
+    try:
+        body = request.body
+    except RequestDataTooBig:
+        raise RequestError('Request body too large', 413)
+    try:
+        return loads(body)
+    except ValueError:
+        raise RequestError('Invalid JSON data')
+
+
+def _known_algorithm(algorithm: str) -> str:
+    """Coerce for algorithm fields: refuse names solve_problem would not run"""
+    if algorithm.lower() not in ALGORITHM_NAMES:
+        raise RequestError(f'Unknown algorithm: {algorithm}')
+    return algorithm
+
+
+def _graph_algorithm(algorithm: str) -> str:
+    """Coerce for graph algorithm fields: also refuse algorithms that only run on grids"""
+    if _known_algorithm(algorithm).lower() in GRID_ONLY_ALGORITHMS:
+        raise RequestError(f'{ALGORITHM_NAMES[algorithm.lower()]} only runs on grids; use /search_grid/')
+    return algorithm
+
+
+SOURCE_DESTINATION_MESSAGE = 'Source and destination must be specified'
+
+GRAPH_SEARCH = RequestSchema(
+    nodes=Field(list, required=True, message='No nodes provided'),
+    edges=Field(list, required=True, message='No edges provided'),
+    source=Field((str, int), required=True, message=SOURCE_DESTINATION_MESSAGE),
+    destination=Field((str, int, list), required=True, message=SOURCE_DESTINATION_MESSAGE),
+    algorithm=Field(str, default='bfs', coerce=_graph_algorithm),
+    options=Field(dict, default={}, message='Options must be an object'),
+    # Store the steps server-side and return only the first page (/search_sse/)
+    trace=Field(default=False, coerce=bool),
+)
+
+# Searches on a graph imported with `manage.py import_graph`, named instead of sent
+STORED_GRAPH_SEARCH = RequestSchema(
+    graph=Field(str, required=True),
+    source=Field((str, int), required=True, message=SOURCE_DESTINATION_MESSAGE),
+    destination=Field((str, int, list), required=True, message=SOURCE_DESTINATION_MESSAGE),
+    algorithm=Field(str, default='bfs', coerce=_graph_algorithm),
+    options=Field(dict, default={}, message='Options must be an object'),
+    trace=Field(default=False, coerce=bool),
+)
+
+GRID_SEARCH = RequestSchema(
+    encoding=Field(str, default='rows'),
+    cells=Field(required=True, message='Grid cells, source and destination must be specified'),
+    source=Field(list, required=True, message='Grid cells, source and destination must be specified'),
+    destination=Field(list, required=True, message='Grid cells, source and destination must be specified'),
+    width=Field(),
+    height=Field(),
+    algorithm=Field(str, default='a_star', coerce=_known_algorithm),
+    options=Field(dict, default={}, message='Options must be an object'),
+    diagonal=Field(default=False, coerce=bool),
+    include_steps=Field(default=False, coerce=bool),
+    trace=Field(default=False, coerce=bool),
+)
+
+
+def resolve_destination(node_labels, destination):
+    """
+    Map a destination node ID, or a list of them for nearest-target search, to labels
+
+    Returns None when any ID is unknown or the list is empty.
+    """
+    if isinstance(destination, list):
+        labels = [node_labels.get(str(node_id)) for node_id in destination]
+        if not labels or not all(labels):
+            return None
+        return labels
+    return node_labels.get(str(destination))
+
+
+class GraphSearchRequest:
+    """
+    A validated graph search: compiled graph, endpoint labels and the remaining fields
+
+    `graph_name` is set for stored graphs, which get no demo heuristic.
+    """
+
+    def __init__(self, fields: Dict, graph: CompiledGraph, source_label: str, destination_label,
+                 graph_name: str = None):
+        self.fields = fields
+        self.graph = graph
+        self.source_label = source_label
+        self.destination_label = destination_label
+        self.algorithm = fields['algorithm']
+        self.options = fields['options']
+        self.graph_name = graph_name
+
+
+def _parse_stored_graph_search(data) -> GraphSearchRequest:
+    fields = STORED_GRAPH_SEARCH.parse(data)
+    try:
+        graph = graph_store.get(fields['graph'])
+    except ValueError as e:
+        raise RequestError(str(e))
+    except GraphNotFound as e:
+        raise RequestError(str(e), 404)
+
+    source_label = graph.labels.get(str(fields['source']))
+    destination_label = resolve_destination(graph.labels, fields['destination'])
+    if not source_label or not destination_label:
+        raise RequestError('Invalid source or destination node')
+    return GraphSearchRequest(fields, graph, source_label, destination_label, fields['graph'])
+
+
+def parse_graph_search(data, max_nodes: int, max_edges: int) -> GraphSearchRequest:
+    """
+    Validate a decoded graph search body and compile its graph; raises RequestError
+
+    Bodies naming a stored graph skip the node and edge limits, which only apply
+    to graphs sent inline.
+    """
+    if isinstance(data, dict) and data.get('graph'):
+        return _parse_stored_graph_search(data)
+    fields = GRAPH_SEARCH.parse(data)
+    nodes, edges = fields['nodes'], fields['edges']
+
+    # Validate node and edge limits for performance and security
+    if len(nodes) > max_nodes:
+        raise RequestError(f'Too many nodes! Maximum allowed is {max_nodes} nodes for optimal performance. '
+                           f'Please reduce the number of nodes.')
+    if len(edges) > max_edges:
+        raise RequestError(f'Too many edges! Maximum allowed is {max_edges} edges for optimal performance. '
+                           f'Please reduce the number of edges.')
+
+    try:
+        graph = CompiledGraph(nodes, edges)
+    except ValueError as e:
+        raise RequestError(str(e))
+
+    source_label = graph.labels.get(str(fields['source']))
+    destination_label = resolve_destination(graph.labels, fields['destination'])
+    if not source_label or not destination_label:
+        raise RequestError('Invalid source or destination node')
+
+    return GraphSearchRequest(fields, graph, source_label, destination_label)
+
+
+# Results that depend on the clock (ARA*'s deadline) cannot be cached under one URL
+TIME_DEPENDENT_ALGORITHMS = {'anytime_a_star'}
+# Randomized algorithms repeat their result only for a fixed options.seed
+SEEDED_ALGORITHMS = {'stochastic_hill_climbing', 'first_choice_hill_climbing', 'random_restart_hill_climbing'}
+
+
+def parse_stored_graph_query(params, name: str, fingerprint: str = None) -> GraphSearchRequest:
+    """
+    Validate a GET search on a stored graph from its query parameters
+
+    `destination` may repeat for nearest-target search and `options` is a JSON
+    object. With a `fingerprint`, the graph's current version must have it
+    (404 otherwise). Only searches whose result is fixed by the graph and the
+    query are accepted, since their responses are cached indefinitely.
+    """
+    destinations = params.getlist('destination')
+    try:
+        options = loads(params['options']) if params.get('options') else {}
+    except ValueError:
+        raise RequestError('options must be a JSON object')
+    data = {
+        'graph': name,
+        'source': params.get('source'),
+        'destination': destinations if len(destinations) > 1 else params.get('destination'),
+        'algorithm': params.get('algorithm'),
+        'options': options,
+    }
+    search_request = _parse_stored_graph_search(data)
+
+    if fingerprint is not None and search_request.graph.fingerprint != fingerprint:
+        raise RequestError(f'Graph "{name}" has been re-imported; search its current version instead', 404)
+    algorithm = search_request.algorithm.lower()
+    if algorithm in TIME_DEPENDENT_ALGORITHMS:
+        raise RequestError(f'{algorithm} depends on timing and cannot be searched by URL')
+    if algorithm in SEEDED_ALGORITHMS and search_request.options.get('seed') is None:
+        raise RequestError(f'{algorithm} needs options.seed to be searched by URL')
+    return search_request
+
+
+def canonical_query(search_request: GraphSearchRequest) -> str:
+    """Query string with parameters in a fixed order, so equal searches share one URL"""
+    fields = search_request.fields
+    destination = fields['destination']
+    params: List[Tuple[str, str]] = [('algorithm', search_request.algorithm)]
+    for node_id in destination if isinstance(destination, list) else [destination]:
+        params.append(('destination', str(node_id)))
+    if search_request.options:
+        params.append(('options', dumps(_sorted_keys(search_request.options)).decode('utf-8')))
+    params.append(('source', str(fields['source'])))
+    return urlencode(params)
+
+
+def _sorted_keys(value):
+    if isinstance(value, dict):
+        return {key: _sorted_keys(value[key]) for key in sorted(value)}
+    return value
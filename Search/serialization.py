@@ -0,0 +1,109 @@
+"""
+JSON encoding and decoding for every endpoint.
+
+orjson is used when it is installed and the standard library otherwise; both
+produce the same documents. Search results and step traces may hold NaN or
+infinite floats (the cost of a failed search, for example), which JSON cannot
+carry. They are written as null inside the encoder itself, so the data is
+never copied to clean it first: orjson does this natively, and the standard
+library fallback retries such documents with its own float formatter. Floats
+are written in their shortest round-trip form.
+
+Clients that send `Accept: application/msgpack` get the same documents as
+MessagePack when msgpack is installed (see SearchMethods.middleware); there
+floats are IEEE doubles, so NaN and infinities arrive as such.
+"""
+
+import json
+import math
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional format
+    msgpack = None
+
+MSGPACK_CONTENT_TYPE = 'application/msgpack'
+
+_django_encoder = DjangoJSONEncoder()
+
+
+def _default(value):
+    """Types neither encoder handles natively: sets as lists, the rest like Django's JsonResponse"""
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return _django_encoder.default(value)
+
+
+def _float_repr(value: float) -> str:
+    if math.isfinite(value):
+        return float.__repr__(value)
+    return 'null'
+
+
+class SanitizingJSONEncoder(json.JSONEncoder):
+    """Standard library encoder that writes non-finite floats as null instead of NaN/Infinity"""
+
+    def default(self, o):
+        return _default(o)
+
+    def iterencode(self, o, _one_shot=False):
+        # Same as JSONEncoder.iterencode, but with the pure Python encoder so the
+        # float formatter can be replaced (the C encoder hard-codes it)
+        markers = {} if self.check_circular else None
+        _iterencode = json.encoder._make_iterencode(
+            markers, self.default, json.encoder.encode_basestring_ascii if self.ensure_ascii
+            else json.encoder.encode_basestring, self.indent, _float_repr, self.key_separator,
+            self.item_separator, self.sort_keys, self.skipkeys, _one_shot)
+        return _iterencode(o, 0)
+
+
+# The C encoder refuses non-finite floats; only then is the slower sanitizing encoder needed
+_strict_encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, allow_nan=False, default=_default)
+_sanitizing_encoder = SanitizingJSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+
+def dumps(data) -> bytes:
+    """Encode `data` as compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    try:
+        text = _strict_encoder.encode(data)
+    except ValueError:
+        text = _sanitizing_encoder.encode(data)
+    return text.encode('utf-8')
+
+
+def packb(data) -> bytes:
+    """Encode `data` as MessagePack; requires msgpack"""
+    return msgpack.packb(data, default=_default)
+
+
+def loads(data):
+    """Decode JSON from bytes or str; raises ValueError (json.JSONDecodeError) on bad input"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJsonResponse(JsonResponse):
+    """
+    JsonResponse encoded with dumps(); still a JsonResponse for middleware and decorators
+
+    The data is kept so the response can be re-encoded in another negotiated format.
+    """
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError('In order to allow non-dict objects to be serialized set the safe parameter to False.')
+        kwargs.setdefault('content_type', 'application/json')
+        # Skip JsonResponse.__init__, which would encode with the standard library
+        super(JsonResponse, self).__init__(content=dumps(data), **kwargs)
+        self.data = data
@@ -0,0 +1,260 @@
+"""
+Bundled, minified static assets.
+
+The page's scripts and stylesheets are served as one file of each kind:
+
+    js/app.js   visualization.js, ui-manager.js, api-codec.js, replay.js and
+                request-handler.js, in the order the page loads them (they are
+                classic scripts sharing globals, so concatenating them changes
+                nothing)
+    css/app.css main.css with its @imports inlined
+
+BundleFinder builds the bundles from the source files whenever staticfiles
+looks for them, so `collectstatic` collects them like any other file and the
+storage (WhiteNoise's CompressedManifestStaticFilesStorage) fingerprints them,
+writes gzip and brotli copies, and lets WhiteNoise serve them with immutable
+caching. With STATIC_DEBUG the page links the source files instead.
+trace-worker.js is not bundled: it runs in its own Worker context and loads
+api-codec.js itself.
+
+The minifiers are deliberately conservative: they drop comments and collapse
+whitespace but never rename or reorder anything. JavaScript keeps its line
+breaks (bar those next to brackets and separators) so automatic semicolon
+insertion sees the same code.
+"""
+
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.finders import BaseFinder
+from django.core.files.storage import FileSystemStorage
+
+BUNDLES = {
+    'js/app.js': ('js/visualization.js', 'js/ui-manager.js', 'js/api-codec.js', 'js/replay.js',
+                  'js/request-handler.js'),
+    'css/app.css': ('css/main.css',),
+}
+
+_CSS_IMPORT = re.compile(r'''@import\s+(?:url\()?\s*['"]?([^'")\s]+)['"]?\s*\)?\s*;''')
+
+# Characters after which a "/" starts a regular expression rather than a division
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw',
+                   'instanceof', 'yield', 'await'}
+# Spaces next to these never separate two tokens that would otherwise merge
+_JS_TIGHT = re.compile(r' ?([{}()\[\];,:=<>?|&!]) ?')
+# Line breaks that automatic semicolon insertion cannot depend on
+_JS_JOINABLE_BREAK = re.compile(r'(?<=[{(\[,;:=])\n|\n(?=[})\],;.])')
+_CSS_TIGHT = re.compile(r' ?([{};,>]) ?')
+
+
+def _skip_string(source: str, start: int) -> int:
+    """Index just past the string literal opening at `start`"""
+    quote = source[start]
+    index = start + 1
+    while index < len(source):
+        char = source[index]
+        if char == '\\':
+            index += 2
+            continue
+        index += 1
+        if char == quote:
+            break
+    return index
+
+
+def _skip_template(source: str, start: int) -> int:
+    """Index just past the template literal opening at `start`, including nested ${...}"""
+    index = start + 1
+    while index < len(source):
+        char = source[index]
+        if char == '\\':
+            index += 2
+        elif char == '`':
+            return index + 1
+        elif source.startswith('${', index):
+            depth = 1
+            index += 2
+            while index < len(source) and depth:
+                char = source[index]
+                if char in '\'"':
+                    index = _skip_string(source, index)
+                elif char == '`':
+                    index = _skip_template(source, index)
+                else:
+                    depth += (char == '{') - (char == '}')
+                    index += 1
+        else:
+            index += 1
+    return index
+
+
+def _skip_regex(source: str, start: int) -> int:
+    """Index just past the regular expression literal (and flags) opening at `start`"""
+    index = start + 1
+    in_class = False
+    while index < len(source):
+        char = source[index]
+        if char == '\\':
+            index += 2
+            continue
+        index += 1
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            break
+    while index < len(source) and (source[index].isalnum() or source[index] == '_'):
+        index += 1
+    return index
+
+
+def _regex_allowed(code: str) -> bool:
+    stripped = code.rstrip()
+    if not stripped:
+        return True
+    if stripped[-1] in _REGEX_PRECEDERS:
+        return True
+    word = re.search(r'[A-Za-z_$][\w$]*$', stripped)
+    return bool(word) and word.group() in _REGEX_KEYWORDS
+
+
+def _minify_js_code(code: str) -> str:
+    code = re.sub(r'[ \t\r\f\v]*\n\s*', '\n', code)
+    code = re.sub(r'[ \t\r\f\v]+', ' ', code)
+    code = _JS_TIGHT.sub(r'\1', code)
+    return _JS_JOINABLE_BREAK.sub('', code)
+
+
+def minify_js(source: str) -> str:
+    """Remove comments and redundant whitespace; literals are copied untouched"""
+    pieces = []
+    code = []
+    index = 0
+    length = len(source)
+    while index < length:
+        char = source[index]
+        if char in '\'"`' or (char == '/' and source[index + 1:index + 2] not in ('/', '*')
+                              and _regex_allowed(''.join(code) or (pieces[-1] if pieces else ''))):
+            if char == '`':
+                end = _skip_template(source, index)
+            elif char == '/':
+                end = _skip_regex(source, index)
+            else:
+                end = _skip_string(source, index)
+            pieces.append(_minify_js_code(''.join(code)))
+            pieces.append(source[index:end])
+            code = []
+            index = end
+        elif source.startswith('//', index):
+            end = source.find('\n', index)
+            index = length if end < 0 else end
+        elif source.startswith('/*', index):
+            end = source.find('*/', index + 2)
+            end = length if end < 0 else end + 2
+            # A comment spanning lines still ends a statement for semicolon insertion
+            code.append('\n' if '\n' in source[index:end] else ' ')
+            index = end
+        else:
+            code.append(char)
+            index += 1
+    pieces.append(_minify_js_code(''.join(code)))
+    return ''.join(pieces).strip() + '\n'
+
+
+def minify_css(source: str) -> str:
+    """Remove comments and redundant whitespace; strings are copied untouched"""
+    pieces = []
+    code = []
+
+    def flush():
+        text = re.sub(r'\s+', ' ', ''.join(code))
+        text = _CSS_TIGHT.sub(r'\1', text)
+        pieces.append(re.sub(r': ', ':', text))
+        code.clear()
+
+    index = 0
+    while index < len(source):
+        char = source[index]
+        if char in '\'"':
+            end = _skip_string(source, index)
+            flush()
+            pieces.append(source[index:end])
+            index = end
+        elif source.startswith('/*', index):
+            end = source.find('*/', index + 2)
+            index = len(source) if end < 0 else end + 2
+            code.append(' ')
+        else:
+            code.append(char)
+            index += 1
+    flush()
+    return ''.join(pieces).replace(';}', '}').strip() + '\n'
+
+
+def _read_source(path: str) -> str:
+    found = finders.find(path)
+    if not found:
+        raise FileNotFoundError(f'Static file {path} not found')
+    with open(found, encoding='utf-8') as handle:
+        return handle.read()
+
+
+def _inline_css_imports(path: str, seen=None) -> str:
+    seen = seen if seen is not None else set()
+    if path in seen:
+        return ''
+    seen.add(path)
+    directory = os.path.dirname(path)
+
+    def replace(match):
+        return _inline_css_imports(os.path.normpath(os.path.join(directory, match.group(1))).replace(os.sep, '/'),
+                                   seen)
+
+    return _CSS_IMPORT.sub(replace, _read_source(path))
+
+
+def build_bundle(name: str) -> str:
+    """Contents of the bundle `name`"""
+    sources = BUNDLES[name]
+    if name.endswith('.css'):
+        return minify_css('\n'.join(_inline_css_imports(source) for source in sources))
+    # Each file ends its last statement so joining cannot fuse two of them
+    return ''.join(minify_js(_read_source(source)) + ';\n' for source in sources)
+
+
+class BundleFinder(BaseFinder):
+    """Staticfiles finder that builds BUNDLES into STATIC_BUNDLE_DIR when they are looked up"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.storage = FileSystemStorage(location=settings.STATIC_BUNDLE_DIR)
+
+    def _build(self, name: str) -> str:
+        content = build_bundle(name)
+        path = self.storage.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Leave unchanged bundles alone so their modification time stays put
+        try:
+            with open(path, encoding='utf-8') as handle:
+                if handle.read() == content:
+                    return path
+        except FileNotFoundError:
+            pass
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(content)
+        return path
+
+    def find(self, path, all=False, **kwargs):
+        if path not in BUNDLES:
+            return [] if all else None
+        found = self._build(path)
+        return [found] if all else found
+
+    def list(self, ignore_patterns):
+        for name in BUNDLES:
+            self._build(name)
+            yield name, self.storage
@@ -0,0 +1,289 @@
+"""
+Interactive stepping over WebSocket with server-held suspended searches.
+
+Each connection to /ws/step/ may start one search. The search runs in its own
+thread, but its step callback blocks until the client has asked for more
+steps, so the server only ever computes as far as the client is watching:
+
+    {"type": "start", "nodes": [...], "edges": [...], "source": "1",
+     "destination": "5", "algorithm": "a_star", "options": {}}
+    {"type": "next", "n": 10}       advance 10 more steps
+    {"type": "run_to", "step": 250}  advance until 250 steps have been produced
+    {"type": "pause"}                stop after the steps already in flight
+    {"type": "abort"}                end the search and close the connection
+
+The server answers with "started", batches of "steps", "paused" whenever the
+requested steps have all been sent, "complete" with the result, "aborted" and
+"error". A suspended search holds one parked thread, at most
+STEPPING_MAX_BUFFER unsent steps and its admission capacity until it ends. Connections idle for STEPPING_IDLE_TIMEOUT
+seconds are closed and their searches aborted, as are searches whose client
+disconnects.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Tuple
+
+from django.conf import settings
+from django.http.request import split_domain_port, validate_host
+
+from search_algorithms import solve_graph_with_steps
+
+from .admission import AdmissionRejected, admission_controller, estimate_cost
+from .schemas import RequestError, parse_graph_search
+from .serialization import dumps, loads
+from .views import MAX_EDGES, MAX_NODES, demo_heuristic
+
+# Close codes sent to the client (4000-4999 are free for applications)
+CLOSE_FORBIDDEN_ORIGIN = 4003
+CLOSE_IDLE = 4008
+CLOSE_TOO_MANY_SESSIONS = 4013
+
+
+class SearchAborted(BaseException):
+    """
+    Raised inside a suspended search's thread to unwind it
+
+    Like GeneratorExit, it derives from BaseException so the `except Exception`
+    that turns search errors into error results does not catch it.
+    """
+
+
+class SteppingSession:
+    """A search running in its own thread that only advances as far as it is allowed to"""
+
+    def __init__(self, run_search: Callable[[Callable], Dict], max_buffer: int,
+                 on_finish: Callable[[], None] = None):
+        self._run_search = run_search
+        self._on_finish = on_finish
+        self.max_buffer = max_buffer
+        self._condition = threading.Condition()
+        # Steps the client asked for that have not been produced yet
+        self._allowance = 0
+        self._buffer = deque()
+        self._aborted = False
+        self.produced = 0
+        self.done = False
+        self.result = None
+        self._thread = threading.Thread(target=self._run, name='stepping-session', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            result = self._run_search(self._step_callback)
+        except SearchAborted:
+            result = None
+        finally:
+            if self._on_finish is not None:
+                self._on_finish()
+        with self._condition:
+            self.result = result
+            self.done = True
+            self._condition.notify_all()
+
+    def _step_callback(self, step_data: Dict):
+        with self._condition:
+            while not self._aborted and (self._allowance <= 0 or len(self._buffer) >= self.max_buffer):
+                self._condition.wait()
+            if self._aborted:
+                raise SearchAborted()
+            self._allowance -= 1
+            self.produced += 1
+            self._buffer.append(step_data)
+            self._condition.notify_all()
+
+    @property
+    def requested(self) -> int:
+        """Steps produced plus steps still allowed"""
+        with self._condition:
+            return self.produced + self._allowance
+
+    def advance(self, count: int):
+        with self._condition:
+            self._allowance += max(0, count)
+            self._condition.notify_all()
+
+    def pause(self):
+        with self._condition:
+            self._allowance = 0
+            self._condition.notify_all()
+
+    def abort(self):
+        with self._condition:
+            self._aborted = True
+            self._condition.notify_all()
+
+    def drain(self, timeout: float) -> Tuple[List[Dict], bool, bool]:
+        """
+        Wait up to `timeout` for produced steps and take them
+
+        Returns (steps, finished, waiting): finished once the search has ended and
+        every step was taken, waiting when it is parked until the client asks for more.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._buffer or self.done or self._aborted or self._allowance <= 0, timeout)
+            steps = list(self._buffer)
+            self._buffer.clear()
+            self._condition.notify_all()
+            finished = self.done
+            waiting = not finished and self._allowance <= 0
+            return steps, finished, waiting
+
+
+def _origin_allowed(scope: Dict) -> bool:
+    """Browsers always send Origin on WebSocket handshakes; only same-site pages may connect"""
+    headers = dict(scope.get('headers', []))
+    origin = headers.get(b'origin')
+    if origin is None:
+        return True
+    host = origin.decode('latin1').split('://', 1)[-1]
+    domain, _ = split_domain_port(host)
+    return bool(domain) and validate_host(domain, settings.ALLOWED_HOSTS)
+
+
+def _build_search(data: Dict) -> Tuple[Callable[[Callable], Dict], float]:
+    """Validate a start message; returns the search to run and its admission cost"""
+    search_request = parse_graph_search(data, MAX_NODES, MAX_EDGES)
+    graph = search_request.graph
+    # A session parks a thread for as long as the client watches, so stored graphs get the inline limits too
+    if graph.node_count > MAX_NODES or graph.edge_count > MAX_EDGES:
+        raise RequestError(f'Stepping is limited to graphs of at most {MAX_NODES} nodes and {MAX_EDGES} edges. '
+                           f'Use /process_graph/ for larger stored graphs.')
+    algorithm = search_request.algorithm
+    heuristic = demo_heuristic(search_request, algorithm)
+
+    def run_search(step_callback):
+        return solve_graph_with_steps(graph, search_request.source_label, search_request.destination_label,
+                                      algorithm, heuristic, step_callback, search_request.options)
+
+    return run_search, estimate_cost(algorithm, graph.node_count, graph.edge_count, search_request.options)
+
+
+class _SessionRegistry:
+    """Counts live sessions so one process cannot hold unbounded suspended searches"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self.active >= settings.STEPPING_MAX_SESSIONS:
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+
+
+stepping_sessions = _SessionRegistry()
+
+
+async def websocket_application(scope, receive, send):
+    """ASGI application for /ws/step/ (see the module docstring for the protocol)"""
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    if not _origin_allowed(scope):
+        await send({'type': 'websocket.close', 'code': CLOSE_FORBIDDEN_ORIGIN})
+        return
+    if not stepping_sessions.acquire():
+        await send({'type': 'websocket.close', 'code': CLOSE_TOO_MANY_SESSIONS})
+        return
+    await send({'type': 'websocket.accept'})
+
+    client = (scope.get('client') or ('',))[0]
+    session = None
+    pump_task = None
+
+    async def send_json(payload):
+        await send({'type': 'websocket.send', 'text': dumps(payload).decode('utf-8')})
+
+    async def pump():
+        # Forward steps as they are produced until the allowance is used up or the search ends
+        while True:
+            steps, finished, waiting = await asyncio.to_thread(session.drain, 0.5)
+            if steps:
+                await send_json({'type': 'steps', 'steps': steps, 'produced': session.produced})
+            if finished:
+                await send_json({'type': 'complete', 'result': session.result, 'produced': session.produced})
+                return
+            if waiting:
+                await send_json({'type': 'paused', 'produced': session.produced})
+                return
+
+    def ensure_pump():
+        nonlocal pump_task
+        if pump_task is None or pump_task.done():
+            pump_task = asyncio.ensure_future(pump())
+
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(receive(), timeout=settings.STEPPING_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                if pump_task is not None and not pump_task.done():
+                    # Still streaming steps the client asked for
+                    continue
+                await send({'type': 'websocket.close', 'code': CLOSE_IDLE})
+                break
+            if message['type'] == 'websocket.disconnect':
+                break
+            if message['type'] != 'websocket.receive':
+                continue
+
+            try:
+                command = loads(message.get('text') or message.get('bytes') or '')
+                if not isinstance(command, dict):
+                    raise ValueError('Commands must be JSON objects')
+                kind = command.get('type')
+
+                if kind == 'start':
+                    if session is not None:
+                        raise ValueError('A search is already running on this connection')
+                    run_search, cost = _build_search(command)
+                    try:
+                        with admission_controller.charge(client, cost):
+                            # May queue for capacity; the session holds it until its thread ends
+                            await asyncio.to_thread(admission_controller.acquire, cost)
+                    except AdmissionRejected as rejection:
+                        await send_json({'type': 'error', 'message': rejection.message,
+                                         'retry_after': rejection.retry_after})
+                        continue
+                    session = SteppingSession(run_search, settings.STEPPING_MAX_BUFFER,
+                                              on_finish=lambda: admission_controller.release(cost))
+                    await send_json({'type': 'started', 'algorithm': command.get('algorithm', 'bfs')})
+                elif session is None:
+                    raise ValueError('Send a start command first')
+                elif kind == 'next':
+                    count = int(command.get('n', 1))
+                    session.advance(max(1, min(count, settings.STEPPING_MAX_ADVANCE)))
+                    ensure_pump()
+                elif kind == 'run_to':
+                    target = min(int(command['step']), session.produced + settings.STEPPING_MAX_ADVANCE)
+                    session.advance(target - session.requested)
+                    ensure_pump()
+                elif kind == 'pause':
+                    session.pause()
+                    ensure_pump()
+                elif kind == 'abort':
+                    session.abort()
+                    await send_json({'type': 'aborted', 'produced': session.produced})
+                    await send({'type': 'websocket.close', 'code': 1000})
+                    break
+                else:
+                    raise ValueError(f'Unknown command: {kind}')
+            except RequestError as e:
+                await send_json({'type': 'error', 'message': e.message})
+            except (ValueError, TypeError, KeyError) as e:
+                await send_json({'type': 'error', 'message': str(e)})
+    finally:
+        if session is not None:
+            session.abort()
+        if pump_task is not None:
+            pump_task.cancel()
+        stepping_sessions.release()
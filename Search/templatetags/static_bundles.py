@@ -0,0 +1,23 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from Search.static_build import BUNDLES
+
+register = template.Library()
+
+
+@register.simple_tag
+def bundle(name):
+    """
+    <script> or <link> tags for a bundle from Search.static_build.BUNDLES
+
+    Links the bundle itself, or each of its source files when STATIC_BUNDLES is off.
+    """
+    paths = (name,) if settings.STATIC_BUNDLES else BUNDLES[name]
+    if name.endswith('.css'):
+        return format_html_join('\n', '<link rel="stylesheet" type="text/css" href="{}">',
+                                ((static(path),) for path in paths))
+    return format_html_join('\n', '<script type="text/javascript" src="{}"></script>',
+                            ((static(path),) for path in paths))
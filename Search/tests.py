@@ -0,0 +1,270 @@
+"""Tests for stored graphs, file loaders, step traces and stepping sessions"""
+
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from graph_loaders import load_dimacs, load_edge_list, load_graph_file, load_graphml
+from search_algorithms import CompiledGraph, solve_graph, solve_graph_with_steps
+from shared_graph import SharedGraph, write_shared_graph
+
+from .graph_store import GraphNotFound, GraphStore, version_path
+from .stepping import SteppingSession
+from .traces import TraceNotFound, TraceWriter, read_steps
+
+TESTDATA = os.path.join(os.path.dirname(__file__), 'testdata')
+
+
+def sample_graph(size=30):
+    """A connected weighted graph: a ring with chords, plus one isolated node"""
+    nodes = [{'id': i, 'label': f'n{i}'} for i in range(size + 1)]
+    edges = [{'from': i, 'to': (i + 1) % size, 'label': str(1 + i % 4)} for i in range(size)]
+    edges += [{'from': i, 'to': (i * 7 + 3) % size, 'label': str(2 + i % 5)} for i in range(0, size, 3)]
+    return CompiledGraph(nodes, edges)
+
+
+def search_outcome(result):
+    return result['success'], result['path'], result['cost']
+
+
+def without_timings(steps):
+    return [{key: value for key, value in step.items() if key != 'execution_time'} for step in steps]
+
+
+class TemporaryDirectoryTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+
+class SharedGraphTests(TemporaryDirectoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.graph = sample_graph()
+        self.path = os.path.join(self.directory, 'sample.graph')
+        write_shared_graph(self.graph, self.path)
+        self.shared = SharedGraph(self.path)
+
+    def test_mapping_matches_compiled_graph(self):
+        self.assertEqual(len(self.shared), self.graph.node_count)
+        self.assertEqual(list(self.shared), list(self.graph.adjacency))
+        self.assertEqual({label: self.shared[label] for label in self.shared}, self.graph.adjacency)
+        self.assertEqual(self.shared.fingerprint, self.graph.fingerprint)
+        self.assertEqual(self.shared.edge_count, self.graph.edge_count)
+        self.assertFalse(self.shared.directed)
+
+    def test_lookups_of_unknown_labels(self):
+        self.assertNotIn('missing', self.shared)
+        self.assertIsNone(self.shared.get('missing'))
+        self.assertIsNone(self.shared.labels.get(42))
+        with self.assertRaises(KeyError):
+            self.shared['missing']
+
+    def test_components(self):
+        self.assertTrue(self.shared.components.connected('n0', 'n17'))
+        self.assertFalse(self.shared.components.connected('n0', 'n30'))
+        self.assertEqual(self.shared.components.component_size('n0'), 30)
+        self.assertEqual(self.shared.components.component_size('n30'), 1)
+
+    def test_search_matches_in_memory_graph(self):
+        for algorithm in ('bfs', 'dfs', 'dijkstra', 'a_star', 'best_first', 'k_shortest'):
+            with self.subTest(algorithm=algorithm):
+                self.assertEqual(search_outcome(solve_graph(self.shared, 'n0', 'n19', algorithm)),
+                                 search_outcome(solve_graph(self.graph, 'n0', 'n19', algorithm)))
+
+    def test_pickling_reattaches_to_the_file(self):
+        copy = pickle.loads(pickle.dumps(self.shared))
+        self.assertEqual(copy.path, self.path)
+        self.assertEqual(copy['n5'], self.shared['n5'])
+
+    def test_rejects_other_files(self):
+        path = os.path.join(self.directory, 'other.graph')
+        with open(path, 'wb') as handle:
+            handle.write(b'\0' * 256)
+        with self.assertRaises(ValueError):
+            SharedGraph(path)
+
+
+class GraphStoreTests(TemporaryDirectoryTestCase):
+    def setUp(self):
+        super().setUp()
+        settings_override = override_settings(GRAPH_STORE_DIR=self.directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.store = GraphStore()
+
+    def test_save_then_get(self):
+        graph = sample_graph()
+        self.assertEqual(self.store.save('ring', graph), version_path('ring', 1))
+        shared = self.store.get('ring')
+        self.assertEqual(shared.version, 1)
+        self.assertIs(self.store.get('ring'), shared)
+        self.assertEqual(search_outcome(solve_graph(shared, 'n0', 'n19', 'dijkstra')),
+                         search_outcome(solve_graph(graph, 'n0', 'n19', 'dijkstra')))
+        self.assertEqual(self.store.names(), ['ring'])
+
+    def test_reimport_swaps_the_current_version(self):
+        self.store.save('ring', sample_graph(30))
+        old = self.store.get('ring')
+        self.store.save('ring', sample_graph(40))
+        new = self.store.get('ring')
+        self.assertEqual(new.version, 2)
+        self.assertEqual(len(new), 41)
+        # Searches holding the old mapping keep working
+        self.assertEqual(len(old), 31)
+        self.assertTrue(solve_graph(old, 'n0', 'n19', 'dijkstra')['success'])
+
+        # The version before the current one is kept, older ones are removed
+        self.store.save('ring', sample_graph(50))
+        self.assertEqual(self.store.current_version('ring'), 3)
+        self.assertFalse(os.path.exists(version_path('ring', 1)))
+        self.assertTrue(os.path.exists(version_path('ring', 2)))
+
+    def test_unknown_graph(self):
+        with self.assertRaises(GraphNotFound):
+            self.store.get('missing')
+
+    def test_rejects_bad_names(self):
+        with self.assertRaises(ValueError):
+            self.store.save('../escape', sample_graph())
+
+
+@override_settings(TRACE_CACHE_ALIAS='default')
+class TraceTests(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.steps = [{'type': 'exploring', 'step': index, 'node': f'n{index}'} for index in range(23)]
+        self.writer = TraceWriter(chunk_size=5)
+        for step in self.steps:
+            self.writer.append(step)
+        self.summary = self.writer.close()
+
+    def test_summary(self):
+        self.assertEqual(self.summary['total_steps'], 23)
+        self.assertEqual(self.summary['chunk_size'], 5)
+        self.assertEqual(self.summary['next_cursor'], '5')
+        self.assertEqual(self.writer.first_page, self.steps[:5])
+
+    def test_pages_cover_the_trace(self):
+        collected, offset = [], 0
+        while offset is not None:
+            page = read_steps(self.summary['trace_id'], offset, 7)
+            self.assertEqual(page['offset'], offset)
+            self.assertEqual(page['total_steps'], 23)
+            collected.extend(page['steps'])
+            offset = int(page['next_cursor']) if page['next_cursor'] else None
+        self.assertEqual(collected, self.steps)
+
+    def test_ranges_are_clamped(self):
+        trace_id = self.summary['trace_id']
+        self.assertEqual(read_steps(trace_id, 3, 4)['steps'], self.steps[3:7])
+        self.assertEqual(read_steps(trace_id, 20, 100)['steps'], self.steps[20:])
+        past_end = read_steps(trace_id, 50, 5)
+        self.assertEqual((past_end['offset'], past_end['steps'], past_end['next_cursor']), (23, [], None))
+        self.assertEqual(read_steps(trace_id, 4, 0)['steps'], [])
+
+    def test_unknown_or_expired_traces(self):
+        with self.assertRaises(TraceNotFound):
+            read_steps('missing', 0, 5)
+        caches['default'].delete(f'trace:{self.summary["trace_id"]}:chunk:2')
+        self.assertEqual(read_steps(self.summary['trace_id'], 0, 10)['steps'], self.steps[:10])
+        with self.assertRaises(TraceNotFound):
+            read_steps(self.summary['trace_id'], 8, 5)
+
+
+class GraphLoaderTests(SimpleTestCase):
+    def fixture(self, name):
+        return os.path.join(TESTDATA, name)
+
+    def assertShortestPath(self, graph):
+        result = solve_graph(graph, '1', '4', 'dijkstra')
+        self.assertEqual((result['path'], result['cost']), (['1', '2', '3', '4'], 4.0))
+
+    def test_dimacs(self):
+        graph = load_dimacs(self.fixture('small.gr'))
+        self.assertEqual((graph.node_count, graph.edge_count), (5, 8))
+        self.assertTrue(graph.directed)
+        self.assertEqual(graph.adjacency['5'], [])
+        self.assertShortestPath(graph)
+        with open(self.fixture('small.gr'), 'rb') as handle:
+            self.assertEqual(graph.fingerprint, hashlib.sha256(handle.read()).hexdigest())
+
+    def test_edge_list(self):
+        graph = load_edge_list(self.fixture('small.edges'))
+        self.assertEqual((graph.node_count, graph.edge_count), (4, 4))
+        self.assertFalse(graph.directed)
+        self.assertIn(('3', 1.0), graph.adjacency['4'])
+        self.assertShortestPath(graph)
+
+    def test_graphml(self):
+        graph = load_graphml(self.fixture('small.graphml'))
+        self.assertEqual((graph.node_count, graph.edge_count), (4, 5))
+        self.assertTrue(graph.directed)
+        self.assertIn(('1', 7.0), graph.adjacency['4'])
+        self.assertNotIn(('4', 7.0), graph.adjacency['1'])
+        self.assertShortestPath(graph)
+
+    def test_format_detection(self):
+        for name in ('small.gr', 'small.edges', 'small.graphml'):
+            with self.subTest(name=name):
+                self.assertShortestPath(load_graph_file(self.fixture(name)))
+        with self.assertRaises(ValueError):
+            load_graph_file(self.fixture('small.edges'), 'csv')
+
+    def test_malformed_lines(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.gr', delete=False) as handle:
+            handle.write('p sp 2 1\na 1 2\n')
+        self.addCleanup(os.unlink, handle.name)
+        with self.assertRaisesRegex(ValueError, ':2: expected'):
+            load_dimacs(handle.name)
+
+
+class SteppingSessionTests(SimpleTestCase):
+    def setUp(self):
+        self.graph = sample_graph()
+        self.expected = []
+        solve_graph_with_steps(self.graph, 'n0', 'n19', 'a_star', step_callback=self.expected.append)
+        self.finished = []
+
+    def start(self):
+        def run_search(step_callback):
+            return solve_graph_with_steps(self.graph, 'n0', 'n19', 'a_star', step_callback=step_callback)
+
+        session = SteppingSession(run_search, max_buffer=4, on_finish=lambda: self.finished.append(True))
+        self.addCleanup(session.abort)
+        return session
+
+    def drain_until(self, session, done):
+        steps = []
+        while True:
+            taken, finished, waiting = session.drain(5)
+            steps.extend(taken)
+            if done(finished, waiting):
+                return steps, finished, waiting
+
+    def test_advances_only_as_far_as_asked(self):
+        session = self.start()
+        session.advance(3)
+        steps, finished, waiting = self.drain_until(session, lambda finished, waiting: waiting or finished)
+        self.assertEqual((steps, finished, session.produced), (self.expected[:3], False, 3))
+
+        session.advance(len(self.expected))
+        steps += self.drain_until(session, lambda finished, waiting: finished)[0]
+        self.assertEqual(without_timings(steps), without_timings(self.expected))
+        self.assertTrue(session.result['success'])
+        self.assertEqual(self.finished, [True])
+
+    def test_abort_unwinds_the_search(self):
+        session = self.start()
+        session.advance(2)
+        self.drain_until(session, lambda finished, waiting: waiting)
+        session.abort()
+        self.drain_until(session, lambda finished, waiting: finished)
+        self.assertIsNone(session.result)
+        self.assertEqual(session.produced, 2)
+        self.assertEqual(self.finished, [True])
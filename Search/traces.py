@@ -0,0 +1,116 @@
+"""
+Server-side step traces for paginated replay.
+
+A traced search writes its steps into fixed-size chunks as they are produced.
+Each chunk is stored as zlib-compressed JSON in the Django cache under the
+trace id, next to a small metadata entry, so neither the server nor the
+browser holds the whole trace. Clients read step ranges back through
+/traces/<trace_id>/ and may seek anywhere. The cache timeout (TRACE_TTL)
+evicts traces nobody replays; point TRACE_CACHE_ALIAS at a shared cache
+(file, Redis, ...) when several workers serve the site.
+"""
+
+import uuid
+import zlib
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .serialization import dumps, loads
+
+
+class TraceNotFound(Exception):
+    """Raised when a trace id is unknown or its chunks have expired"""
+
+
+def _cache():
+    return caches[settings.TRACE_CACHE_ALIAS]
+
+
+def _meta_key(trace_id: str) -> str:
+    return f'trace:{trace_id}:meta'
+
+
+def _chunk_key(trace_id: str, index: int) -> str:
+    return f'trace:{trace_id}:chunk:{index}'
+
+
+class TraceWriter:
+    """Collects the steps of one search and stores them chunk by chunk"""
+
+    def __init__(self, chunk_size: int = None, ttl: int = None):
+        self.trace_id = uuid.uuid4().hex
+        self.chunk_size = chunk_size or settings.TRACE_CHUNK_SIZE
+        self.ttl = ttl or settings.TRACE_TTL
+        self.total_steps = 0
+        self.chunks = 0
+        # The first chunk is also returned inline so playback can start at once
+        self.first_page = []
+        self._buffer = []
+
+    def append(self, step: Dict):
+        self._buffer.append(step)
+        self.total_steps += 1
+        if len(self._buffer) >= self.chunk_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        if self.chunks == 0:
+            self.first_page = self._buffer
+        payload = zlib.compress(dumps(self._buffer))
+        _cache().set(_chunk_key(self.trace_id, self.chunks), payload, self.ttl)
+        self.chunks += 1
+        self._buffer = []
+
+    def close(self) -> Dict:
+        """Store the remaining steps and the metadata; returns the trace summary for the client"""
+        self._flush()
+        meta = {
+            'total_steps': self.total_steps,
+            'chunk_size': self.chunk_size,
+            'chunks': self.chunks,
+        }
+        _cache().set(_meta_key(self.trace_id), meta, self.ttl)
+        return {
+            'trace_id': self.trace_id,
+            'total_steps': self.total_steps,
+            'chunk_size': self.chunk_size,
+            'next_cursor': str(len(self.first_page)) if len(self.first_page) < self.total_steps else None,
+        }
+
+
+def read_steps(trace_id: str, offset: int, limit: int) -> Dict:
+    """Steps [offset, offset + limit) of a stored trace; raises TraceNotFound when it has expired"""
+    cache = _cache()
+    meta = cache.get(_meta_key(trace_id))
+    if meta is None:
+        raise TraceNotFound(f'Trace {trace_id} not found or expired')
+
+    total = meta['total_steps']
+    chunk_size = meta['chunk_size']
+    offset = max(0, min(offset, total))
+    end = min(total, offset + max(0, limit))
+
+    steps: List[Dict] = []
+    if end > offset:
+        indexes = range(offset // chunk_size, (end - 1) // chunk_size + 1)
+        keys = [_chunk_key(trace_id, index) for index in indexes]
+        stored = cache.get_many(keys)
+        for index, key in zip(indexes, keys):
+            if key not in stored:
+                raise TraceNotFound(f'Trace {trace_id} has expired')
+            chunk = loads(zlib.decompress(stored[key]))
+            chunk_start = index * chunk_size
+            steps.extend(chunk[max(offset - chunk_start, 0):end - chunk_start])
+
+    return {
+        'trace_id': trace_id,
+        'offset': offset,
+        'total_steps': total,
+        'steps': steps,
+        # Cursors are opaque to clients; they currently hold the next offset
+        'next_cursor': str(end) if end < total else None,
+    }
@@ -5,5 +5,11 @@ urlpatterns = [
     path('', views.index, name='home'),
     path('process_graph/', views.search_path, name='process_graph'),
     path('search_sse/', views.search_path_sse, name='search_sse'),
+    path('search_grid/', views.search_grid, name='search_grid'),
+    path('traces/<str:trace_id>/', views.trace_steps, name='trace_steps'),
+    path('graphs/<str:name>/search/', views.stored_graph_search_latest, name='stored_graph_search_latest'),
+    path('graphs/<str:name>/<str:fingerprint>/search/', views.stored_graph_search, name='stored_graph_search'),
+    path('metrics/', views.metrics, name='metrics'),
+    path('profiles/', views.profiles, name='profiles'),
     path('debug_info/', views.debug_info, name='debug_info')
 ]
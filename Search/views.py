@@ -1,327 +1,502 @@
 from django.shortcuts import render
-import json
-from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.http import HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
 import asyncio
+import hashlib
+import hmac
 import random
-import sys
 import os
 import time
-from django_ratelimit.decorators import ratelimit
 from django.views.decorators.cache import cache_page
 from django.conf import settings
 
-# Add the Algorithms directory to the Python path
-sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'Algorithms'))
+from search_algorithms import solve_graph, solve_graph_with_steps, solve_problem
+from grid_problem import GridProblem, PackedGrid
 
-from search_algorithms import solve_graph, solve_graph_with_steps
+from .admission import AdmissionRejected, admission_controller, client_key, estimate_cost
+from .coalescing import CoalescingTimeout, search_coalescer, search_key
+from .metrics import search_metrics
+from .profiling import is_profile_admin, profile_request, recent_profiles
+from .schemas import (GRID_SEARCH, RequestError, canonical_query, parse_graph_search, parse_stored_graph_query,
+                      read_json_body)
+from .serialization import FastJsonResponse
+from .traces import TraceNotFound, TraceWriter, read_steps
 
 # Configuration constants
 MAX_NODES = 20
 MAX_EDGES = 50
+# Step events kept when a grid search is asked for its trace
+MAX_GRID_STEPS = 10000
+
+# Bumped whenever the body of cached GET searches changes shape, so old ETags stop matching
+CACHED_RESULT_FORMAT = 1
+# Stats that measure time rather than work; left out of cached GET searches
+TIMING_STATS = ('search_time', 'callback_time')
+
+# Algorithms that need generated heuristic values
+HEURISTIC_ALGORITHMS = [
+    'a_star', 'astar', 'hill_climbing', 'best_first', 'stochastic_hill_climbing',
+    'first_choice_hill_climbing', 'random_restart_hill_climbing', 'anytime_a_star',
+    'beam', 'bounded_best_first'
+]
 
 
 def index(request):
     return render(request,"Search/index.html")
 
 
-@ratelimit(key='ip', rate='30/m', method='POST', block=True)
+@profile_request
 def search_path_sse(request):
     """Server-Sent Events endpoint for real-time algorithm visualization"""
     if request.method != 'POST':
         return HttpResponse(status=405)
     
     try:
-        # Parse the JSON data from the request
-        data = json.loads(request.body)
-        
-        # Extract required fields
-        nodes = data.get('nodes', [])
-        edges = data.get('edges', [])
-        source = data.get('source')
-        destination = data.get('destination')
-        algorithm = data.get('algorithm', 'bfs')
-        
-        # Validate node and edge limits for performance and security
-        if len(nodes) > MAX_NODES:
-            return JsonResponse({
-                'error': f'Too many nodes! Maximum allowed is {MAX_NODES} nodes for optimal performance. Please reduce the number of nodes.'
-            }, status=400)
-            
-        if len(edges) > MAX_EDGES:
-            return JsonResponse({
-                'error': f'Too many edges! Maximum allowed is {MAX_EDGES} edges for optimal performance. Please reduce the number of edges.'
-            }, status=400)
-        
-        # Validate required fields
-        if not nodes or not edges or not source or not destination:
-            return JsonResponse({'error': 'Missing required data'}, status=400)
-        
-        # Convert node IDs to labels for validation
-        node_labels = {str(node['id']): node['label'] for node in nodes}
-        source_label = node_labels.get(str(source))
-        destination_label = node_labels.get(str(destination))
+        try:
+            search_request = parse_graph_search(read_json_body(request), MAX_NODES, MAX_EDGES)
+        except RequestError as e:
+            return FastJsonResponse({'error': e.message}, status=e.status)
         
-        if not source_label or not destination_label:
-            return JsonResponse({'error': 'Invalid source or destination'}, status=400)
-        
-        # Prepare graph data for algorithms
-        graph_data = {
-            'nodes': nodes,
-            'edges': edges
-        }
+        graph = search_request.graph
+        source_label = search_request.source_label
+        destination_label = search_request.destination_label
+        algorithm = search_request.algorithm
+        options = search_request.options
+        use_trace = search_request.fields['trace']
         
         # Generate heuristics for informed search algorithms
-        heuristic = {}
-        if algorithm.lower() in ['a_star', 'astar', 'hill_climbing', 'best_first']:
-            # Generate simple heuristic values for demo
-            destination_id = None
-            for node in nodes:
-                if node['label'] == destination_label:
-                    destination_id = node['id']
-                    break
-            
-            if destination_id:
-                for node in nodes:
-                    if node['label'] == destination_label:
-                        heuristic[node['label']] = 0
-                    else:
-                        heuristic[node['label']] = random.uniform(1, 10)
-                
-                if source_label in heuristic:
-                    heuristic[source_label] = max(heuristic[source_label], 2)
+        heuristic = demo_heuristic(search_request, algorithm)
         
         # Store steps for SSE streaming
         steps = []
+        trace_writer = TraceWriter() if use_trace else None
         
-        # Step callback function to collect steps
+        # Step callback function to collect steps; NaN and infinities are handled when encoding
         def step_callback(step_data):
-            # Ensure all numeric values are JSON serializable
-            cleaned_step = {}
-            for key, value in step_data.items():
-                if isinstance(value, float):
-                    # Handle NaN and infinity values
-                    if not (value == value):  # NaN check
-                        cleaned_step[key] = 0
-                    elif value == float('inf'):
-                        cleaned_step[key] = 999999
-                    elif value == float('-inf'):
-                        cleaned_step[key] = -999999
-                    else:
-                        cleaned_step[key] = round(value, 6)  # Limit precision
-                else:
-                    cleaned_step[key] = value
-            steps.append(cleaned_step)
+            if trace_writer:
+                trace_writer.append(step_data)
+            else:
+                steps.append(step_data)
         
         # Solve the graph using the specified algorithm with steps
-        result = solve_graph_with_steps(
-            graph_data=graph_data,
-            source=source_label,
-            destination=destination_label,
-            algorithm=algorithm,
-            heuristic=heuristic,
-            step_callback=step_callback
-        )
-        
-        # Clean the result object for JSON serialization
-        def clean_result_for_json(result_data):
-            cleaned_result = {}
-            for key, value in result_data.items():
-                if isinstance(value, float):
-                    if not (value == value):  # NaN check
-                        cleaned_result[key] = 0
-                    elif value == float('inf'):
-                        cleaned_result[key] = 999999
-                    elif value == float('-inf'):
-                        cleaned_result[key] = -999999
-                    else:
-                        cleaned_result[key] = round(value, 6)
-                else:
-                    cleaned_result[key] = value
-            return cleaned_result
+        def search():
+            search_start = time.perf_counter()
+            result = solve_graph_with_steps(
+                graph_data=graph,
+                source=source_label,
+                destination=destination_label,
+                algorithm=algorithm,
+                heuristic=heuristic,
+                step_callback=step_callback,
+                options=options
+            )
+            search_metrics.record_search(algorithm.lower(), result, time.perf_counter() - search_start)
+            if trace_writer:
+                trace = trace_writer.close()
+                return trace_writer.first_page, result, trace
+            return steps, result, None
         
-        cleaned_result = clean_result_for_json(result)
+        cost = estimate_cost(algorithm, graph.node_count, graph.edge_count, options)
+        key = search_key('trace' if use_trace else 'steps', graph.fingerprint, source_label,
+                         destination_label, algorithm, options)
+        try:
+            (steps, result, trace), shared = run_coalesced_search(request, cost, key, search,
+                                                                  large=bool(search_request.graph_name))
+        except AdmissionRejected as rejection:
+            return admission_rejected(rejection)
         
         # Return steps and result for client-side animation
-        return JsonResponse({
+        response_data = {
             'steps': steps,
-            'result': cleaned_result
-        })
+            'result': result
+        }
+        if trace:
+            response_data['trace'] = trace
+        response = FastJsonResponse(response_data)
+        if shared:
+            response['X-Search-Coalesced'] = '1'
+        return response
         
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
+        return FastJsonResponse({'error': str(e)}, status=500)
+
+
+def goal_label_set(destination_label):
+    """Goal labels as a set, for a single destination or a list of them"""
+    if isinstance(destination_label, list):
+        return set(destination_label)
+    return {destination_label}
+
+
+def demo_heuristic(search_request, algorithm):
+    """
+    Random demo heuristic for informed algorithms: 0 at the goals, 1-10 elsewhere
+    
+    In practice this would be a distance estimate to the goal; the source gets at
+    least 2. Uninformed algorithms and stored graphs get an empty table.
+    """
+    heuristic = {}
+    if algorithm.lower() not in HEURISTIC_ALGORITHMS or search_request.graph_name:
+        return heuristic
+    source_label = search_request.source_label
+    goal_labels = goal_label_set(search_request.destination_label)
+    for label in search_request.graph.labels.values():
+        if label in goal_labels:
+            heuristic[label] = 0
+        else:
+            heuristic[label] = random.uniform(1, 10)
+    if source_label in heuristic:
+        heuristic[source_label] = max(heuristic[source_label], 2)
+    return heuristic
+
 
+def run_coalesced_search(request, cost, key, search, large=False):
+    """
+    Charge the client for a search, then run it under the process capacity cap
+    unless an identical search is already running, in which case wait for that
+    one instead. `large` searches pay from the client's second bucket (see
+    AdmissionController.charge_client). Returns (search result, shared).
+    """
+    def leader():
+        with admission_controller.reserve(cost):
+            return search()
+    
+    with admission_controller.charge(client_key(request), cost, large):
+        try:
+            return search_coalescer.run(key, leader, settings.COALESCE_WAIT_TIMEOUT)
+        except CoalescingTimeout:
+            raise AdmissionRejected(503, 1, 'Server is busy. Please try again shortly.')
+
+
+def admission_rejected(rejection):
+    """Response for requests turned away by admission control (429 per client, 503 when saturated)"""
+    response = FastJsonResponse({
+        'error': rejection.message,
+        'message': rejection.message,
+        'status': 'rate_limited' if rejection.status == 429 else 'overloaded'
+    }, status=rejection.status)
+    response['Retry-After'] = str(rejection.retry_after)
+    return response
 
-def ratelimited(request, exception):
-    """Rate limit exceeded error handler"""
-    return JsonResponse({
-        'error': 'Rate limit exceeded. Please wait before making more requests.',
-        'status': 'rate_limited'
-    }, status=429)
+
+def graph_result_body(result):
+    """Response body and status for a graph search result (404 when no path was found)"""
+    if not result['success']:
+        return {
+            'status': 'error',
+            'message': result['message'],
+            'error': result['error'],
+            'algorithm': result['algorithm']
+        }, 404
+    response_data = {
+        'status': 'success',
+        'message': result['message'],
+        'path': result['path'],
+        'cost': result['cost'],
+        'algorithm': result['algorithm'],
+        'nodes_explored': result.get('nodes_explored', 0)
+    }
+    for key in ('goal_reached', 'stats', 'restart_stats', 'anytime_stats', 'pruning_stats', 'k_shortest',
+                'contraction'):
+        if key in result:
+            response_data[key] = result[key]
+    return response_data, 200
 
 
-@ratelimit(key='ip', rate='30/m', method='POST', block=True)
+@profile_request
 def search_path(request):
     if request.method == 'POST':
         try:
-            # Parse the JSON data from the request
-            data = json.loads(request.body)
-            
-            # Extract required fields
-            nodes = data.get('nodes', [])
-            edges = data.get('edges', [])
-            source = data.get('source')
-            destination = data.get('destination')
-            algorithm = data.get('algorithm', 'bfs')  # Default to BFS
-            
-            # Validate node and edge limits for performance and security
-            if len(nodes) > MAX_NODES:
-                return JsonResponse({
-                    'status': 'error',
-                    'message': f'Too many nodes! Maximum allowed is {MAX_NODES} nodes for optimal performance. Please reduce the number of nodes.'
-                }, status=400)
-                
-            if len(edges) > MAX_EDGES:
-                return JsonResponse({
+            try:
+                search_request = parse_graph_search(read_json_body(request), MAX_NODES, MAX_EDGES)
+            except RequestError as e:
+                return FastJsonResponse({
                     'status': 'error',
-                    'message': f'Too many edges! Maximum allowed is {MAX_EDGES} edges for optimal performance. Please reduce the number of edges.'
-                }, status=400)
-            
-            # Validate required fields
-            if not nodes:
-                return JsonResponse({
-                    'status': 'error', 
-                    'message': 'No nodes provided'
-                }, status=400)
-            
-            if not edges:
-                return JsonResponse({
-                    'status': 'error', 
-                    'message': 'No edges provided'
-                }, status=400)
-            
-            if not source or not destination:
-                return JsonResponse({
-                    'status': 'error', 
-                    'message': 'Source and destination must be specified'
-                }, status=400)
+                    'message': e.message
+                }, status=e.status)
             
-            # Convert node IDs to labels for validation
-            node_labels = {str(node['id']): node['label'] for node in nodes}
-            source_label = node_labels.get(str(source))
-            destination_label = node_labels.get(str(destination))
+            graph = search_request.graph
+            source_label = search_request.source_label
+            destination_label = search_request.destination_label
+            algorithm = search_request.algorithm
+            options = search_request.options
             
-            if not source_label or not destination_label:
-                return JsonResponse({
-                    'status': 'error', 
-                    'message': 'Invalid source or destination node'
-                }, status=400)
-            
-            # Prepare graph data for algorithms
-            graph_data = {
-                'nodes': nodes,
-                'edges': edges
-            }
-            
-            # Optional: Create a simple heuristic (can be enhanced later)
-            heuristic = {}
-            
-            # For A* and Hill Climbing, generate simple heuristics based on node positions or random values
-            if algorithm.lower() in ['a_star', 'astar', 'hill_climbing', 'best_first']:
-                # Generate simple heuristic values (in practice, this would be distance to goal)
-                # For demo purposes, we'll use random values that decrease towards the destination
-                destination_id = None
-                for node in nodes:
-                    if node['label'] == destination_label:
-                        destination_id = node['id']
-                        break
-                
-                if destination_id:
-                    # Create heuristic values - smaller values for nodes closer to destination
-                    for node in nodes:
-                        if node['label'] == destination_label:
-                            heuristic[node['label']] = 0  # Goal has heuristic 0
-                        else:
-                            # Simple random heuristic (in practice, use actual distance)
-                            heuristic[node['label']] = random.uniform(1, 10)
-                    
-                    # Ensure source has a reasonable heuristic
-                    if source_label in heuristic:
-                        heuristic[source_label] = max(heuristic[source_label], 2)
+            # For A* and Hill Climbing, generate simple heuristics
+            heuristic = demo_heuristic(search_request, algorithm)
             
             # Solve the graph using the specified algorithm
-            result = solve_graph(
-                graph_data=graph_data,
-                source=source_label,
-                destination=destination_label,
-                algorithm=algorithm,
-                heuristic=heuristic
-            )
-            
-            # Clean the result object for JSON serialization
-            def clean_result_for_json(result_data):
-                cleaned_result = {}
-                for key, value in result_data.items():
-                    if isinstance(value, float):
-                        if not (value == value):  # NaN check
-                            cleaned_result[key] = 0
-                        elif value == float('inf'):
-                            cleaned_result[key] = 999999
-                        elif value == float('-inf'):
-                            cleaned_result[key] = -999999
-                        else:
-                            cleaned_result[key] = round(value, 6)
-                    else:
-                        cleaned_result[key] = value
-                return cleaned_result
+            def search():
+                search_start = time.perf_counter()
+                result = solve_graph(
+                    graph_data=graph,
+                    source=source_label,
+                    destination=destination_label,
+                    algorithm=algorithm,
+                    heuristic=heuristic,
+                    options=options
+                )
+                search_metrics.record_search(algorithm.lower(), result, time.perf_counter() - search_start)
+                return result
             
-            cleaned_result = clean_result_for_json(result)
+            cost = estimate_cost(algorithm, graph.node_count, graph.edge_count, options)
+            key = search_key('result', graph.fingerprint, source_label, destination_label,
+                             algorithm, options)
+            try:
+                result, shared = run_coalesced_search(request, cost, key, search,
+                                                      large=bool(search_request.graph_name))
+            except AdmissionRejected as rejection:
+                return admission_rejected(rejection)
             
             # Return the result
-            if cleaned_result['success']:
-                return JsonResponse({
-                    'status': 'success',
-                    'message': cleaned_result['message'],
-                    'path': cleaned_result['path'],
-                    'cost': cleaned_result['cost'],
-                    'algorithm': cleaned_result['algorithm'],
-                    'nodes_explored': cleaned_result.get('nodes_explored', 0)
-                })
-            else:
-                return JsonResponse({
-                    'status': 'error',
-                    'message': cleaned_result['message'],
-                    'error': cleaned_result['error'],
-                    'algorithm': cleaned_result['algorithm']
-                }, status=404)
+            response_data, status = graph_result_body(result)
+            response = FastJsonResponse(response_data, status=status)
+            if shared and result['success']:
+                response['X-Search-Coalesced'] = '1'
+            return response
                 
-        except json.JSONDecodeError:
-            return JsonResponse({
-                'status': 'error', 
-                'message': 'Invalid JSON data'
-            }, status=400)
-        except KeyError as e:
-            return JsonResponse({
-                'status': 'error', 
-                'message': f'Missing key: {str(e)}'
-            }, status=400)
         except Exception as e:
-            return JsonResponse({
+            return FastJsonResponse({
                 'status': 'error',
                 'message': f'Internal server error: {str(e)}'
             }, status=500)
     else:
-        return JsonResponse({
+        return FastJsonResponse({
             'status': 'error',
             'message': 'Invalid request method'
         }, status=405)
 
+def _search_etag(search_request):
+    """Strong ETag of a stored graph search: the graph version and the query fix the result"""
+    key = search_key('cached', search_request.graph.fingerprint, search_request.source_label,
+                     search_request.destination_label, search_request.algorithm, search_request.options)
+    return quote_etag(hashlib.sha256(f'{CACHED_RESULT_FORMAT}:{key}'.encode('utf-8')).hexdigest())
+
+
+def _cacheable(response, etag):
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=settings.SEARCH_CACHE_MAX_AGE, immutable=True)
+    patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+    return response
+
+
+def stored_graph_search_latest(request, name):
+    """Redirect a GET search on a stored graph to the URL of its current version"""
+    if request.method not in ('GET', 'HEAD'):
+        return FastJsonResponse({'status': 'error', 'message': 'Invalid request method'}, status=405)
+    try:
+        search_request = parse_stored_graph_query(request.GET, name)
+    except RequestError as e:
+        return FastJsonResponse({'status': 'error', 'message': e.message}, status=e.status)
+    url = reverse('stored_graph_search', args=[name, search_request.graph.fingerprint])
+    response = HttpResponseRedirect(f'{url}?{canonical_query(search_request)}')
+    # Re-importing the graph changes the target, so this answer must be revalidated
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def stored_graph_search(request, name, fingerprint):
+    """
+    Content-addressed GET search on one version of a stored graph
+
+    The graph fingerprint and the query determine the result, so responses are
+    cacheable for SEARCH_CACHE_MAX_AGE and If-None-Match is answered with 304
+    before any search runs.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return FastJsonResponse({'status': 'error', 'message': 'Invalid request method'}, status=405)
+    try:
+        search_request = parse_stored_graph_query(request.GET, name, fingerprint)
+    except RequestError as e:
+        return FastJsonResponse({'status': 'error', 'message': e.message}, status=e.status)
+
+    etag = _search_etag(search_request)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return _cacheable(not_modified, etag)
+
+    graph = search_request.graph
+    algorithm = search_request.algorithm
+    options = search_request.options
+
+    def search():
+        search_start = time.perf_counter()
+        result = solve_graph(graph, search_request.source_label, search_request.destination_label,
+                             algorithm, None, options)
+        search_metrics.record_search(algorithm.lower(), result, time.perf_counter() - search_start)
+        return result
+
+    cost = estimate_cost(algorithm, graph.node_count, graph.edge_count, options)
+    key = search_key('result', graph.fingerprint, search_request.source_label, search_request.destination_label,
+                     algorithm, options)
+    try:
+        result, _ = run_coalesced_search(request, cost, key, search, large=True)
+    except AdmissionRejected as rejection:
+        return admission_rejected(rejection)
+
+    response_data, status = graph_result_body(result)
+    if 'stats' in response_data:
+        # Timings differ from run to run; everything left is fixed by the URL
+        response_data['stats'] = {stat: value for stat, value in response_data['stats'].items()
+                                  if stat not in TIMING_STATS}
+    response_data['graph'] = name
+    response_data['fingerprint'] = graph.fingerprint
+    return _cacheable(FastJsonResponse(response_data, status=status), etag)
+
+
+@profile_request
+def search_grid(request):
+    """Search an implicit grid/maze uploaded in a compact encoding (see grid_problem.py)"""
+    if request.method != 'POST':
+        return FastJsonResponse({
+            'status': 'error',
+            'message': 'Invalid request method'
+        }, status=405)
+    
+    try:
+        try:
+            fields = GRID_SEARCH.parse(read_json_body(request))
+        except RequestError as e:
+            return FastJsonResponse({
+                'status': 'error',
+                'message': e.message
+            }, status=e.status)
+        
+        algorithm = fields['algorithm']
+        options = fields['options']
+        source = fields['source']
+        destination = fields['destination']
+        diagonal = fields['diagonal']
+        include_steps = fields['include_steps']
+        use_trace = fields['trace']
+        
+        try:
+            grid = PackedGrid.decode(fields['encoding'], fields['cells'], fields['width'], fields['height'])
+            problem = GridProblem(grid, (int(source[0]), int(source[1])),
+                                  (int(destination[0]), int(destination[1])), diagonal)
+        except (ValueError, TypeError, IndexError) as e:
+            return FastJsonResponse({
+                'status': 'error',
+                'message': f'Invalid grid: {str(e)}'
+            }, status=400)
+        
+        def search():
+            steps = []
+            trace_writer = TraceWriter() if use_trace else None
+            
+            def step_callback(step_data):
+                if trace_writer:
+                    trace_writer.append(step_data)
+                # Keep the first MAX_GRID_STEPS events so huge grids cannot blow up the response
+                elif len(steps) < MAX_GRID_STEPS:
+                    steps.append(step_data)
+            
+            search_start = time.perf_counter()
+            result = solve_problem(problem, algorithm, step_callback if include_steps or use_trace else None,
+                                   options)
+            search_metrics.record_search(algorithm.lower(), result, time.perf_counter() - search_start)
+            if trace_writer:
+                result['trace'] = trace_writer.close()
+                result['steps'] = trace_writer.first_page
+            elif include_steps:
+                result['steps'] = steps
+            return result
+        
+        # Each move stores up to 4 (or 8) neighbor actions per cell
+        cell_count = grid.width * grid.height
+        cost = estimate_cost(algorithm, cell_count, cell_count * (4 if diagonal else 2), options)
+        fingerprint = hashlib.sha256(bytes(grid.bits)).hexdigest() + f':{grid.width}x{grid.height}:{diagonal}'
+        mode = 'grid_trace' if use_trace else 'grid_steps' if include_steps else 'grid'
+        key = search_key(mode, fingerprint, problem.start, problem.end, algorithm, options)
+        try:
+            result, shared = run_coalesced_search(request, cost, key, search, large=True)
+        except AdmissionRejected as rejection:
+            return admission_rejected(rejection)
+        
+        if not result['success']:
+            return FastJsonResponse({
+                'status': 'error',
+                'message': result['message'],
+                'error': result['error'],
+                'algorithm': result['algorithm']
+            }, status=404)
+        
+        response_data = {
+            'status': 'success',
+            'message': result['message'],
+            'path': result['path'],
+            'cost': round(result['cost'], 6),
+            'algorithm': result['algorithm'],
+            'nodes_explored': result['nodes_explored'],
+            'stats': result['stats'],
+            'grid_memory_bytes': grid.memory_bytes
+        }
+        if use_trace:
+            response_data['trace'] = result['trace']
+        if include_steps or use_trace:
+            response_data['steps'] = result['steps']
+        response = FastJsonResponse(response_data)
+        if shared:
+            response['X-Search-Coalesced'] = '1'
+        return response
+    
+    except Exception as e:
+        return FastJsonResponse({
+            'status': 'error',
+            'message': f'Internal server error: {str(e)}'
+        }, status=500)
+
+
+def trace_steps(request, trace_id):
+    """Page through a stored step trace: ?offset=N or ?cursor=..., plus an optional &limit=N"""
+    if request.method != 'GET':
+        return FastJsonResponse({'error': 'Invalid request method'}, status=405)
+    
+    try:
+        offset = int(request.GET.get('cursor') or request.GET.get('offset') or 0)
+        limit = int(request.GET.get('limit') or settings.TRACE_CHUNK_SIZE)
+    except ValueError:
+        return FastJsonResponse({'error': 'offset, cursor and limit must be integers'}, status=400)
+    if offset < 0 or limit < 1:
+        return FastJsonResponse({'error': 'offset must be >= 0 and limit >= 1'}, status=400)
+    
+    try:
+        page = read_steps(trace_id, offset, min(limit, settings.TRACE_MAX_PAGE))
+    except TraceNotFound as e:
+        return FastJsonResponse({'error': str(e)}, status=404)
+    return FastJsonResponse(page)
+
+
+def metrics(request):
+    """Per-algorithm search metrics in the Prometheus text format"""
+    token = settings.METRICS_AUTH_TOKEN
+    if token:
+        provided = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(provided, f'Bearer {token}'):
+            return HttpResponse(status=401)
+    
+    body = search_metrics.render() + admission_controller.render_metrics() + search_coalescer.render_metrics()
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def profiles(request):
+    """Recently collected search profiles (admins only)"""
+    if not is_profile_admin(request):
+        return FastJsonResponse({'error': 'Forbidden'}, status=403)
+    
+    return FastJsonResponse({'profiles': recent_profiles()})
+
+
 def debug_info(request):
     """Debug view to help diagnose deployment issues"""
     static_info = {
         'STATIC_URL': settings.STATIC_URL,
         'STATIC_ROOT': settings.STATIC_ROOT,
         'STATICFILES_DIRS': settings.STATICFILES_DIRS,
-        'STATICFILES_STORAGE': settings.STATICFILES_STORAGE,
+        'STATICFILES_STORAGE': settings.STORAGES['staticfiles']['BACKEND'],
+        'STATIC_DEBUG': settings.STATIC_DEBUG,
+        'STATIC_BUNDLES': settings.STATIC_BUNDLES,
         'VERCEL_ENV': os.environ.get('VERCEL', 'Not set'),
         'DEBUG': settings.DEBUG,
         'BASE_DIR': str(settings.BASE_DIR),
@@ -344,4 +519,4 @@ def debug_info(request):
         'request_meta': {k: str(v) for k, v in request.META.items() if k.startswith('HTTP_')},
     }
     
-    return JsonResponse(debug_data)
\ No newline at end of file
+    return FastJsonResponse(debug_data)
\ No newline at end of file
@@ -2,6 +2,8 @@
 ASGI config for SearchMethods project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP goes to Django; WebSocket connections to /ws/step/ go to the interactive
+stepping application in Search.stepping.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -13,4 +15,22 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SearchMethods.settings')
 
-application = get_asgi_application()
+# Set up Django before importing anything that touches settings or models
+django_application = get_asgi_application()
+
+from Search.stepping import websocket_application  # noqa: E402
+
+WEBSOCKET_ROUTES = {
+    '/ws/step/': websocket_application,
+}
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        handler = WEBSOCKET_ROUTES.get(scope['path'])
+        if handler is None:
+            await receive()
+            await send({'type': 'websocket.close', 'code': 4004})
+            return
+        return await handler(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -2,10 +2,23 @@
 Custom middleware for handling Vercel deployment issues
 """
 
+import gzip
 import logging
 import re
 import os
 import mimetypes
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+from Search.serialization import MSGPACK_CONTENT_TYPE, FastJsonResponse, msgpack, packb
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
 
 logger = logging.getLogger(__name__)
 
@@ -75,13 +88,220 @@ class VercelHeaderFixMiddleware:
             # Set the correct MIME type based on extension
             if ext in self.extensions:
                 response['Content-Type'] = self.extensions[ext]
-                
-                # For debugging
-                response['X-Content-Type-Override'] = f"Set to {self.extensions[ext]} for {ext}"
             
-            # Remove caching headers for static files during debugging
-            response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-            response['Pragma'] = 'no-cache'
-            response['Expires'] = '0'
+            if settings.STATIC_DEBUG:
+                response['X-Content-Type-Override'] = f"Set to {self.extensions.get(ext)} for {ext}"
+                # Edited files must show up on reload; otherwise WhiteNoise's caching headers
+                # stand (immutable for fingerprinted names)
+                response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+                response['Pragma'] = 'no-cache'
+                response['Expires'] = '0'
         
         return response
+
+
+def _parse_quality_list(header):
+    """Map each token of an Accept or Accept-Encoding header to its q-value"""
+    qualities = {}
+    for item in header.split(','):
+        token, _, params = item.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[token] = quality
+    return qualities
+
+
+class _GzipCodec:
+    name = 'gzip'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def stream_compressor(self):
+        return _GzipStream(self.level)
+
+
+class _GzipStream:
+    def __init__(self, level):
+        # wbits=31 writes a gzip container
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def feed(self, chunk):
+        # A sync flush makes every chunk decodable as soon as it arrives
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliCodec:
+    name = 'br'
+
+    def __init__(self, quality):
+        self.quality = quality
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.quality)
+
+    def stream_compressor(self):
+        return _BrotliStream(self.quality)
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def feed(self, chunk):
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def _compress_stream(codec, chunks):
+    stream = codec.stream_compressor()
+    for chunk in chunks:
+        if chunk:
+            yield stream.feed(chunk)
+    yield stream.finish()
+
+
+async def _compress_async_stream(codec, chunks):
+    stream = codec.stream_compressor()
+    async for chunk in chunks:
+        if chunk:
+            yield stream.feed(chunk)
+    yield stream.finish()
+
+
+# Appended to a strong ETag for each representation other than plain JSON
+MSGPACK_ETAG_SUFFIX = '-msgpack'
+
+
+def _tag_representation(etag, suffix):
+    """Give a quoted ETag a distinct value for another representation of the same content"""
+    if etag and etag.endswith('"'):
+        return etag[:-1] + suffix + '"'
+    return etag
+
+
+class ResponseEncodingMiddleware:
+    """
+    Content negotiation for API responses
+
+    JSON responses are re-encoded as MessagePack when the client prefers
+    `application/msgpack` over JSON in its Accept header, then compressed with
+    brotli (if installed) or gzip according to Accept-Encoding. Streaming
+    responses are compressed chunk by chunk so each chunk can be decoded as soon
+    as it arrives. Clients that send no Accept-Encoding get the body untouched.
+
+    Each representation keeps a strong ETag of its own: "<tag>-msgpack",
+    "<tag>-gzip" and so on. If-None-Match values are stripped back to the view's
+    tags before the view runs, and a 304 repeats the tag the client holds.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_bytes = settings.RESPONSE_COMPRESSION_MIN_BYTES
+        self.codecs = [_GzipCodec(settings.RESPONSE_GZIP_LEVEL)]
+        if brotli is not None:
+            self.codecs.insert(0, _BrotliCodec(settings.RESPONSE_BROTLI_QUALITY))
+
+    def __call__(self, request):
+        client_tags = self._strip_representation_tags(request)
+        response = self.get_response(request)
+        if response.status_code == 304 and client_tags:
+            # Answer with the tag of the representation the client has cached
+            held = client_tags.get(response.get('ETag', '').removeprefix('W/'))
+            if held:
+                response['ETag'] = held
+            return response
+        return self.process_response(request, response)
+
+    def _strip_representation_tags(self, request):
+        """Rewrite If-None-Match to the view's own tags; returns {view tag: client tag}"""
+        header = request.META.get('HTTP_IF_NONE_MATCH')
+        if not header:
+            return {}
+        suffixes = [MSGPACK_ETAG_SUFFIX] + ['-' + codec.name for codec in self.codecs]
+        client_tags = {}
+        for tag in parse_etags(header):
+            base = tag.removeprefix('W/')
+            stripped = True
+            while stripped:
+                stripped = False
+                for suffix in suffixes:
+                    if base.endswith(suffix + '"'):
+                        base = base[:-len(suffix) - 1] + '"'
+                        stripped = True
+            client_tags.setdefault(base, tag)
+        request.META['HTTP_IF_NONE_MATCH'] = ', '.join(client_tags) if client_tags else header
+        return client_tags
+
+    def _negotiate_format(self, request, response):
+        if msgpack is None or not isinstance(response, FastJsonResponse):
+            return
+        accept = _parse_quality_list(request.headers.get('Accept', ''))
+        msgpack_quality = accept.get(MSGPACK_CONTENT_TYPE, 0.0)
+        if msgpack_quality > 0 and msgpack_quality >= accept.get('application/json', 0.0):
+            response.content = packb(response.data)
+            # CommonMiddleware has already set the length of the JSON body
+            response['Content-Length'] = str(len(response.content))
+            response['Content-Type'] = MSGPACK_CONTENT_TYPE
+            if response.has_header('ETag'):
+                response['ETag'] = _tag_representation(response['ETag'], MSGPACK_ETAG_SUFFIX)
+
+    def _choose_codec(self, request):
+        accepted = _parse_quality_list(request.headers.get('Accept-Encoding', ''))
+        best, best_quality = None, 0.0
+        for codec in self.codecs:
+            quality = accepted.get(codec.name, accepted.get('*', 0.0))
+            if quality > best_quality:
+                best, best_quality = codec, quality
+        return best
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith('application/json'):
+            return response
+
+        self._negotiate_format(request, response)
+        patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+
+        codec = self._choose_codec(request)
+        if codec is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _compress_async_stream(codec, response.streaming_content)
+            else:
+                response.streaming_content = _compress_stream(codec, response.streaming_content)
+            del response['Content-Length']
+        else:
+            if len(response.content) < self.min_bytes:
+                return response
+            compressed_content = codec.compress(response.content)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response['Content-Length'] = str(len(compressed_content))
+
+        if response.has_header('ETag'):
+            response['ETag'] = _tag_representation(response['ETag'], '-' + codec.name)
+        response['Content-Encoding'] = codec.name
+        return response
@@ -54,6 +54,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Before anything that reads or rewrites response bodies
+    'SearchMethods.middleware.ResponseEncodingMiddleware',
     'SearchMethods.middleware.VercelHeaderFixMiddleware',  # Custom middleware for Vercel
 ]
 
@@ -158,21 +160,86 @@ if os.getenv('VERCEL'):
     # Set STATIC_ROOT to a temporary directory for Vercel
     STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles_temp')
     # Use standard static files storage
-    STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+    STATIC_FILES_BACKEND = 'django.contrib.staticfiles.storage.StaticFilesStorage'
 else:
     # For local development
     STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
     STATICFILES_DIRS = [
         os.path.join(BASE_DIR, 'static'),
     ]
-    # Use WhiteNoise in development
-    STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+    # WhiteNoise: content-hashed names recorded in staticfiles.json, plus gzip and
+    # (with the Brotli package) brotli copies of every file
+    STATIC_FILES_BACKEND = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+# Django 5.1 reads storage backends from STORAGES only (STATICFILES_STORAGE was removed)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': STATIC_FILES_BACKEND},
+}
 
-# Static files finders
+# Static files finders (BundleFinder builds the minified js/app.js and css/app.css)
 STATICFILES_FINDERS = [
     'django.contrib.staticfiles.finders.FileSystemFinder',
     'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+    'Search.static_build.BundleFinder',
 ]
+STATIC_BUNDLE_DIR = os.path.join(BASE_DIR, 'static_bundles')
+
+# STATIC_DEBUG serves the unbundled source files with no-cache headers, so edits show up
+# on reload. Otherwise pages link the bundles, which collectstatic fingerprints and
+# precompresses and WhiteNoise serves with immutable caching. Vercel serves static/ as is
+# (see vercel.json), so bundles are never linked there.
+STATIC_DEBUG = os.getenv('STATIC_DEBUG', str(DEBUG)) == 'True'
+STATIC_BUNDLES = not STATIC_DEBUG and not os.getenv('VERCEL')
+
+# Optional bearer token required to scrape /metrics/ (open when empty)
+METRICS_AUTH_TOKEN = os.getenv('METRICS_AUTH_TOKEN', '')
+
+# Admission control: cost units a client may spend in a burst and regain per second,
+# total cost allowed to run at once per process, and how many requests may wait for it
+ADMISSION_CLIENT_BURST = float(os.getenv('ADMISSION_CLIENT_BURST', '30'))
+ADMISSION_CLIENT_REFILL_RATE = float(os.getenv('ADMISSION_CLIENT_REFILL_RATE', '0.5'))
+# Searches on stored graphs and grids pay from a second, larger bucket per client
+ADMISSION_LARGE_BURST = float(os.getenv('ADMISSION_LARGE_BURST', '600'))
+ADMISSION_LARGE_REFILL_RATE = float(os.getenv('ADMISSION_LARGE_REFILL_RATE', '10'))
+ADMISSION_MAX_INFLIGHT_COST = float(os.getenv('ADMISSION_MAX_INFLIGHT_COST', '50'))
+ADMISSION_MAX_QUEUE = int(os.getenv('ADMISSION_MAX_QUEUE', '16'))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '2.0'))
+
+# Seconds a request waits for an identical in-flight search before giving up
+COALESCE_WAIT_TIMEOUT = float(os.getenv('COALESCE_WAIT_TIMEOUT', '30'))
+
+# Search request profiling: token that admin tools send as X-Search-Profile-Token,
+# fraction of all search requests profiled in the background, and report size
+SEARCH_PROFILE_TOKEN = os.getenv('SEARCH_PROFILE_TOKEN', '')
+SEARCH_PROFILE_SAMPLE_RATE = float(os.getenv('SEARCH_PROFILE_SAMPLE_RATE', '0'))
+SEARCH_PROFILE_TOP_N = int(os.getenv('SEARCH_PROFILE_TOP_N', '20'))
+
+# Step traces for paginated replay: cache holding the compressed chunks, steps per
+# chunk, seconds before an unread trace is evicted, and the largest page served
+TRACE_CACHE_ALIAS = os.getenv('TRACE_CACHE_ALIAS', 'default')
+TRACE_CHUNK_SIZE = int(os.getenv('TRACE_CHUNK_SIZE', '500'))
+TRACE_TTL = int(os.getenv('TRACE_TTL', '600'))
+TRACE_MAX_PAGE = int(os.getenv('TRACE_MAX_PAGE', '2000'))
+
+# Interactive stepping over WebSocket (/ws/step/): idle connections are closed after
+# STEPPING_IDLE_TIMEOUT seconds, and each suspended search buffers at most
+# STEPPING_MAX_BUFFER unsent steps
+STEPPING_IDLE_TIMEOUT = float(os.getenv('STEPPING_IDLE_TIMEOUT', '60'))
+STEPPING_MAX_SESSIONS = int(os.getenv('STEPPING_MAX_SESSIONS', '100'))
+STEPPING_MAX_BUFFER = int(os.getenv('STEPPING_MAX_BUFFER', '1000'))
+STEPPING_MAX_ADVANCE = int(os.getenv('STEPPING_MAX_ADVANCE', '10000'))
+
+# Negotiated compression of JSON/MessagePack responses: bodies smaller than
+# RESPONSE_COMPRESSION_MIN_BYTES are sent as is; brotli is used when installed
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+RESPONSE_GZIP_LEVEL = int(os.getenv('RESPONSE_GZIP_LEVEL', '6'))
+RESPONSE_BROTLI_QUALITY = int(os.getenv('RESPONSE_BROTLI_QUALITY', '5'))
+
+# Graphs imported with `manage.py import_graph` and searched by name
+GRAPH_STORE_DIR = os.getenv('GRAPH_STORE_DIR', str(BASE_DIR / 'graph_store'))
+# Lifetime of GET /graphs/<name>/<fingerprint>/search/ responses (immutable: one year)
+SEARCH_CACHE_MAX_AGE = int(os.getenv('SEARCH_CACHE_MAX_AGE', str(365 * 24 * 3600)))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
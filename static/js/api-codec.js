@@ -0,0 +1,89 @@
+// API Codec Module
+// Decodes API response bodies (MessagePack or JSON). It has no DOM dependencies,
+// so the trace worker (trace-worker.js) loads it with importScripts too
+
+// Search responses may come back as MessagePack (smaller and cheaper to produce for big
+// traces); gzip/brotli are negotiated by the browser and decoded transparently
+const SEARCH_ACCEPT = 'application/msgpack, application/json;q=0.9';
+
+const textDecoder = new TextDecoder();
+
+function decodeMessagePack(buffer) {
+    const view = new DataView(buffer);
+    const bytes = new Uint8Array(buffer);
+    let offset = 0;
+
+    function readString(length) {
+        const value = textDecoder.decode(bytes.subarray(offset, offset + length));
+        offset += length;
+        return value;
+    }
+
+    function readArray(length) {
+        const array = new Array(length);
+        for (let i = 0; i < length; i++) {
+            array[i] = readValue();
+        }
+        return array;
+    }
+
+    function readMap(length) {
+        const map = {};
+        for (let i = 0; i < length; i++) {
+            const key = readValue();
+            map[key] = readValue();
+        }
+        return map;
+    }
+
+    function readValue() {
+        const type = bytes[offset++];
+        if (type <= 0x7f) return type;
+        if (type <= 0x8f) return readMap(type & 0x0f);
+        if (type <= 0x9f) return readArray(type & 0x0f);
+        if (type <= 0xbf) return readString(type & 0x1f);
+        if (type >= 0xe0) return type - 0x100;
+
+        let value;
+        switch (type) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            case 0xc4: value = bytes.slice(offset + 1, offset + 1 + view.getUint8(offset)); offset += 1 + value.length; return value;
+            case 0xc5: value = bytes.slice(offset + 2, offset + 2 + view.getUint16(offset)); offset += 2 + value.length; return value;
+            case 0xc6: value = bytes.slice(offset + 4, offset + 4 + view.getUint32(offset)); offset += 4 + value.length; return value;
+            case 0xca: value = view.getFloat32(offset); offset += 4; return value;
+            case 0xcb: value = view.getFloat64(offset); offset += 8; return value;
+            case 0xcc: value = view.getUint8(offset); offset += 1; return value;
+            case 0xcd: value = view.getUint16(offset); offset += 2; return value;
+            case 0xce: value = view.getUint32(offset); offset += 4; return value;
+            case 0xcf: value = Number(view.getBigUint64(offset)); offset += 8; return value;
+            case 0xd0: value = view.getInt8(offset); offset += 1; return value;
+            case 0xd1: value = view.getInt16(offset); offset += 2; return value;
+            case 0xd2: value = view.getInt32(offset); offset += 4; return value;
+            case 0xd3: value = Number(view.getBigInt64(offset)); offset += 8; return value;
+            case 0xd9: value = view.getUint8(offset); offset += 1; return readString(value);
+            case 0xda: value = view.getUint16(offset); offset += 2; return readString(value);
+            case 0xdb: value = view.getUint32(offset); offset += 4; return readString(value);
+            case 0xdc: value = view.getUint16(offset); offset += 2; return readArray(value);
+            case 0xdd: value = view.getUint32(offset); offset += 4; return readArray(value);
+            case 0xde: value = view.getUint16(offset); offset += 2; return readMap(value);
+            case 0xdf: value = view.getUint32(offset); offset += 4; return readMap(value);
+        }
+        throw new Error(`Unsupported MessagePack type 0x${type.toString(16)}`);
+    }
+
+    return readValue();
+}
+
+// Decode a response body according to its Content-Type (MessagePack or JSON)
+function decodeApiBody(contentType, buffer, status) {
+    if (contentType.includes('application/msgpack')) {
+        return decodeMessagePack(buffer);
+    }
+    try {
+        return JSON.parse(textDecoder.decode(buffer));
+    } catch (parseError) {
+        throw new Error(`Invalid JSON response (status ${status}): ${parseError.message}`);
+    }
+}
@@ -0,0 +1,253 @@
+// Step Replay Module
+// Plays a search trace back on the graph. Playback is paced with requestAnimationFrame:
+// all the steps due in a frame are applied inside one style batch (one vis.js DataSet
+// update, see visualization.js) and one step list update (see ui-manager.js).
+// Trace pages are fetched and decoded by a Web Worker (trace-worker.js) when the
+// browser allows it, so decoding never holds up a frame.
+
+// Steps left in the buffer when the next trace page is requested
+const TRACE_PREFETCH_AHEAD = 100;
+// Time a frame may spend applying steps; the rest of the frame is left for rendering
+const REPLAY_FRAME_BUDGET_MS = 8;
+// Longest gap between frames counted towards the speed, so a backgrounded tab does not burst on return
+const REPLAY_MAX_FRAME_GAP_MS = 250;
+// Steps per second when the page has no speed selector (the original 800 ms per step)
+const DEFAULT_REPLAY_SPEED = 1.25;
+
+// Stops the replay in progress, if any
+let stopActiveReplay = null;
+
+function stopReplay() {
+    if (stopActiveReplay) {
+        stopActiveReplay();
+        stopActiveReplay = null;
+    }
+}
+
+function replaySpeed() {
+    // Steps per second from the speed selector; "instant" plays as many steps as fit in each frame
+    const select = document.getElementById("replaySpeed");
+    if (!select) {
+        return DEFAULT_REPLAY_SPEED;
+    }
+    return select.value === 'instant' ? Infinity : (parseFloat(select.value) || DEFAULT_REPLAY_SPEED);
+}
+
+function traceStepsUrl(traceId, offset, limit) {
+    return `/traces/${traceId}/?offset=${offset}&limit=${limit}`;
+}
+
+function fetchTraceSteps(traceId, offset, limit) {
+    return fetch(traceStepsUrl(traceId, offset, limit), {headers: {'Accept': SEARCH_ACCEPT}})
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`Could not load steps ${offset}+ of the trace (status ${response.status})`);
+            }
+            return readApiResponse(response);
+        });
+}
+
+// The trace worker: undefined until first used, null when the browser cannot run it
+let traceWorker;
+const traceRequests = new Map();
+let nextTraceRequest = 0;
+
+function getTraceWorker() {
+    if (traceWorker !== undefined) {
+        return traceWorker;
+    }
+    traceWorker = null;
+    const workerUrl = document.body.dataset.traceWorker;
+    const codecUrl = document.body.dataset.apiCodec;
+    if (!window.Worker || !workerUrl || !codecUrl) {
+        return null;
+    }
+    try {
+        traceWorker = new Worker(workerUrl);
+    } catch (error) {
+        console.warn('Trace worker unavailable, decoding on the main thread:', error);
+        return null;
+    }
+    traceWorker.onmessage = event => {
+        const { id, page, error } = event.data;
+        const request = traceRequests.get(id);
+        if (request) {
+            traceRequests.delete(id);
+            if (error) {
+                request.reject(new Error(error));
+            } else {
+                request.resolve(page);
+            }
+        }
+    };
+    traceWorker.onerror = event => {
+        // The worker could not start (or load the codec): load this and later pages here instead
+        console.warn('Trace worker failed, decoding on the main thread:', event.message);
+        traceWorker.terminate();
+        traceWorker = null;
+        traceRequests.forEach(request => request.resolve(request.fallback()));
+        traceRequests.clear();
+    };
+    traceWorker.postMessage({ type: 'init', codecUrl: new URL(codecUrl, location.href).href });
+    return traceWorker;
+}
+
+function loadTracePage(traceId, offset, limit) {
+    const worker = getTraceWorker();
+    if (!worker) {
+        return fetchTraceSteps(traceId, offset, limit);
+    }
+    return new Promise((resolve, reject) => {
+        const id = nextTraceRequest++;
+        traceRequests.set(id, { resolve, reject, fallback: () => fetchTraceSteps(traceId, offset, limit) });
+        worker.postMessage({
+            type: 'page',
+            id,
+            url: new URL(traceStepsUrl(traceId, offset, limit), location.href).href,
+            offset,
+            accept: SEARCH_ACCEPT,
+        });
+    });
+}
+
+function animateAlgorithmSteps(steps, finalResult, findPathButton, originalText, trace) {
+    stopReplay();
+
+    let currentStep = 0;
+    const totalSteps = trace ? trace.total_steps : steps.length;
+
+    // Steps by index; played steps are dropped so only the pages around playback stay in memory
+    const buffered = new Map(steps.map((step, index) => [index, step]));
+    let bufferedEnd = steps.length;
+    let pendingPage = null;
+
+    function loadPage(offset) {
+        if (!pendingPage) {
+            pendingPage = loadTracePage(trace.trace_id, offset, trace.chunk_size)
+                .then(page => {
+                    page.steps.forEach((step, index) => buffered.set(page.offset + index, step));
+                    bufferedEnd = Math.max(bufferedEnd, page.offset + page.steps.length);
+                })
+                .finally(() => {
+                    pendingPage = null;
+                });
+        }
+        return pendingPage;
+    }
+
+    // Show the legend during visualization
+    let legend = document.getElementById("visualizationLegend");
+    if (legend) {
+        legend.style.display = 'block';
+    }
+
+    // Steps owed by the speed setting but not yet applied; the first one plays straight away
+    let stepCredit = 1;
+    let lastFrameTime = null;
+    let frameRequest = null;
+    let stopped = false;
+
+    stopActiveReplay = () => {
+        stopped = true;
+        if (frameRequest !== null) {
+            cancelAnimationFrame(frameRequest);
+        }
+    };
+
+    function nextFrame() {
+        frameRequest = requestAnimationFrame(playFrame);
+    }
+
+    function finish() {
+        stopActiveReplay = null;
+        // Animation complete, show final result (clearing the replay's colors and drawing the path in one update)
+        beginStyleBatch();
+        try {
+            if (finalResult.success) {
+                displaySearchResult(finalResult);
+            } else {
+                displayError(finalResult.message);
+            }
+        } finally {
+            endStyleBatch();
+        }
+        resetButton(findPathButton, originalText);
+    }
+
+    function playFrame(now) {
+        frameRequest = null;
+        if (stopped) {
+            return;
+        }
+
+        const speed = replaySpeed();
+        if (speed !== Infinity) {
+            const elapsed = lastFrameTime === null ? 0 : Math.min(now - lastFrameTime, REPLAY_MAX_FRAME_GAP_MS);
+            stepCredit = Math.min(stepCredit + elapsed * speed / 1000, 1 + speed * REPLAY_MAX_FRAME_GAP_MS / 1000);
+        }
+        lastFrameTime = now;
+
+        const due = speed === Infinity ? Infinity : Math.floor(stepCredit);
+        const frameStart = performance.now();
+        let applied = 0;
+        let waiting = false;
+        beginStyleBatch();
+        beginStepInfoBatch();
+        try {
+            while (applied < due && currentStep < totalSteps) {
+                if (!buffered.has(currentStep)) {
+                    // Playback caught up with the download
+                    waiting = true;
+                    break;
+                }
+                const step = buffered.get(currentStep);
+                buffered.delete(currentStep);
+                handleAlgorithmStep(step);
+                currentStep++;
+                applied++;
+                if (performance.now() - frameStart > REPLAY_FRAME_BUDGET_MS) {
+                    break;
+                }
+            }
+        } finally {
+            endStepInfoBatch();
+            endStyleBatch();
+        }
+        stepCredit = speed === Infinity ? 0 : stepCredit - applied;
+
+        if (trace && bufferedEnd < totalSteps) {
+            // Instant playback goes through a page in a few frames, so it asks for the next one a page ahead
+            const prefetchAhead = speed === Infinity ? trace.chunk_size : TRACE_PREFETCH_AHEAD;
+            if (bufferedEnd - currentStep <= prefetchAhead) {
+                // Prefetch errors are retried when playback reaches the missing step
+                loadPage(bufferedEnd).catch(() => {});
+            }
+        }
+
+        if (currentStep >= totalSteps) {
+            finish();
+        } else if (waiting) {
+            // Wait for the page, then continue without counting the wait towards the speed
+            loadPage(currentStep)
+                .then(() => {
+                    lastFrameTime = null;
+                    stepCredit = Math.max(stepCredit, 1);
+                    if (!stopped) {
+                        nextFrame();
+                    }
+                })
+                .catch(error => {
+                    if (!stopped) {
+                        stopActiveReplay = null;
+                        displayError(error.message);
+                        resetButton(findPathButton, originalText);
+                    }
+                });
+        } else {
+            nextFrame();
+        }
+    }
+
+    // Start the animation
+    nextFrame();
+}
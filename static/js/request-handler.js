@@ -37,7 +37,8 @@ function sendDataToDjango() {
     findPathButton.textContent = "Searching...";
     findPathButton.disabled = true;
     
-    // Clear previous results and step info
+    // Stop any replay still running, then clear previous results and step info
+    stopReplay();
     clearHighlights();
     clearStepInfo();
     
@@ -52,41 +53,29 @@ function sendDataToDjango() {
     }
 }
 
+// Decode a response body (see api-codec.js)
+function readApiResponse(response) {
+    const contentType = response.headers.get('Content-Type') || '';
+    return response.arrayBuffer().then(buffer => decodeApiBody(contentType, buffer, response.status));
+}
+
 function startSSEVisualization(graphData, csrftoken, findPathButton, originalText) {
-    // Send the graph data to get all steps at once
+    // Ask for a server-side trace: the first page arrives now, the rest is fetched during playback
     fetch('/search_sse/', {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
+            'Accept': SEARCH_ACCEPT,
             'X-CSRFToken': csrftoken,
         },
-        body: JSON.stringify(graphData),
+        body: JSON.stringify({...graphData, trace: true}),
     })
     .then(response => {
-        console.log('Response status:', response.status);
-        console.log('Response headers:', response.headers);
-        
-        if (!response.ok) {
-            return response.text().then(errorText => {
-                console.error('Error response text:', errorText);
-                try {
-                    const errorData = JSON.parse(errorText);
-                    throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
-                } catch (parseError) {
-                    throw new Error(`HTTP error! status: ${response.status}. Response: ${errorText}`);
-                }
-            });
-        }
-        
-        return response.text().then(text => {
-            console.log('Raw response text:', text);
-            try {
-                return JSON.parse(text);
-            } catch (parseError) {
-                console.error('JSON parse error:', parseError);
-                console.error('Failed to parse:', text);
-                throw new Error(`Invalid JSON response: ${parseError.message}`);
+        return readApiResponse(response).then(data => {
+            if (!response.ok) {
+                throw new Error(data.error || data.message || `HTTP error! status: ${response.status}`);
             }
+            return data;
         });
     })
     .then(data => {
@@ -99,7 +88,7 @@ function startSSEVisualization(graphData, csrftoken, findPathButton, originalTex
         }
         
         // Animate the steps
-        animateAlgorithmSteps(data.steps, data.result, findPathButton, originalText);
+        animateAlgorithmSteps(data.steps, data.result, findPathButton, originalText, data.trace);
     })
     .catch(error => {
         console.error('Error in visualization:', error);
@@ -119,39 +108,6 @@ function startSSEVisualization(graphData, csrftoken, findPathButton, originalTex
     });
 }
 
-function animateAlgorithmSteps(steps, finalResult, findPathButton, originalText) {
-    let currentStep = 0;
-    
-    // Show the legend during visualization
-    let legend = document.getElementById("visualizationLegend");
-    if (legend) {
-        legend.style.display = 'block';
-    }
-    
-    function playNextStep() {
-        if (currentStep >= steps.length) {
-            // Animation complete, show final result
-            if (finalResult.success) {
-                displaySearchResult(finalResult);
-            } else {
-                displayError(finalResult.message);
-            }
-            resetButton(findPathButton, originalText);
-            return;
-        }
-        
-        const step = steps[currentStep];
-        handleAlgorithmStep(step);
-        currentStep++;
-        
-        // Continue to next step after delay
-        setTimeout(playNextStep, 800); // 800ms delay between steps
-    }
-    
-    // Start the animation
-    playNextStep();
-}
-
 function startRegularSearch(graphData, csrftoken, findPathButton, originalText) {
     // Hide legend for instant results
     let legend = document.getElementById("visualizationLegend");
@@ -163,17 +119,18 @@ function startRegularSearch(graphData, csrftoken, findPathButton, originalText)
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
+            'Accept': SEARCH_ACCEPT,
             'X-CSRFToken': csrftoken,
         },
         body: JSON.stringify(graphData),
     })
     .then(response => {
-        if (!response.ok) {
-            return response.json().then(errorData => {
-                throw new Error(errorData.message || `HTTP error! status: ${response.status}`);
-            });
-        }
-        return response.json();
+        return readApiResponse(response).then(data => {
+            if (!response.ok) {
+                throw new Error(data.message || `HTTP error! status: ${response.status}`);
+            }
+            return data;
+        });
     })
     .then(responseData => {
         console.log('Response from Django:', responseData);
@@ -204,8 +161,6 @@ function resetButton(button, originalText) {
 }
 
 function handleAlgorithmStep(stepData) {
-    console.log('Algorithm step:', stepData);
-    
     switch (stepData.type) {
         case 'start':
             displayStepInfo(`🚀 Starting ${stepData.algorithm} from ${stepData.source} to ${stepData.destination}`);
@@ -222,7 +177,35 @@ function handleAlgorithmStep(stepData) {
             let costInfo = stepData.cost ? ` (Cost: ${stepData.cost.toFixed(2)})` : '';
             displayStepInfo(`➕ Step ${stepData.step}: Added "${stepData.node}" to frontier from "${stepData.parent}"${costInfo}`);
             break;
-            
+
+        case 'improved_solution':
+            highlightFinalPath(stepData.path);
+            displayStepInfo(`✨ Step ${stepData.step}: Improved path, cost ${stepData.cost.toFixed(2)} (weight ${stepData.weight.toFixed(2)}, within ${stepData.bound.toFixed(2)}× optimal)`);
+            break;
+
+        case 'frontier_batch':
+            stepData.nodes.forEach(entry => highlightNodeInFrontier(entry.node));
+            displayStepInfo(`➕ Step ${stepData.step}: Added ${stepData.nodes.map(entry => `"${entry.node}"`).join(', ')} to frontier from "${stepData.parent}"`);
+            break;
+
+        case 'candidate_path':
+            displayStepInfo(`🧭 Step ${stepData.step}: Candidate path via spur "${stepData.spur_node}": ${stepData.path.join(' → ')} (Cost: ${stepData.cost.toFixed(2)})`);
+            break;
+
+        case 'path_found':
+            highlightFinalPath(stepData.path);
+            displayStepInfo(`🏁 Path #${stepData.rank}: ${stepData.path.join(' → ')} (Cost: ${stepData.cost.toFixed(2)})`);
+            break;
+
+        case 'pruned':
+            displayStepInfo(`✂️ Step ${stepData.step}: Pruned "${stepData.node}" (${stepData.reason})`);
+            break;
+
+        case 'jump_point':
+            highlightNodeInFrontier(stepData.node);
+            displayStepInfo(`🦘 Step ${stepData.step}: Jumped from "${stepData.parent}" to jump point "${stepData.node}" (g: ${stepData.g_cost.toFixed(2)})`);
+            break;
+
         case 'found':
             highlightNodeFound(stepData.node);
             displayStepInfo(`🎯 Step ${stepData.step}: Found goal "${stepData.node}"!`);
@@ -0,0 +1,27 @@
+// Trace Worker
+// Fetches and decodes trace pages off the main thread for the step replay (replay.js).
+// Messages in:  {type: 'init', codecUrl}  loads api-codec.js
+//               {type: 'page', id, url, offset, accept}
+// Messages out: {id, page} or {id, error}
+
+self.onmessage = event => {
+    const message = event.data;
+
+    if (message.type === 'init') {
+        importScripts(message.codecUrl);
+        return;
+    }
+
+    if (message.type === 'page') {
+        fetch(message.url, {headers: {'Accept': message.accept}, credentials: 'same-origin'})
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`Could not load steps ${message.offset}+ of the trace (status ${response.status})`);
+                }
+                const contentType = response.headers.get('Content-Type') || '';
+                return response.arrayBuffer().then(buffer => decodeApiBody(contentType, buffer, response.status));
+            })
+            .then(page => self.postMessage({ id: message.id, page }))
+            .catch(error => self.postMessage({ id: message.id, error: error.message }));
+    }
+};
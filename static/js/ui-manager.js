@@ -18,11 +18,25 @@ function updateAlgorithmExplanation() {
         
         dijkstra: "<strong>Dijkstra's Algorithm:</strong> Finds the shortest path in weighted graphs with non-negative weights. Uses a priority queue to always explore the node with the smallest distance first. Guarantees optimal solution. Time complexity: O((V + E) log V).",
         
+        k_shortest: "<strong>K-Shortest Paths (Yen):</strong> Finds the K cheapest paths that never revisit a node (3 by default), cheapest first. Each new path branches off an earlier one at a spur node and avoids the edges the earlier paths took from that point, so you get real alternatives to the shortest path.",
+        
         a_star: "<strong>A* Search:</strong> Combines the benefits of Dijkstra's algorithm and Best-First Search using f(n) = g(n) + h(n). Guarantees optimal solution if heuristic is admissible. More efficient than Dijkstra's when good heuristics are available. Time complexity: O(b^d) where b is branching factor and d is depth.",
         
+        anytime_a_star: "<strong>Anytime A* (ARA*):</strong> Starts with an inflated heuristic weight to find a path quickly, then lowers the weight and repairs the search to improve the path until the time budget runs out. Every solution comes with a bound on how far its cost can be from the optimal one.",
+        
         best_first: "<strong>Best-First Search:</strong> Uses a heuristic function to guide the search toward the goal. Explores nodes that appear most promising first. May not find the optimal path but can be faster than uninformed searches. Time complexity varies based on heuristic.",
         
-        hill_climbing: "<strong>Hill Climbing:</strong> Local search algorithm that moves to the best neighboring state. Terminates when no better neighbor exists (local optimum). Fast but may get stuck in local optima. Does not guarantee optimal or complete solution. Time complexity: O(∞) in worst case."
+        beam: "<strong>Beam Search:</strong> Expands the search one layer at a time and keeps only the few most promising nodes (the beam width, 3 by default), pruning the rest. Memory stays fixed no matter how wide the graph is, but the path may not be optimal and a path can be missed entirely.",
+        
+        bounded_best_first: "<strong>Bounded Best-First Search:</strong> Best-First Search whose frontier is capped (10 nodes by default). When the frontier is full, the least promising node is evicted, so memory stays bounded while the search still follows the heuristic.",
+        
+        hill_climbing: "<strong>Hill Climbing:</strong> Local search algorithm that moves to the best neighboring state. Terminates when no better neighbor exists (local optimum). Fast but may get stuck in local optima. Does not guarantee optimal or complete solution. Time complexity: O(∞) in worst case.",
+        
+        stochastic_hill_climbing: "<strong>Stochastic Hill Climbing:</strong> Like Hill Climbing, but picks randomly among the improving neighbors, favouring steeper moves. The randomness lets repeated runs explore different routes. Time complexity: O(max_steps × b).",
+        
+        first_choice_hill_climbing: "<strong>First-Choice Hill Climbing:</strong> Examines neighbors in random order and moves to the first one that improves the heuristic. Useful when nodes have many neighbors. Time complexity: O(max_steps × b).",
+        
+        random_restart_hill_climbing: "<strong>Random-Restart Hill Climbing:</strong> Runs many independent stochastic climbs in parallel with different random seeds and keeps the best one. Stops as soon as any climb reaches the goal, so it escapes local optima far more often than a single climb."
     };
     
     descriptionElement.innerHTML = explanations[selectedAlgorithm] || explanations.bfs;
@@ -34,7 +48,35 @@ document.addEventListener('DOMContentLoaded', function() {
     setTimeout(updateAlgorithmExplanation, 200);
 });
 
+// Messages shown in the step list; older ones are dropped so long traces stay cheap to render
+const STEP_INFO_LIMIT = 1000;
+
+// While a replay frame is being applied, messages are collected here and added in one DOM update
+let pendingStepMessages = null;
+
+function beginStepInfoBatch() {
+    if (!pendingStepMessages) {
+        pendingStepMessages = [];
+    }
+}
+
+function endStepInfoBatch() {
+    const messages = pendingStepMessages;
+    pendingStepMessages = null;
+    if (messages && messages.length) {
+        appendStepMessages(messages);
+    }
+}
+
 function displayStepInfo(message) {
+    if (pendingStepMessages) {
+        pendingStepMessages.push(message);
+    } else {
+        appendStepMessages([message]);
+    }
+}
+
+function appendStepMessages(messages) {
     let stepInfoDiv = document.getElementById("stepInfo");
     if (!stepInfoDiv) {
         stepInfoDiv = document.createElement("div");
@@ -49,21 +91,28 @@ function displayStepInfo(message) {
         stepInfoDiv.appendChild(headerElement);
     }
     
-    // Create a new message element
-    const messageElement = document.createElement("p");
-    messageElement.innerHTML = `${message}`;
-    
     // Add timestamp for better tracking
     const timestamp = new Date().toLocaleTimeString();
-    messageElement.innerHTML += ` <span class="timestamp">[${timestamp}]</span>`;
     
-    // Append the new message to existing content
-    stepInfoDiv.appendChild(messageElement);
+    // Build the new message elements off-document, then append them together
+    const fragment = document.createDocumentFragment();
+    messages.slice(-STEP_INFO_LIMIT).forEach(message => {
+        const messageElement = document.createElement("p");
+        messageElement.innerHTML = `${message} <span class="timestamp">[${timestamp}]</span>`;
+        fragment.appendChild(messageElement);
+    });
+    stepInfoDiv.appendChild(fragment);
+    
+    const shownMessages = stepInfoDiv.getElementsByTagName('p');
+    while (shownMessages.length > STEP_INFO_LIMIT) {
+        shownMessages[0].remove();
+    }
     
     // Update step counter in header
-    const stepCount = stepInfoDiv.querySelectorAll('p').length;
     const header = stepInfoDiv.querySelector('.step-info-header');
     if (header) {
+        const stepCount = Number(header.dataset.stepCount || 0) + messages.length;
+        header.dataset.stepCount = stepCount;
         header.innerHTML = `<strong>Algorithm Steps (${stepCount}):</strong>`;
     }
     
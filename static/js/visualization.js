@@ -284,22 +284,102 @@ function updateDropdowns() {
     });
 }
 
+// Node and edge style changes are queued and sent to vis.js as one DataSet.update per
+// DataSet: immediately, or at the end of a batch (the replay applies each animation
+// frame's steps inside one, see replay.js). Changes to the same item are merged.
+let styleBatchDepth = 0;
+const pendingNodeStyles = new Map();
+const pendingEdgeStyles = new Map();
+
+// Nodes currently drawn as exploring, so marking them explored does not scan every node
+const exploringNodeIds = new Set();
+
+// Lookups rebuilt after nodes or edges are added or removed
+let nodeIdsByLabel = null;
+let edgeIdsByEndpoints = null;
+nodes.on('add', () => { nodeIdsByLabel = null; });
+nodes.on('remove', () => { nodeIdsByLabel = null; });
+edges.on('add', () => { edgeIdsByEndpoints = null; });
+edges.on('remove', () => { edgeIdsByEndpoints = null; });
+
+const EXPLORING_COLOR = { background: '#ffeb3b', border: '#f57f17' };
+const EXPLORED_COLOR = { background: '#f44336', border: '#c62828' };
+const PATH_NODE_COLOR = { background: '#90EE90', border: '#228B22' };
+const PATH_EDGE_COLOR = { color: '#228B22' };
+
+function beginStyleBatch() {
+    styleBatchDepth++;
+}
+
+function endStyleBatch() {
+    if (styleBatchDepth > 0 && --styleBatchDepth === 0) {
+        flushStyles();
+    }
+}
+
+function flushStyles() {
+    if (pendingNodeStyles.size) {
+        nodes.update(Array.from(pendingNodeStyles.values()));
+        pendingNodeStyles.clear();
+    }
+    if (pendingEdgeStyles.size) {
+        edges.update(Array.from(pendingEdgeStyles.values()));
+        pendingEdgeStyles.clear();
+    }
+}
+
+function queueStyle(pending, id, style) {
+    const queued = pending.get(id);
+    if (queued) {
+        Object.assign(queued, style);
+    } else {
+        pending.set(id, { id, ...style });
+    }
+    if (styleBatchDepth === 0) {
+        flushStyles();
+    }
+}
+
+function nodeIdForLabel(label) {
+    if (!nodeIdsByLabel) {
+        nodeIdsByLabel = new Map();
+        nodes.forEach(node => nodeIdsByLabel.set(node.label, node.id));
+    }
+    return nodeIdsByLabel.get(label);
+}
+
+function edgeIdBetween(fromId, toId) {
+    if (!edgeIdsByEndpoints) {
+        edgeIdsByEndpoints = new Map();
+        edges.forEach(edge => {
+            // The first edge found between two nodes wins, in either direction
+            [[edge.from, edge.to], [edge.to, edge.from]].forEach(([a, b]) => {
+                if (!edgeIdsByEndpoints.has(a)) {
+                    edgeIdsByEndpoints.set(a, new Map());
+                }
+                if (!edgeIdsByEndpoints.get(a).has(b)) {
+                    edgeIdsByEndpoints.get(a).set(b, edge.id);
+                }
+            });
+        });
+    }
+    const neighbors = edgeIdsByEndpoints.get(fromId);
+    return neighbors ? neighbors.get(toId) : undefined;
+}
+
 function highlightNodeExploring(nodeLabel) {
     // First, mark previous exploring nodes as explored (red)
     markPreviousExploredNodes();
     // Then highlight current node as exploring (yellow)
-    updateNodeColor(nodeLabel, '#ffeb3b', '#f57f17'); // Yellow - currently exploring
+    updateNodeColor(nodeLabel, EXPLORING_COLOR.background, EXPLORING_COLOR.border);
 }
 
 function markPreviousExploredNodes() {
     // Mark all currently yellow nodes as red (explored but not in final path)
-    let updatedNodes = nodes.get().map(node => {
-        if (node.color && node.color.background === '#ffeb3b') {
-            return { ...node, color: { background: '#f44336', border: '#c62828' } }; // Red - explored/rejected
-        }
-        return node;
-    });
-    nodes.update(updatedNodes);
+    beginStyleBatch();
+    exploringNodeIds.forEach(nodeId => queueStyle(pendingNodeStyles, nodeId, { color: { ...EXPLORED_COLOR } }));
+    exploringNodeIds.clear();
+    endStyleBatch();
 }
 
 function highlightNodeInFrontier(nodeLabel) {
@@ -310,133 +390,61 @@ function highlightNodeFound(nodeLabel) {
     updateNodeColor(nodeLabel, '#4caf50', '#1b5e20'); // Green - goal found
 }
 
-function highlightFinalPath(path) {
-    // Clear all previous colors but preserve step info
-    clearVisualHighlights();
-    
-    // Get node labels to ID mapping
-    let nodeMap = {};
-    nodes.forEach(node => {
-        nodeMap[node.label] = node.id;
-    });
-    
-    // Highlight path nodes in green
-    let pathNodeIds = path.map(label => nodeMap[label]).filter(id => id !== undefined);
-    
-    let updatedNodes = nodes.get().map(node => {
-        if (pathNodeIds.includes(node.id)) {
-            return { ...node, color: { background: '#90EE90', border: '#228B22' } };
-        }
-        return node;
+function highlightPathStyles(path, edgeWidth) {
+    // Path nodes and the edges joining consecutive ones in green
+    const pathNodeIds = path.map(nodeIdForLabel).filter(id => id !== undefined);
+    pathNodeIds.forEach(nodeId => {
+        exploringNodeIds.delete(nodeId);
+        queueStyle(pendingNodeStyles, nodeId, { color: { ...PATH_NODE_COLOR } });
     });
-    nodes.update(updatedNodes);
-    
-    // Highlight path edges in green
-    let pathEdges = [];
     for (let i = 0; i < path.length - 1; i++) {
-        let fromId = nodeMap[path[i]];
-        let toId = nodeMap[path[i + 1]];
-        
-        let edge = edges.get().find(e => 
-            (e.from === fromId && e.to === toId) || 
-            (e.from === toId && e.to === fromId)
-        );
-        
-        if (edge) {
-            pathEdges.push(edge.id);
+        const edgeId = edgeIdBetween(nodeIdForLabel(path[i]), nodeIdForLabel(path[i + 1]));
+        if (edgeId !== undefined) {
+            queueStyle(pendingEdgeStyles, edgeId, { color: { ...PATH_EDGE_COLOR }, width: edgeWidth });
         }
     }
-    
-    let updatedEdges = edges.get().map(edge => {
-        if (pathEdges.includes(edge.id)) {
-            return { ...edge, color: { color: '#228B22' }, width: 4 };
-        }
-        return edge;
-    });
-    edges.update(updatedEdges);
+}
+
+function highlightFinalPath(path) {
+    beginStyleBatch();
+    // Clear all previous colors but preserve step info
+    clearVisualHighlights();
+    highlightPathStyles(path, 4);
+    endStyleBatch();
 }
 
 function updateNodeColor(nodeLabel, backgroundColor, borderColor) {
-    let nodeMap = {};
-    nodes.forEach(node => {
-        nodeMap[node.label] = node.id;
-    });
-    
-    let nodeId = nodeMap[nodeLabel];
-    if (nodeId) {
-        let node = nodes.get(nodeId);
-        if (node) {
-            nodes.update({
-                ...node,
-                color: { background: backgroundColor, border: borderColor }
-            });
+    let nodeId = nodeIdForLabel(nodeLabel);
+    if (nodeId !== undefined) {
+        if (backgroundColor === EXPLORING_COLOR.background) {
+            exploringNodeIds.add(nodeId);
+        } else {
+            exploringNodeIds.delete(nodeId);
         }
+        queueStyle(pendingNodeStyles, nodeId, { color: { background: backgroundColor, border: borderColor } });
     }
 }
 
+function resetGraphStyles() {
+    // Reset node and edge colors only
+    beginStyleBatch();
+    nodes.getIds().forEach(nodeId => queueStyle(pendingNodeStyles, nodeId, { color: undefined }));
+    edges.getIds().forEach(edgeId => queueStyle(pendingEdgeStyles, edgeId, { color: undefined, width: undefined }));
+    exploringNodeIds.clear();
+    endStyleBatch();
+}
+
 function highlightPath(path) {
     if (!path || path.length < 2) return;
     
-    // Get node labels to ID mapping
-    let nodeMap = {};
-    nodes.forEach(node => {
-        nodeMap[node.label] = node.id;
-    });
-    
-    // Highlight nodes in the path
-    let pathNodeIds = path.map(label => nodeMap[label]).filter(id => id !== undefined);
-    
-    // Update nodes with highlighting
-    let updatedNodes = nodes.get().map(node => {
-        if (pathNodeIds.includes(node.id)) {
-            return { ...node, color: { background: '#90EE90', border: '#228B22' } };
-        }
-        return { ...node, color: undefined };
-    });
-    nodes.update(updatedNodes);
-    
-    // Highlight edges in the path
-    let pathEdges = [];
-    for (let i = 0; i < path.length - 1; i++) {
-        let fromId = nodeMap[path[i]];
-        let toId = nodeMap[path[i + 1]];
-        
-        // Find the edge between these nodes
-        let edge = edges.get().find(e => 
-            (e.from === fromId && e.to === toId) || 
-            (e.from === toId && e.to === fromId)
-        );
-        
-        if (edge) {
-            pathEdges.push(edge.id);
-        }
-    }
-    
-    // Update edges with highlighting
-    let updatedEdges = edges.get().map(edge => {
-        if (pathEdges.includes(edge.id)) {
-            return { ...edge, color: { color: '#228B22' }, width: 3 };
-        }
-        return { ...edge, color: undefined, width: undefined };
-    });
-    edges.update(updatedEdges);
+    beginStyleBatch();
+    resetGraphStyles();
+    highlightPathStyles(path, 3);
+    endStyleBatch();
 }
 
 function clearVisualHighlights() {
-    // Reset node colors only
-    let updatedNodes = nodes.get().map(node => ({
-        ...node, 
-        color: undefined
-    }));
-    nodes.update(updatedNodes);
-    
-    // Reset edge colors only
-    let updatedEdges = edges.get().map(edge => ({
-        ...edge, 
-        color: undefined, 
-        width: undefined
-    }));
-    edges.update(updatedEdges);
+    resetGraphStyles();
     
     // Clear only result display (not step info)
     let resultDiv = document.getElementById("searchResult");
@@ -452,38 +460,10 @@ function clearVisualHighlights() {
 }
 
 function clearHighlights() {
-    // Reset node colors
-    let updatedNodes = nodes.get().map(node => ({
-        ...node, 
-        color: undefined
-    }));
-    nodes.update(updatedNodes);
-    
-    // Reset edge colors
-    let updatedEdges = edges.get().map(edge => ({
-        ...edge, 
-        color: undefined, 
-        width: undefined
-    }));
-    edges.update(updatedEdges);
-    
-    // Clear result display
-    let resultDiv = document.getElementById("searchResult");
-    if (resultDiv) {
-        resultDiv.innerHTML = '';
-    }
+    clearVisualHighlights();
     
     // Clear step info
-    let stepInfoDiv = document.getElementById("stepInfo");
-    if (stepInfoDiv) {
-        stepInfoDiv.innerHTML = '';
-    }
-    
-    // Hide legend
-    let legend = document.getElementById("visualizationLegend");
-    if (legend) {
-        legend.style.display = 'none';
-    }
+    clearStepInfo();
 }
 
 function resetToDefaultGraph() {